@@ -14,6 +14,7 @@ import time
 from cPickle import dumps, loads, HIGHEST_PROTOCOL, UnpicklingError
 from optparse import OptionParser
 
+from numpy import ndarray, float64, frombuffer, ascontiguousarray
 from traits.trait_handlers import TraitListObject, TraitDictObject
 
 # pylint: disable=E0611,F0401
@@ -26,6 +27,47 @@ from openmdao.lib.casehandlers.util import driver_map
 _casetable_attrs = set(['id', 'uuid', 'parent', 'msg', 'model_id', 'timeEnter'])
 _vartable_attrs = set(['var_id', 'name', 'case_id', 'sense', 'value'])
 
+_insert_var_sql = "insert into casevars(var_id,name,case_id,sense,value,shape)" \
+                  " values(?,?,?,?,?,?)"
+
+def _has_shape_column(connection):
+    """Return True if the casevars table has the `shape` column used to
+    store float arrays. Databases written by older recorders don't."""
+    cur = connection.cursor()
+    cur.execute("PRAGMA table_info(casevars)")
+    return 'shape' in [row[1] for row in cur]
+
+def _shape_column(connection):
+    """Return the SQL expression used to select the shape of a value."""
+    return 'shape' if _has_shape_column(connection) else 'NULL'
+
+def _encode_value(value):
+    """Return a tuple of ``(value, shape)`` for storing `value` in the
+    casevars table. Floats, ints and strings are stored as is. Float arrays
+    are stored as their raw float64 data with the shape as text, anything
+    else is pickled. Shape is None for everything but float arrays."""
+    if isinstance(value, (float, int, str)):
+        return (value, None)
+    if isinstance(value, ndarray) and value.dtype == float64:
+        return (sqlite3.Binary(ascontiguousarray(value).tostring()),
+                ','.join([str(dim) for dim in value.shape]))
+    if isinstance(value, TraitDictObject):
+        value = dict(value)
+    elif isinstance(value, TraitListObject):
+        value = list(value)
+    return (sqlite3.Binary(dumps(value, HIGHEST_PROTOCOL)), None)
+
+def _decode_value(value, shape):
+    """Reverse of :func:`_encode_value`. May raise UnpicklingError."""
+    if isinstance(value, (float, int, str)):
+        return value
+    if value is None:  # Result when recorded value was NaN.
+        return float('NaN')
+    if shape is not None:
+        shape = tuple([int(dim) for dim in shape.split(',')]) if shape else ()
+        return frombuffer(str(value), dtype=float64).reshape(shape).copy()
+    return loads(str(value))
+
 def _query_split(query):
     """Return a tuple of lhs, relation, rhs after splitting on
     a list of allowed operators.
@@ -90,7 +132,8 @@ class DBCaseIterator(object):
         casecur = self._connection.cursor()
         casecur.execute(' '.join(sql))
 
-        sql = ['SELECT var_id,name,case_id,sense,value from casevars WHERE case_id=%s']
+        sql = ['SELECT var_id,name,case_id,sense,value,%s from casevars'
+               % _shape_column(self._connection), 'WHERE case_id=%s']
         if self.selectors is not None:
             for sel in self.selectors:
                 rhs, rel, lhs = _query_split(sel)
@@ -103,19 +146,14 @@ class DBCaseIterator(object):
             varcur.execute(combined % cid)
             inputs = []
             outputs = []
-            for var_id, vname, case_id, sense, value in varcur:
-                if isinstance(value, (float, int, str)):
-                    pass
-                elif value is None:  # Result when recorded value was NaN.
-                    value = float('NaN')
-                else:
-                    try:
-                        value = loads(str(value))
-                    except UnpicklingError as err:
-                        print 'value', type(value), repr(value)
-                        raise UnpicklingError("can't unpickle value '%s' for"
-                                              " case '%s' from database: %s"
-                                              % (vname, text_id, str(err)))
+            for var_id, vname, case_id, sense, value, shape in varcur:
+                try:
+                    value = _decode_value(value, shape)
+                except UnpicklingError as err:
+                    print 'value', type(value), repr(value)
+                    raise UnpicklingError("can't unpickle value '%s' for"
+                                          " case '%s' from database: %s"
+                                          % (vname, text_id, str(err)))
                 if sense == 'i':
                     inputs.append((vname, value))
                 elif sense == 'o':
@@ -127,16 +165,30 @@ class DBCaseIterator(object):
 
 
 class DBCaseRecorder(object):
-    """Records Cases to a relational DB (sqlite). Values other than floats,
-    ints or strings are pickled and are opaque to SQL queries.
+    """Records Cases to a relational DB (sqlite). Float arrays are stored as
+    raw float64 data along with their shape. Other values that aren't floats,
+    ints or strings are pickled. Both are opaque to SQL queries.
+
+    If `batch_size` is greater than 1, variable rows are buffered and
+    written with a single ``executemany`` and commit every `batch_size`
+    cases. Buffered rows are written when the recorder is closed or an
+    iterator is requested.
     """
 
     implements(ICaseRecorder)
 
-    def __init__(self, dbfile=':memory:', model_id='', append=False):
+    def __init__(self, dbfile=':memory:', model_id='', append=False,
+                 batch_size=1):
         self.dbfile = dbfile  # this creates the connection
         self.model_id = model_id
+        self.batch_size = batch_size
         self._cfg_map = {}
+        self._pending = []    # buffered casevars rows
+        self._num_pending = 0  # number of cases with buffered rows
+
+        if dbfile != ':memory:':
+            # Readers don't block the writer (and vice versa) in WAL mode.
+            self._connection.execute("PRAGMA journal_mode=WAL")
 
         if append:
             exstr = 'if not exists'
@@ -159,9 +211,19 @@ class DBCaseRecorder(object):
          name TEXT,
          case_id INTEGER,
          sense TEXT,
-         value BLOB
+         value BLOB,
+         shape TEXT
          )""" % exstr)
 
+        if not _has_shape_column(self._connection):
+            # Appending to a database from an older recorder.
+            self._connection.execute("alter table casevars"
+                                     " add column shape TEXT")
+
+        self._connection.execute("""
+        create index if not exists casevars_case_name
+         on casevars(case_id, name)""")
+
     @property
     def dbfile(self):
         """The name of the database. This can be a filename or :memory: for
@@ -201,43 +263,36 @@ class DBCaseRecorder(object):
                     (None, case_uuid, parent_uuid, msg, self.model_id))
 
         case_id = cur.lastrowid
-        # insert the inputs and outputs into the vars table.  Pickle them if
-        # they're not one of the built-in types int, float, or str.
+        # buffer the inputs and outputs for the vars table.  Float arrays
+        # are stored raw, other values that aren't one of the built-in types
+        # int, float, or str are pickled.
 
-        v = (None, 'timestamp', case_id, None, time.time())
-        cur.execute("insert into casevars(var_id,name,case_id,sense,value) values(?,?,?,?,?)",
-                    v)
+        rows = self._pending
+        rows.append((None, 'timestamp', case_id, None, time.time(), None))
 
         in_names, out_names = self._cfg_map[driver]
 
         for name, value in zip(in_names, inputs):
-            if isinstance(value, (float, int, str)):
-                v = (None, name, case_id, 'i', value)
-            else:
-                if isinstance(value, TraitDictObject):
-                    value = dict(value)
-                elif isinstance(value, TraitListObject):
-                    value = list(value)
-                v = (None, name, case_id, 'i',
-                     sqlite3.Binary(dumps(value, HIGHEST_PROTOCOL)))
-            cur.execute("insert into casevars(var_id,name,case_id,sense,value) values(?,?,?,?,?)",
-                        v)
+            rows.append((None, name, case_id, 'i') + _encode_value(value))
         for name, value in zip(out_names, outputs):
-            if isinstance(value, (float, int, str)):
-                v = (None, name, case_id, 'o', value)
-            else:
-                if isinstance(value, TraitDictObject):
-                    value = dict(value)
-                elif isinstance(value, TraitListObject):
-                    value = list(value)
-                v = (None, name, case_id, 'o',
-                     sqlite3.Binary(dumps(value, HIGHEST_PROTOCOL)))
-            cur.execute("insert into casevars(var_id,name,case_id,sense,value) values(?,?,?,?,?)",
-                        v)
+            rows.append((None, name, case_id, 'o') + _encode_value(value))
+
+        self._num_pending += 1
+        if self._num_pending >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        """Write any buffered variable rows and commit."""
+        if self._pending:
+            self._connection.executemany(_insert_var_sql, self._pending)
+            self._pending = []
+        self._num_pending = 0
         self._connection.commit()
 
     def close(self):
         """Commit and close DB connection if not using ``:memory:``."""
+        if self._connection is not None and self._pending:
+            self._flush()
         if self._connection is not None and self._dbfile != ':memory:':
             self._connection.commit()
             self._connection.close()
@@ -245,6 +300,8 @@ class DBCaseRecorder(object):
 
     def get_iterator(self):
         """Return a DBCaseIterator that points to our current DB."""
+        if self._connection is not None and self._pending:
+            self._flush()
         return DBCaseIterator(dbfile=self._dbfile, connection=self._connection)
 
 
@@ -310,7 +367,8 @@ def case_db_to_dict(dbname, varnames, case_sql='', var_sql='', include_errors=Fa
     casecur = connection.cursor()
     casecur.execute(' '.join(sql))
 
-    sql = ["SELECT name, value from casevars WHERE case_id=%s"]
+    sql = ["SELECT name, value, %s from casevars WHERE case_id=%%s"
+           % _shape_column(connection)]
     vars_added = False
     for i, name in enumerate(vardict.keys()):
         if i == 0:
@@ -331,13 +389,12 @@ def case_db_to_dict(dbname, varnames, case_sql='', var_sql='', include_errors=Fa
     for case_id in casecur:
         casedict = {}
         varcur.execute(combined % case_id)
-        for vname, value in varcur:
-            if not isinstance(value, (float, int, str)):
-                try:
-                    value = loads(str(value))
-                except UnpicklingError as err:
-                    raise UnpicklingError("can't unpickle value '%s' from"
-                                          " database: %s" % (vname, str(err)))
+        for vname, value, shape in varcur:
+            try:
+                value = _decode_value(value, shape)
+            except UnpicklingError as err:
+                raise UnpicklingError("can't unpickle value '%s' from"
+                                      " database: %s" % (vname, str(err)))
             casedict[vname] = value
 
         if len(casedict) != len(vardict):
@@ -2,11 +2,12 @@ import bson
 import json
 import logging
 import cPickle
+import os
 import StringIO
 from struct import pack, unpack
 from weakref import ref
 
-from numpy import ndarray
+from numpy import ndarray, array
 
 from openmdao.main.api import Assembly, VariableTree
 from openmdao.lib.casehandlers.pymongo_bson.json_util import loads, dumps
@@ -14,6 +15,9 @@ from openmdao.lib.casehandlers.pymongo_bson.binary import Binary
 
 _GLOBAL_DICT = dict(__builtins__=None)
 
+# Bump this if the format of the saved case index changes.
+_INDEX_VERSION = 1
+
 
 class CaseDataset(object):
     """
@@ -51,8 +55,24 @@ class CaseDataset(object):
 
         cases = cds.data.driver(driver_name).parent_case(parent_id).fetch()
 
+    To process cases one at a time rather than building the full list::
+
+        for case in cds.data.stream():
+            ...
+
+    To get columns of numeric data as NumPy arrays::
+
+        columns = cds.data.vars(names).by_variable(arrays=True).fetch()
+
     Other possibilities exist, see :class:`Query`.
 
+    Case, parent and driver ids are mapped to file offsets by an index which
+    is built the first time it's needed and saved alongside the data file as
+    ``<filename>.idx``. The index is rebuilt if the data file changes.
+    Querying a single case with ``cds.data.case(case_id)`` uses the index to
+    read only that case and the cases needed to fill in its values, rather
+    than the whole file.
+
     To restore from the last recorded case::
 
         cds.restore(assembly, cds.data.fetch()[-1]['_id'])
@@ -68,9 +88,6 @@ class CaseDataset(object):
         else:
             raise ValueError("dataset format must be 'json' or 'bson'")
 
-        self._query_id = self._parent_id = self._driver_id = None
-        self._case_ids = self._drivers = None
-
     @property
     def data(self):
         """ :class:`Query` object. """
@@ -88,8 +105,64 @@ class CaseDataset(object):
 
     def _fetch(self, query):
         """ Return data based on `query`. """
-        self._setup(query)
+        selection = self._setup(query, self._reader)
+        names, metadata_names = self._names(query, selection)
+
+        if query.names:
+            # Returning single row, not list of rows.
+            return names
+
+        rows = ListResult(self._rows(query, selection, names, metadata_names))
+
+        if selection.query_id and not rows:
+            raise ValueError('No case with _id %s' % selection.query_id)
+
+        if query.transpose:
+            tmp = DictList(names)
+            for i in range(len(rows[0])):
+                column = [row[i] for row in rows]
+                if query.arrays:
+                    column = _as_array(column)
+                tmp.append(column)
+            # Keep CDS as attribute for post-processing
+            tmp.cds = self
+            return tmp
+
+        # Keep CDS as attribute for post-processing
+        rows.cds = self
+        return rows
+
+    def _stream(self, query):
+        """
+        Generate rows of data based on `query`, one at a time.
+        The generator reads from its own copy of the reader, so other
+        queries on this dataset can run while it is suspended.
+        """
+        if query.names:
+            raise ValueError('data.var_names() invalid for stream()')
+        if query.transpose:
+            raise ValueError('data.by_variable() invalid for stream()')
+
+        reader = self._reader.copy()
+        try:
+            selection = self._setup(query, reader)
+            names, metadata_names = self._names(query, selection)
+
+            found = False
+            for row in self._rows(query, selection, names, metadata_names):
+                found = True
+                yield row
+
+            if selection.query_id and not found:
+                raise ValueError('No case with _id %s' % selection.query_id)
+        finally:
+            reader.close()
 
+    def _names(self, query, selection):
+        """
+        Return ``(names, metadata_names)`` for the columns selected by
+        `query`.
+        """
         metadata_names = ['_id', '_parent_id', '_driver_id', 'error_status',
                           'error_message', 'timestamp']
         if query.vnames:
@@ -101,31 +174,38 @@ class CaseDataset(object):
             names = query.vnames
         else:
             if query.driver_name:
-                driver_info = self._drivers[self._driver_id]
+                driver_info = selection.drivers[selection.driver_id]
                 prefix = driver_info['prefix']
                 all_names = [prefix+name
                              for name in driver_info['recording']]
             else:
                 all_names = []
-                for driver_info in self._drivers.values():
+                for driver_info in selection.drivers.values():
                     prefix = driver_info['prefix']
                     all_names.extend([prefix+name
                                       for name in driver_info['recording']])
             names = sorted(all_names+metadata_names)
+        return (names, metadata_names)
 
-        if query.names:
-            # Returning single row, not list of rows.
-            return names
+    def _rows(self, query, selection, names, metadata_names):
+        """ Generate rows of data for the cases selected by `query`. """
+        if selection.query_id is not None:
+            row = self._case_row(query, selection, names, metadata_names)
+            if row is not None:
+                yield row
+            return
+
+        driver_id = selection.driver_id
+        case_ids = selection.case_ids
+        last_id = selection.parent_id
 
-        nan = float('NaN')
-        rows = ListResult()
         state = {}  # Retains last seen values.
-        for case_data in self._reader.cases():
+        for case_data in selection.reader.cases():
             data = case_data['data']
             case_id = case_data['_id']
             case_driver_id = case_data['_driver_id']
 
-            prefix = self._drivers[case_driver_id]['prefix']
+            prefix = selection.drivers[case_driver_id]['prefix']
             if prefix:
                 # Make names absolute.
                 pass
@@ -137,52 +217,75 @@ class CaseDataset(object):
             state.update(data)
 
             # Filter on driver.
-            if self._driver_id is not None and \
-               case_driver_id != self._driver_id:
+            if driver_id is not None and case_driver_id != driver_id:
                 continue
 
             # Filter on case.
-            if self._case_ids is None or case_id in self._case_ids:
-                for name in metadata_names:
-                    data[name] = case_data[name]
-
-                row = DictList(names)
-                for name in names:
-                    if query.local_only:
-                        if name in metadata_names:
-                            row.append(data[name])
-                        else:
-                            driver = self._drivers[case_driver_id]
-                            lnames = [prefix+rec for rec in driver['recording']]
-                            if name in lnames:
-                                row.append(data[name])
-                            else:
-                                row.append(nan)
-                    elif name in state:
-                        row.append(state[name])
-                    elif name in data:
-                        row.append(data[name])
-                    else:
-                        row.append(nan)
-                rows.append(row)
+            if case_ids is None or case_id in case_ids:
+                yield self._row(query, selection, names, metadata_names,
+                                case_data, data, state)
 
-            if case_id == self._query_id or case_id == self._parent_id:
+            if case_id == last_id:
                 break  # Parent is last case recorded.
 
-        if self._query_id and not rows:
-            raise ValueError('No case with _id %s' % self._query_id)
+    def _case_row(self, query, selection, names, metadata_names):
+        """
+        Return the row for the single case selected by `query`, or None if
+        there's no such case. The case is located via the reader's index.
+        Values the case doesn't contain are taken from the most recent
+        earlier case that does, reading backwards only as far as needed.
+        """
+        reader = selection.reader
+        pos = reader.position(selection.query_id)
+        if pos is None:
+            return None
 
-        if query.transpose:
-            tmp = DictList(names)
-            for i in range(len(rows[0])):
-                tmp.append([row[i] for row in rows])
-            # Keep CDS as attribute for post-processing
-            tmp.cds = self
-            return tmp
+        entries = reader.index()
+        case_data = reader.case_at(entries[pos][3])
+        data = case_data['data']
+
+        state = data.copy()
+        if not query.local_only:
+            needed = set(names) - set(metadata_names) - set(state)
+            while needed and pos > 0:
+                pos -= 1
+                earlier = reader.case_at(entries[pos][3])['data']
+                for name in needed.intersection(earlier):
+                    state[name] = earlier[name]
+                needed.difference_update(earlier)
+
+        return self._row(query, selection, names, metadata_names,
+                         case_data, data, state)
+
+    def _row(self, query, selection, names, metadata_names, case_data, data,
+             state):
+        """ Return the row of selected `names` for `case_data`. """
+        nan = float('NaN')
+        case_driver_id = case_data['_driver_id']
+        prefix = selection.drivers[case_driver_id]['prefix']
 
-        # Keep CDS as attribute for post-processing
-        rows.cds = self
-        return rows
+        for name in metadata_names:
+            data[name] = case_data[name]
+
+        row = DictList(names)
+        for name in names:
+            if query.local_only:
+                if name in metadata_names:
+                    row.append(data[name])
+                else:
+                    driver = selection.drivers[case_driver_id]
+                    lnames = [prefix+rec for rec in driver['recording']]
+                    if name in lnames:
+                        row.append(data[name])
+                    else:
+                        row.append(nan)
+            elif name in state:
+                row.append(state[name])
+            elif name in data:
+                row.append(data[name])
+            else:
+                row.append(nan)
+        return row
 
     def _write(self, query, out, format):
         """ Write data based on `query` to `out`. """
@@ -193,7 +296,7 @@ class CaseDataset(object):
         if query.transpose:
             raise ValueError('data.by_variable() invalid for write()')
 
-        self._setup(query)
+        selection = self._setup(query, self._reader)
 
         format = format.lower()
         if format == 'bson':
@@ -209,15 +312,15 @@ class CaseDataset(object):
         simulation_info = self.simulation_info
         constants = simulation_info['constants']  # Updated to reflect start.
 
-        for count, case_data in enumerate(self._reader.cases()):
+        for count, case_data in enumerate(selection.reader.cases()):
             data = case_data['data']
             case_id = case_data['_id']
             case_driver_id = case_data['_driver_id']
-            prefix = self._drivers[case_driver_id]['prefix']
+            prefix = selection.drivers[case_driver_id]['prefix']
 
             # Filter on driver.
-            if self._driver_id is not None and \
-               case_driver_id != self._driver_id:
+            if selection.driver_id is not None and \
+               case_driver_id != selection.driver_id:
                 if not found:
                     # Update 'constants'.
                     for name, value in data.items():
@@ -225,7 +328,7 @@ class CaseDataset(object):
                 continue
 
             # Filter on case.
-            if self._case_ids is None or case_id in self._case_ids:
+            if selection.case_ids is None or case_id in selection.case_ids:
                 if not found:
                     writer.write('simulation_info', simulation_info)
                     for i, driver in enumerate(self.drivers):
@@ -251,11 +354,12 @@ class CaseDataset(object):
                 for name, value in data.items():
                     constants[prefix+name] = value
 
-            if case_id == self._query_id or case_id == self._parent_id:
+            if case_id == selection.query_id or \
+               case_id == selection.parent_id:
                 break  # Parent is last case recorded.
 
-        if self._query_id and not found:
-            raise ValueError('No case with _id %s' % self._query_id)
+        if selection.query_id and not found:
+            raise ValueError('No case with _id %s' % selection.query_id)
         elif not found:
             # write simulation_info even if no cases were found
             writer.write('simulation_info', simulation_info)
@@ -270,8 +374,11 @@ class CaseDataset(object):
 
         writer.close()
 
-    def _setup(self, query):
-        """ Setup for processing `query`. """
+    def _setup(self, query, reader):
+        """
+        Return the :class:`_Selection` for processing `query` with
+        `reader`.
+        """
         if query.vnames is not None:
             bad = []
             metadata = self.simulation_info['variable_metadata']
@@ -282,40 +389,32 @@ class CaseDataset(object):
             if bad:
                 raise RuntimeError('Names not found in the dataset: %s' % bad)
 
-        self._drivers = {}
-        self._driver_id = None
-        for driver_info in self._reader.drivers():
+        selection = _Selection(reader)
+        for driver_info in reader.drivers():
             _id = driver_info['_id']
             name = driver_info['name']
             prefix, _, name = name.rpartition('.')
             if prefix:
                 prefix += '.'
             driver_info['prefix'] = prefix
-            self._drivers[_id] = driver_info
+            selection.drivers[_id] = driver_info
             if driver_info['name'] == query.driver_name:
-                self._driver_id = _id
+                selection.driver_id = _id
 
         if query.driver_name:
-            if self._driver_id is None:
+            if selection.driver_id is None:
                 raise ValueError('No driver named %r' % query.driver_name)
 
-        self._case_ids = None
-        self._query_id = None
-        self._parent_id = None
         if query.case_id is not None:
-            self._query_id = query.case_id
-            self._case_ids = set((self._query_id,))
-            self._driver_id = None  # Case specified, ignore driver.
+            selection.query_id = query.case_id
+            selection.case_ids = set((selection.query_id,))
+            selection.driver_id = None  # Case specified, ignore driver.
         elif query.parent_id is not None:
             # Parent won't be seen until children are, so we have to pre-screen.
-            # Collect tree of cases.
-            self._parent_id = query.parent_id
+            # Collect tree of cases from the index.
+            selection.parent_id = query.parent_id
             cases = {}
-            for case_data in self._reader.cases():
-                _id = case_data['_id']
-                _driver_id = case_data['_driver_id']
-                _parent_id = case_data['_parent_id']
-
+            for _id, _parent_id, _driver_id, offset in reader.index():
                 if _id in cases:
                     node = cases[_id]
                     node.driver_id = _driver_id
@@ -336,17 +435,19 @@ class CaseDataset(object):
                     child = _CaseNode(_id, _driver_id, parent)
                     cases[_id] = parent.add_child(child)
 
-                if _id == self._parent_id:
+                if _id == selection.parent_id:
                     break  # Parent is last case recorded.
 
             # Determine subtree of interest.
-            if self._parent_id in cases:
-                root = cases[self._parent_id]
-                self._case_ids = set((self._parent_id,))
+            if selection.parent_id in cases:
+                root = cases[selection.parent_id]
+                selection.case_ids = set((selection.parent_id,))
                 for child in root.get_children():
-                    self._case_ids.add(child.case_id)
+                    selection.case_ids.add(child.case_id)
             else:
-                raise ValueError('No case with _id %s', self._parent_id)
+                raise ValueError('No case with _id %s', selection.parent_id)
+
+        return selection
 
     def restore(self, assembly, case_id):
         """ Restore case `case_id` into `assembly`. """
@@ -440,11 +541,20 @@ class Query(object):
         self.local_only = False
         self.names = False
         self.transpose = False
+        self.arrays = False
 
     def fetch(self):
         """ Return a list of rows of data, one for each selected case. """
         return self._dataset._fetch(self)
 
+    def stream(self):
+        """
+        Return a generator of rows of data, one for each selected case.
+        Rows are read from the file as they are requested rather than all
+        at once.  Not valid with :meth:`var_names` or :meth:`by_variable`.
+        """
+        return self._dataset._stream(self)
+
     def write(self, out, format=None):
         """
         Write filtered :class:`CaseDataset` to `out`, a filename or file-like
@@ -500,12 +610,14 @@ class Query(object):
         self.transpose = False
         return self
 
-    def by_variable(self):
+    def by_variable(self, arrays=False):
         """
         Have :meth:`fetch` return data as ``[var][case]`` rather than the
-        default of ``[case][var]``.
+        default of ``[case][var]``.  If `arrays` is True, columns of numeric
+        data are returned as NumPy arrays rather than lists.
         """
         self.transpose = True
+        self.arrays = arrays
         return self
 
     def var_names(self):
@@ -550,6 +662,36 @@ class ListResult(list):
     pass
 
 
+def _as_array(column):
+    """
+    Return `column` as a NumPy array if its values are numeric, otherwise
+    return `column` unchanged.
+    """
+    try:
+        values = array(column)
+    except ValueError:
+        return column
+    if values.dtype.kind in 'biuf':
+        return values
+    return column
+
+
+class _Selection(object):
+    """
+    The cases selected by a :class:`Query`, and the reader to get them from.
+    Each query has its own, so a suspended :meth:`Query.stream` isn't
+    affected by other queries on the same dataset.
+    """
+
+    def __init__(self, reader):
+        self.reader = reader
+        self.drivers = {}
+        self.driver_id = None
+        self.case_ids = None
+        self.query_id = None
+        self.parent_id = None
+
+
 class _CaseNode(object):
     """ Represents a node in a tree of cases. """
 
@@ -589,16 +731,40 @@ class _Reader(object):
     def __init__(self, filename, mode):
         if isinstance(filename, StringIO.StringIO):
             self._inp = filename
+            self._filename = None
         else:
             self._inp = open(filename, mode)
+            self._filename = filename
         self._simulation_info = self._next()
         self._state = 'drivers'
         self._info = None
+        self._index = None
+        self._index_stamp = None
+        self._positions = None
 
     def _next(self):
         """ Return next dictionary of data. """
         raise NotImplementedError('_next')
 
+    def copy(self):
+        """
+        Return a new reader for the same data, with its own file position.
+        The index is shared until either reader rebuilds it.
+        """
+        if self._filename is None:
+            source = StringIO.StringIO(self._inp.getvalue())
+        else:
+            source = self._filename
+        reader = self.__class__(source)
+        reader._index = self._index
+        reader._index_stamp = self._index_stamp
+        reader._positions = self._positions
+        return reader
+
+    def close(self):
+        """ Close the data file. """
+        self._inp.close()
+
     @property
     def simulation_info(self):
         """ Simulation info dictionary. """
@@ -639,6 +805,91 @@ class _Reader(object):
             info = self._next()
         self._state = 'eof'
 
+    def index(self):
+        """
+        Return list of ``(case_id, parent_id, driver_id, offset)`` for each
+        case, in file order. The saved index is used if it's up to date with
+        the data file, otherwise the index is rebuilt and saved.
+        """
+        stamp = self._stamp()
+        if self._index is not None and stamp == self._index_stamp:
+            return self._index
+
+        entries = self._load_index(stamp)
+        if entries is None:
+            entries = self._build_index()
+            self._save_index(stamp, entries)
+
+        self._index = entries
+        self._index_stamp = stamp
+        self._positions = dict([(entry[0], i)
+                                for i, entry in enumerate(entries)])
+        return entries
+
+    def position(self, case_id):
+        """ Return position of `case_id` in :meth:`index`, or None. """
+        self.index()
+        return self._positions.get(case_id)
+
+    def case_at(self, offset):
+        """ Return the 'iteration_case' dictionary at file `offset`. """
+        self._inp.seek(offset)
+        self._state = 'eof'  # Force re-read on next drivers()/cases().
+        self._info = None
+        return self._next()
+
+    def _stamp(self):
+        """ Return ``(mtime, size)`` of data file, None if not a file. """
+        if self._filename is None:
+            return None
+        stat = os.stat(self._filename)
+        return (stat.st_mtime, stat.st_size)
+
+    def _build_index(self):
+        """ Scan the data file and return list of index entries. """
+        self._inp.seek(0)
+        self._next()  # Skip 'simulation_info'.
+
+        entries = []
+        while True:
+            offset = self._inp.tell()
+            info = self._next()
+            if not info:
+                break
+            if '_driver_id' in info:
+                entries.append((info['_id'], info['_parent_id'],
+                                info['_driver_id'], offset))
+        self._state = 'eof'
+        self._info = None
+        return entries
+
+    def _load_index(self, stamp):
+        """ Return saved index entries if valid for `stamp`, else None. """
+        if stamp is None:
+            return None
+        try:
+            with open(self._filename+'.idx', 'rb') as inp:
+                saved = cPickle.load(inp)
+        except Exception:
+            return None
+        if not isinstance(saved, dict) or \
+           saved.get('version') != _INDEX_VERSION or \
+           saved.get('stamp') != stamp:
+            return None
+        return saved['entries']
+
+    def _save_index(self, stamp, entries):
+        """ Save index `entries` alongside the data file, if possible. """
+        if stamp is None:
+            return
+        saved = dict(version=_INDEX_VERSION, stamp=stamp, entries=entries)
+        try:
+            with open(self._filename+'.idx', 'wb') as out:
+                cPickle.dump(saved, out, cPickle.HIGHEST_PROTOCOL)
+        except (IOError, OSError) as exc:
+            logging.debug("Can't save case index for %s: %s",
+                          self._filename, exc)
+
 
 class _JSONReader(_Reader):
     """ Reads a :class:`JSONCaseRecorder` file. """
@@ -8,6 +8,9 @@ import StringIO
 import os
 import logging
 import shutil
+import sqlite3
+
+from numpy import array, arange, float64
 
 from openmdao.main.api import Assembly, Case, set_as_top
 from openmdao.test.execcomp import ExecComp
@@ -214,6 +217,66 @@ class DBCaseRecorderTestCase(unittest.TestCase):
             self.assertEqual(case['unicode'], u'Unicode String')
             self.assertEqual(case['list'], ['Hello', 'world'])
 
+    def test_float_arrays(self):
+        recorder = DBCaseRecorder()
+        inputs = ['comp1.x', 'comp1.ints']
+        outputs = ['comp1.z']
+        recorder.register(self, inputs, outputs)
+        for i in range(3):
+            inputs = [arange(6, dtype=float64).reshape((2, 3))*i,
+                      array([i, i+1])]
+            outputs = [array(float(i))]
+            recorder.record(self, inputs, outputs, None, '', '')
+
+        cur = recorder._connection.cursor()
+        cur.execute("SELECT shape from casevars WHERE name='comp1.x'")
+        self.assertEqual([row[0] for row in cur], ['2,3']*3)
+
+        for i, case in enumerate(recorder.get_iterator()):
+            self.assertEqual(case['comp1.x'].shape, (2, 3))
+            self.assertEqual(case['comp1.x'].dtype, float64)
+            self.assertEqual(case['comp1.x'].tolist(),
+                             (arange(6.).reshape((2, 3))*i).tolist())
+            # non-float arrays are still pickled
+            self.assertEqual(case['comp1.ints'].tolist(), [i, i+1])
+            self.assertEqual(case['comp1.z'].shape, ())
+            self.assertEqual(float(case['comp1.z']), float(i))
+
+    def test_batch_size(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            dfile = os.path.join(tmpdir, 'junk.db')
+            recorder = DBCaseRecorder(dfile, batch_size=4)
+            recorder.register(self, ['comp1.x'], ['comp1.z'])
+
+            def count_rows():
+                connection = sqlite3.connect(dfile)
+                try:
+                    cur = connection.cursor()
+                    cur.execute("SELECT count(*) from casevars")
+                    return cur.fetchone()[0]
+                finally:
+                    connection.close()
+
+            for i in range(6):
+                recorder.record(self, [float(i)], [i*2.], None, '', '')
+                if i == 2:
+                    self.assertEqual(count_rows(), 0)
+
+            # first 4 cases have been written, 3 rows each
+            self.assertEqual(count_rows(), 12)
+            recorder.close()
+            self.assertEqual(count_rows(), 18)
+
+            varinfo = case_db_to_dict(dfile, ['comp1.x', 'comp1.z'])
+            self.assertEqual(varinfo['comp1.x'], [float(i) for i in range(6)])
+            self.assertEqual(varinfo['comp1.z'], [i*2. for i in range(6)])
+        finally:
+            try:
+                shutil.rmtree(tmpdir, onerror=onerror)
+            except OSError:
+                logging.error("problem removing directory %s", tmpdir)
+
     def test_close(self):
         # :memory: can be used after close.
         recorder = DBCaseRecorder()
@@ -346,6 +346,83 @@ class TestCase(unittest.TestCase):
         # Exact case counts are unreliable, just assure restore was quicker.
         self.assertTrue(len(cases) < n_orig/4)   # Typically 15
 
+    def test_case_index(self):
+        # Single case queries use the index, and match a full scan.
+        path = os.path.join(os.path.dirname(__file__), 'sellar.json')
+        shutil.copy(path, 'sellar.json')
+        cds = CaseDataset('sellar.json', 'json')
+        cases = cds.data.fetch()
+
+        for i in (0, 5, 100, -1):
+            case = cds.data.case(cases[i]['_id']).fetch()
+            self.assertEqual(len(case), 1)
+            for expected, value in zip(cases[i], case[0]):
+                if isinstance(expected, float) and isnan(expected):
+                    self.assertTrue(isnan(value))
+                else:
+                    self.assertEqual(value, expected)
+
+        self.assertTrue(os.path.exists('sellar.json.idx'))
+        self.assertRaises(ValueError, cds.data.case('no-such-case').fetch)
+
+        # Saved index is reused by a new dataset, and rebuilt if the data
+        # file changes.
+        index = cds._reader.index()
+        cds = CaseDataset('sellar.json', 'json')
+        self.assertEqual(cds._reader._load_index(cds._reader._stamp()), index)
+        os.utime('sellar.json', (0, 0))
+        self.assertEqual(cds._reader._load_index(cds._reader._stamp()), None)
+        self.assertEqual(cds._reader.index(), index)
+
+    def test_stream(self):
+        names = ['half.z2a', 'sub.globals.z1', 'sub.x1']
+        cases = self.cds.data.driver('sub.driver').vars(names).fetch()
+        streamed = self.cds.data.driver('sub.driver').vars(names).stream()
+        self.assertFalse(isinstance(streamed, list))
+
+        count = 0
+        for case, row in zip(cases, streamed):
+            count += 1
+            self.assertEqual(row.keys(), case.keys())
+            self.assertEqual(row.values(), case.values())
+        self.assertEqual(count, 184)
+
+        # Other queries on the dataset while a stream is suspended don't
+        # change what it returns.
+        streamed = self.cds.data.driver('sub.driver').vars(names).stream()
+        rows = [streamed.next() for i in range(10)]
+        case_id = self.cds.data.fetch()[20]['_id']
+        self.assertEqual(len(self.cds.data.case(case_id).fetch()), 1)
+        self.assertEqual(len(self.cds.data.fetch()), 242)
+        rows.append(streamed.next())
+        self.cds._reader.case_at(self.cds._reader.index()[3][3])
+        self.cds._reader._index = None
+        self.cds._reader.index()
+        rows.extend(streamed)
+        self.assertEqual([row.values() for row in rows],
+                         [case.values() for case in cases])
+
+        try:
+            list(self.cds.data.by_variable().stream())
+        except ValueError as exc:
+            self.assertEqual(str(exc), 'data.by_variable() invalid for stream()')
+        else:
+            self.fail('Expected ValueError')
+
+    def test_by_variable_arrays(self):
+        names = ['half.z2a', 'sub.globals.z1', 'half.itername']
+        columns = self.cds.data.vars(names).by_variable(arrays=True).fetch()
+        lists = self.cds.data.vars(names).by_variable().fetch()
+
+        for name in ('half.z2a', 'sub.globals.z1'):
+            self.assertTrue(isinstance(columns[name], np.ndarray))
+            self.assertEqual(columns[name].shape, (242,))
+            self.assertTrue(isinstance(lists[name], list))
+            self.assertEqual(columns[name][-1], lists[name][-1])
+
+        # Non-numeric columns are left as lists.
+        self.assertTrue(isinstance(columns['half.itername'], list))
+
     def test_write(self):
         # Read in a dataset and write out a selected portion of it.
         path = os.path.join(os.path.dirname(__file__), 'jsonrecorder.json')
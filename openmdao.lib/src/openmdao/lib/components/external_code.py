@@ -14,11 +14,13 @@ import time
 from openmdao.main.datatypes.api import Bool, Dict, Str, FileRef, Float, Int, List
 
 from openmdao.main.api import Component
+from openmdao.main.concurrency import process_slot, waiting
 from openmdao.main.exceptions import RunInterrupted, RunStopped
 from openmdao.main.rbac import AccessController, RoleError, rbac, remote_access
 from openmdao.main.resource import ResourceAllocationManager as RAM
 
 from openmdao.util.filexfer import filexfer, pack_zipfile, unpack_zipfile
+from openmdao.util.fileutil import file_md5
 from openmdao.util import shellproc
 
 from distutils.spawn import find_executable
@@ -49,6 +51,17 @@ class ExternalCode(Component):
     timeout = Float(0., low=0., iotype='in', units='s',
                     desc='Maximum time to wait for command completion.'
                          ' A value of zero implies an infinite wait.')
+    async_execute = Bool(False,
+                         desc='If True, the command may run concurrently with'
+                              ' those of adjacent independent components in'
+                              ' the same workflow which also have'
+                              ' async_execute set. The number of concurrent'
+                              ' local commands is limited by the local'
+                              ' allocator.')
+    delta_transfer = Bool(False,
+                          desc='If True, when running remotely only files'
+                               ' which have changed are transferred. Input'
+                               ' files are cached on the remote host.')
     timed_out = Bool(False, iotype='out', desc='True if the command timed-out.')
     return_code = Int(0, iotype='out', desc='Return code from the command.')
 
@@ -95,6 +108,10 @@ class ExternalCode(Component):
         is allocated and the command is run on that server.
         Otherwise the command is run locally.
 
+        If `async_execute` is set, the workflow may run this component
+        concurrently with other independent components. Only the wait for
+        the command to complete overlaps with other components.
+
         When running remotely, the following resources are set:
 
         ================ =====================================
@@ -119,6 +136,11 @@ class ExternalCode(Component):
         wallclock_time   self.timeout (if non-zero)
         ================ =====================================
 
+        If `delta_transfer` is set, input files are only sent to the remote
+        host if the host's file cache for this component doesn't already have
+        a copy with the same MD5 digest, and result files are only retrieved
+        if they differ from the local copy.
+
         .. note::
 
             Input files to be sent to the remote server are defined by
@@ -254,17 +276,19 @@ class ExternalCode(Component):
             self.raise_exception("The command to be executed, '%s', cannot be found" % program_to_execute,
                                  ValueError)
             
-        self._process = \
-            shellproc.ShellProc(self.command, self.stdin,
-                                self.stdout, self.stderr, self.env_vars)
-        self._logger.debug('PID = %d', self._process.pid)
-
-        try:
-            return_code, error_msg = \
-                self._process.wait(self.poll_delay, self.timeout)
-        finally:
-            self._process.close_files()
-            self._process = None
+        with process_slot():
+            self._process = \
+                shellproc.ShellProc(self.command, self.stdin,
+                                    self.stdout, self.stderr, self.env_vars)
+            self._logger.debug('PID = %d', self._process.pid)
+
+            try:
+                with waiting():
+                    return_code, error_msg = \
+                        self._process.wait(self.poll_delay, self.timeout)
+            finally:
+                self._process.close_files()
+                self._process = None
 
         et = time.time() - start_time
         if et >= 60:  #pragma no cover
@@ -351,8 +375,9 @@ class ExternalCode(Component):
             # Run command.
             self._logger.info('executing %s...', self.command)
             start_time = time.time()
-            return_code, error_msg = \
-                self._server.execute_command(rdesc)
+            with waiting():
+                return_code, error_msg = \
+                    self._server.execute_command(rdesc)
             et = time.time() - start_time
             if et >= 60:  #pragma no cover
                 self._logger.info('elapsed time: %.1f sec.', et)
@@ -407,21 +432,32 @@ class ExternalCode(Component):
         self._logger.info('sending inputs...')
         start_time = time.time()
 
-        filename = 'inputs.zip'
-        pfiles, pbytes = pack_zipfile(patterns, filename, self._logger)
-        try:
-            filexfer(None, filename, self._server, filename, 'b', False)
-            ufiles, ubytes = self._server.unpack_zipfile(filename,
-                                                         textfiles=textfiles)
-        finally:
-            os.remove(filename)
-            self._server.remove(filename)
-
-        # Difficult to force file transfer error.
-        if ufiles != pfiles or ubytes != pbytes:  #pragma no cover
-            msg = 'Inputs xfer error: %d:%d vs. %d:%d' \
-                  % (ufiles, ubytes, pfiles, pbytes)
-            self.raise_exception(msg, RuntimeError)
+        if self.delta_transfer:
+            key = self.get_pathname() or self.__class__.__name__
+            digests = self._file_digests(patterns)
+            patterns = self._server.fetch_cached(key, digests)
+            self._logger.debug('    %d of %d files cached',
+                               len(digests)-len(patterns), len(digests))
+
+        if patterns:
+            filename = 'inputs.zip'
+            pfiles, pbytes = pack_zipfile(patterns, filename, self._logger)
+            try:
+                filexfer(None, filename, self._server, filename, 'b', False)
+                ufiles, ubytes = \
+                    self._server.unpack_zipfile(filename, textfiles=textfiles)
+            finally:
+                os.remove(filename)
+                self._server.remove(filename)
+
+            # Difficult to force file transfer error.
+            if ufiles != pfiles or ubytes != pbytes:  #pragma no cover
+                msg = 'Inputs xfer error: %d:%d vs. %d:%d' \
+                      % (ufiles, ubytes, pfiles, pbytes)
+                self.raise_exception(msg, RuntimeError)
+
+        if self.delta_transfer:
+            self._server.store_cached(key, digests)
 
         et = time.time() - start_time
         if et >= 60:  #pragma no cover
@@ -433,7 +469,12 @@ class ExternalCode(Component):
         start_time = time.time()
 
         filename = 'outputs.zip'
-        pfiles, pbytes = self._server.pack_zipfile(patterns, filename)
+        if self.delta_transfer:
+            digests = self._file_digests(patterns)
+            pfiles, pbytes = self._server.pack_zipfile(patterns, filename,
+                                                       digests)
+        else:
+            pfiles, pbytes = self._server.pack_zipfile(patterns, filename)
         filexfer(self._server, filename, None, filename, 'b', False)
 
         # Valid, but empty, file causes unpack_zipfile() problems.
@@ -457,6 +498,16 @@ class ExternalCode(Component):
         if et >= 60:  #pragma no cover
             self._logger.info('elapsed time: %f sec.', et)
 
+    @staticmethod
+    def _file_digests(patterns):
+        """ Returns MD5 digests of local files matching `patterns`. """
+        digests = {}
+        for pattern in patterns:
+            for path in glob.glob(pattern):
+                if os.path.isfile(path):
+                    digests[path] = file_md5(path)
+        return digests
+
     def stop(self):
         """ Stop the external code. """
         self._stop = True
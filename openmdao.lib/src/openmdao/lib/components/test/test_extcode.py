@@ -15,9 +15,10 @@ import nose
 from multiprocessing.managers import RemoteError
 
 from openmdao.main.api import Assembly, FileMetadata, SimulationRoot, set_as_top
+from openmdao.main.concurrency import local_process_limit
 from openmdao.main.eggchecker import check_save_load
 from openmdao.main.exceptions import RunInterrupted
-from openmdao.main.objserverfactory import ObjServerFactory
+from openmdao.main.objserverfactory import ObjServer, ObjServerFactory
 from openmdao.main.rbac import Credentials, get_credentials
 
 from openmdao.lib.components.external_code import ExternalCode
@@ -26,7 +27,7 @@ from openmdao.main.datatypes.api import Int, File, FileRef, Str
 from openmdao.test.cluster import init_cluster
 
 from openmdao.util.testutil import assert_raises
-from openmdao.util.fileutil import onerror
+from openmdao.util.fileutil import file_md5, onerror
 
 
 # Capture original working directory so we can restore in tearDown().
@@ -88,6 +89,24 @@ class Model(Assembly):
         self.connect('b.outfile', 'outfile')
 
 
+class AsyncModel(Assembly):
+    """ Run independent `Unique` component instances concurrently. """
+
+    infile = File(iotype='in', local_path='input')
+
+    def configure(self):
+        self.add('a', Unique())
+        self.add('b', Unique())
+        self.add('c', Unique())
+        self.driver.workflow.add(['a', 'b', 'c'])
+        self.connect('infile', 'a.infile')
+        self.connect('infile', 'b.infile')
+        self.connect('b.outfile', 'c.infile')
+        for comp in (self.a, self.b, self.c):
+            comp.delay = 2
+            comp.async_execute = True
+
+
 class TestCase(unittest.TestCase):
     """ Test the ExternalCode component. """
 
@@ -236,6 +255,19 @@ class TestCase(unittest.TestCase):
         sleeper.stderr = None
         sleeper.run()
 
+        # Only send/retrieve changed files.
+        sleeper.delta_transfer = True
+        cache_dir = ObjServer._cache_dir(sleeper.get_pathname() or 'Sleeper')
+        try:
+            sleeper.run()
+            self.assertTrue(file_md5(INP_FILE) in os.listdir(cache_dir))
+            sleeper.run()
+            with sleeper.outfile.open() as inp:
+                result = inp.read()
+            self.assertEqual(result, INP_DATA)
+        finally:
+            shutil.rmtree(cache_dir, onerror=onerror)
+
     def test_bad_alloc(self):
         logging.debug('')
         logging.debug('test_bad_alloc')
@@ -367,6 +399,31 @@ class TestCase(unittest.TestCase):
             result = inp.read()
         self.assertEqual(result, INP_DATA)
 
+    def test_async(self):
+        logging.debug('')
+        logging.debug('test_async')
+
+        model = set_as_top(AsyncModel())
+        model.infile = FileRef(INP_FILE, model, input=True)
+        start = time.time()
+        model.run()
+        elapsed = time.time() - start
+        logging.debug('elapsed %.1f', elapsed)
+
+        # 'a' and 'b' overlap, 'c' depends on 'b'.
+        for comp in (model.a, model.b, model.c):
+            self.assertEqual(comp.return_code, 0)
+            with comp.outfile.open() as inp:
+                self.assertEqual(inp.read(), INP_DATA)
+        if local_process_limit() > 1:
+            self.assertTrue(elapsed < 5.5)
+
+        # Errors are reported after all have completed.
+        model.a.delay = -1
+        assert_raises(self, 'model.run()', globals(), locals(), RuntimeError,
+                      'a: return_code = 1')
+        self.assertEqual(model.b.return_code, 0)
+
     def test_rsh(self):
         logging.debug('')
         logging.debug('test_rsh')
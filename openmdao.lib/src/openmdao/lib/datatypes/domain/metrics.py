@@ -12,6 +12,8 @@ should be prepared for this.
 
 from math import sqrt
 
+import numpy
+
 from openmdao.units.units import PhysicalQuantity
 
 from openmdao.lib.datatypes.domain.zone import CYLINDRICAL
@@ -43,6 +45,12 @@ def register_metric(name, cls, integrate, geometry='any'):
         :meth:`dimensionalize` is called with the accumulated value.
         It should return a :class:`PhysicalQuantity` for the dimensionalized
         value.
+        `cls` may also provide :meth:`calculate_region`, called with
+        `(loc, geom)` where `loc` is a tuple of slices into the zone variable
+        arrays and `geom` contains arrays of the corresponding normal vector
+        components. It should return an array of the values :meth:`calculate`
+        would return for each location. Surfaces are evaluated with this
+        rather than :meth:`calculate` when available.
 
     integrate: bool
         If True, then calculated values are integrated, not averaged.
@@ -65,6 +73,27 @@ def list_metrics():
     return sorted(_METRICS.keys())
 
 
+def _region(item, loc):
+    """
+    Return the values of the array whose :meth:`item` is `item` over `loc`,
+    a tuple of slices, or a tuple of indices for a single value.
+    Values are float64, like those returned by `item`.
+    """
+    return numpy.asarray(item.__self__[loc], dtype=numpy.float64)
+
+
+class _RegionMetric(object):
+    """
+    Base for metrics whose formula is only written in
+    :meth:`calculate_region`, in a form that works on arrays or on the
+    values at a single location.
+    """
+
+    def calculate(self, loc, geom):
+        """ Return metric value. """
+        return float(self.calculate_region(loc, geom))
+
+
 def create_scalar_metric(var_name):
     """
     Creates a minimal metric calculation class for `var_name` and registers it.
@@ -74,15 +103,15 @@ def create_scalar_metric(var_name):
     """
     cls_name = var_name.capitalize()
     exec '''
-class %(cls_name)s(object):
+class %(cls_name)s(_RegionMetric):
     """ Computes %(var_name)s. """
 
     def __init__(self, zone, zone_name, reference_state):
         self.%(var_name)s = zone.flow_solution.%(var_name)s.item
 
-    def calculate(self, loc, length):
-        """ Return metric value. """
-        return self.%(var_name)s(*loc)
+    def calculate_region(self, loc, geom):
+        """ Return array of metric values over `loc`. """
+        return _region(self.%(var_name)s, loc)
 
     def dimensionalize(self, value):
         """ Return dimensional `value`. """
@@ -92,7 +121,7 @@ register_metric('%(var_name)s', %(cls_name)s, False, 'any')
 ''' % {'var_name': var_name, 'cls_name': cls_name}
 
 
-class Area(object):
+class Area(_RegionMetric):
     """ Computes area of mesh surface. """
 
     def __init__(self, zone, zone_name, reference_state):
@@ -108,13 +137,10 @@ class Area(object):
             self.units = aref.get_unit_name()
             self.aref = aref.value
 
-    def calculate(self, loc, normal):
-        """ Return metric value. """
-        sc1, sc2, sc3 = normal
-        sc1 *= self.aref
-        sc2 *= self.aref
-        sc3 *= self.aref
-        return sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3)
+    def calculate_region(self, loc, normal):
+        """ Return array of metric values over `loc`. """
+        sc1, sc2, sc3 = [sc * self.aref for sc in normal]
+        return numpy.sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3)
 
     def dimensionalize(self, value):
         """ Return dimensional `value`. """
@@ -149,7 +175,7 @@ class Length(object):
 register_metric('length', Length, True, 'curve')
 
 
-class MassFlow(object):
+class MassFlow(_RegionMetric):
     """ Computes mass flow across a mesh surface. """
 
     def __init__(self, zone, zone_name, reference_state):
@@ -194,15 +220,12 @@ class MassFlow(object):
             self.mom_c2 = None if momentum.y is None else momentum.y.item
             self.mom_c3 = None if momentum.z is None else momentum.z.item
 
-    def calculate(self, loc, normal):
-        """ Return metric value. """
-        rvu = 0. if self.mom_c1 is None else self.mom_c1(*loc) * self.momref
-        rvv = 0. if self.mom_c2 is None else self.mom_c2(*loc) * self.momref
-        rvw = 0. if self.mom_c3 is None else self.mom_c3(*loc) * self.momref
-        sc1, sc2, sc3 = normal
-        sc1 *= self.aref
-        sc2 *= self.aref
-        sc3 *= self.aref
+    def calculate_region(self, loc, normal):
+        """ Return array of metric values over `loc`. """
+        rvu = 0. if self.mom_c1 is None else _region(self.mom_c1, loc) * self.momref
+        rvv = 0. if self.mom_c2 is None else _region(self.mom_c2, loc) * self.momref
+        rvw = 0. if self.mom_c3 is None else _region(self.mom_c3, loc) * self.momref
+        sc1, sc2, sc3 = [sc * self.aref for sc in normal]
         return rvu*sc1 + rvv*sc2 + rvw*sc3
 
     def dimensionalize(self, value):
@@ -212,7 +235,7 @@ class MassFlow(object):
 register_metric('mass_flow', MassFlow, True, 'surface')
 
 
-class CorrectedMassFlow(object):
+class CorrectedMassFlow(_RegionMetric):
     """ Computes corrected mass flow across a mesh surface. """
 
     def __init__(self, zone, zone_name, reference_state):
@@ -279,21 +302,18 @@ class CorrectedMassFlow(object):
             self.mom_c2 = None if momentum.y is None else momentum.y.item
             self.mom_c3 = None if momentum.z is None else momentum.z.item
 
-    def calculate(self, loc, normal):
-        """ Return metric value. """
-        rho = self.density(*loc) * self.rhoref
-        rvu = 0. if self.mom_c1 is None else self.mom_c1(*loc) * self.momref
-        rvv = 0. if self.mom_c2 is None else self.mom_c2(*loc) * self.momref
-        rvw = 0. if self.mom_c3 is None else self.mom_c3(*loc) * self.momref
-        ps = self.pressure(*loc) * self.pref
+    def calculate_region(self, loc, normal):
+        """ Return array of metric values over `loc`. """
+        rho = _region(self.density, loc) * self.rhoref
+        rvu = 0. if self.mom_c1 is None else _region(self.mom_c1, loc) * self.momref
+        rvv = 0. if self.mom_c2 is None else _region(self.mom_c2, loc) * self.momref
+        rvw = 0. if self.mom_c3 is None else _region(self.mom_c3, loc) * self.momref
+        ps = _region(self.pressure, loc) * self.pref
         if self.gam is not None:
-            gamma = self.gam(*loc)
+            gamma = _region(self.gam, loc)
         else:
             gamma = self.gamma
-        sc1, sc2, sc3 = normal
-        sc1 *= self.aref
-        sc2 *= self.aref
-        sc3 *= self.aref
+        sc1, sc2, sc3 = [sc * self.aref for sc in normal]
         w = rvu*sc1 + rvv*sc2 + rvw*sc3
 
         u2 = (rvu*rvu + rvv*rvv + rvw*rvw) / (rho*rho)
@@ -304,7 +324,7 @@ class CorrectedMassFlow(object):
 
         pt = ps * pow(1. + (gamma-1.)/2. * mach2, gamma/(gamma-1.))
 
-        return w * sqrt(tt/self.tstd) / (pt/self.pstd)
+        return w * numpy.sqrt(tt/self.tstd) / (pt/self.pstd)
 
     def dimensionalize(self, value):
         """ Dimensionalize `value`. """
@@ -313,7 +333,7 @@ class CorrectedMassFlow(object):
 register_metric('corrected_mass_flow', CorrectedMassFlow, True, 'surface')
 
 
-class StaticPressure(object):
+class StaticPressure(_RegionMetric):
     """ Computes weighted static pressure for a mesh region. """
 
     def __init__(self, zone, zone_name, reference_state):
@@ -384,18 +404,18 @@ class StaticPressure(object):
                 self.mom_c2 = None if momentum.y is None else momentum.y.item
                 self.mom_c3 = None if momentum.z is None else momentum.z.item
 
-    def calculate(self, loc, geom):
-        """ Return metric value. """
+    def calculate_region(self, loc, geom):
+        """ Return array of metric values over `loc`. """
         if self.pressure is not None:
-            return self.pressure(*loc) * self.pref
+            return _region(self.pressure, loc) * self.pref
         else:
-            rho = self.density(*loc) * self.rhoref
-            vu = 0. if self.mom_c1 is None else self.mom_c1(*loc) * self.momref / rho
-            vv = 0. if self.mom_c2 is None else self.mom_c2(*loc) * self.momref / rho
-            vw = 0. if self.mom_c3 is None else self.mom_c3(*loc) * self.momref / rho
-            e0 = self.energy(*loc) * self.e0ref / rho
+            rho = _region(self.density, loc) * self.rhoref
+            vu = 0. if self.mom_c1 is None else _region(self.mom_c1, loc) * self.momref / rho
+            vv = 0. if self.mom_c2 is None else _region(self.mom_c2, loc) * self.momref / rho
+            vw = 0. if self.mom_c3 is None else _region(self.mom_c3, loc) * self.momref / rho
+            e0 = _region(self.energy, loc) * self.e0ref / rho
             if self.gam is not None:
-                gamma = self.gam(*loc)
+                gamma = _region(self.gam, loc)
             else:
                 gamma = self.gamma
 
@@ -408,7 +428,7 @@ class StaticPressure(object):
 register_metric('pressure', StaticPressure, False)
 
 
-class TotalPressure(object):
+class TotalPressure(_RegionMetric):
     """ Computes weighted total pressure for a mesh region. """
 
     def __init__(self, zone, zone_name, reference_state):
@@ -476,22 +496,22 @@ class TotalPressure(object):
             self.mom_c2 = None if momentum.y is None else momentum.y.item
             self.mom_c3 = None if momentum.z is None else momentum.z.item
 
-    def calculate(self, loc, geom):
-        """ Return metric value. """
-        rho = self.density(*loc) * self.rhoref
-        vu = 0. if self.mom_c1 is None else self.mom_c1(*loc) * self.momref / rho
-        vv = 0. if self.mom_c2 is None else self.mom_c2(*loc) * self.momref / rho
-        vw = 0. if self.mom_c3 is None else self.mom_c3(*loc) * self.momref / rho
+    def calculate_region(self, loc, geom):
+        """ Return array of metric values over `loc`. """
+        rho = _region(self.density, loc) * self.rhoref
+        vu = 0. if self.mom_c1 is None else _region(self.mom_c1, loc) * self.momref / rho
+        vv = 0. if self.mom_c2 is None else _region(self.mom_c2, loc) * self.momref / rho
+        vw = 0. if self.mom_c3 is None else _region(self.mom_c3, loc) * self.momref / rho
         if self.gam is not None:
-            gamma = self.gam(*loc)
+            gamma = _region(self.gam, loc)
         else:
             gamma = self.gamma
 
         u2 = vu*vu + vv*vv + vw*vw
         if self.pressure is not None:
-            ps = self.pressure(*loc) * self.pref
+            ps = _region(self.pressure, loc) * self.pref
         else:
-            e0 = self.energy(*loc) * self.e0ref / rho
+            e0 = _region(self.energy, loc) * self.e0ref / rho
             ps = (gamma-1.) * rho * (e0 - 0.5*u2)
         a2 = (gamma * ps) / rho
         mach2 = u2 / a2
@@ -504,7 +524,7 @@ class TotalPressure(object):
 register_metric('pressure_stagnation', TotalPressure, False)
 
 
-class StaticTemperature(object):
+class StaticTemperature(_RegionMetric):
     """ Computes weighted static temperature for a mesh region. """
 
     def __init__(self, zone, zone_name, reference_state):
@@ -577,18 +597,18 @@ class StaticTemperature(object):
                 self.mom_c2 = None if momentum.y is None else momentum.y.item
                 self.mom_c3 = None if momentum.z is None else momentum.z.item
 
-    def calculate(self, loc, geom):
-        """ Return metric value. """
-        rho = self.density(*loc) * self.rhoref
+    def calculate_region(self, loc, geom):
+        """ Return array of metric values over `loc`. """
+        rho = _region(self.density, loc) * self.rhoref
         if self.pressure is not None:
-            ps = self.pressure(*loc) * self.pref
+            ps = _region(self.pressure, loc) * self.pref
         else:
-            vu = 0. if self.mom_c1 is None else self.mom_c1(*loc) * self.momref / rho
-            vv = 0. if self.mom_c2 is None else self.mom_c2(*loc) * self.momref / rho
-            vw = 0. if self.mom_c3 is None else self.mom_c3(*loc) * self.momref / rho
-            e0 = self.energy(*loc) * self.e0ref / rho
+            vu = 0. if self.mom_c1 is None else _region(self.mom_c1, loc) * self.momref / rho
+            vv = 0. if self.mom_c2 is None else _region(self.mom_c2, loc) * self.momref / rho
+            vw = 0. if self.mom_c3 is None else _region(self.mom_c3, loc) * self.momref / rho
+            e0 = _region(self.energy, loc) * self.e0ref / rho
             if self.gam is not None:
-                gamma = self.gam(*loc)
+                gamma = _region(self.gam, loc)
             else:
                 gamma = self.gamma
             ps = (gamma-1.) * rho * (e0 - 0.5*(vu*vu + vv*vv + vw*vw))
@@ -601,7 +621,7 @@ class StaticTemperature(object):
 register_metric('temperature', StaticTemperature, False)
 
 
-class TotalTemperature(object):
+class TotalTemperature(_RegionMetric):
     """ Computes weighted total temperature for a mesh region. """
 
     def __init__(self, zone, zone_name, reference_state):
@@ -670,22 +690,22 @@ class TotalTemperature(object):
             self.mom_c2 = None if momentum.y is None else momentum.y.item
             self.mom_c3 = None if momentum.z is None else momentum.z.item
 
-    def calculate(self, loc, geom):
-        """ Return metric value. """
-        rho = self.density(*loc) * self.rhoref
-        vu = 0. if self.mom_c1 is None else self.mom_c1(*loc) * self.momref / rho
-        vv = 0. if self.mom_c2 is None else self.mom_c2(*loc) * self.momref / rho
-        vw = 0. if self.mom_c3 is None else self.mom_c3(*loc) * self.momref / rho
+    def calculate_region(self, loc, geom):
+        """ Return array of metric values over `loc`. """
+        rho = _region(self.density, loc) * self.rhoref
+        vu = 0. if self.mom_c1 is None else _region(self.mom_c1, loc) * self.momref / rho
+        vv = 0. if self.mom_c2 is None else _region(self.mom_c2, loc) * self.momref / rho
+        vw = 0. if self.mom_c3 is None else _region(self.mom_c3, loc) * self.momref / rho
         if self.gam is not None:
-            gamma = self.gam(*loc)
+            gamma = _region(self.gam, loc)
         else:
             gamma = self.gamma
 
         u2 = vu*vu + vv*vv + vw*vw
         if self.pressure is not None:
-            ps = self.pressure(*loc) * self.pref
+            ps = _region(self.pressure, loc) * self.pref
         else:
-            e0 = self.energy(*loc) * self.e0ref / rho
+            e0 = _region(self.energy, loc) * self.e0ref / rho
             ps = (gamma-1.) * rho * (e0 - 0.5*u2)
         a2 = (gamma * ps) / rho
         mach2 = u2 / a2
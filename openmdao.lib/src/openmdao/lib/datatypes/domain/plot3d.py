@@ -32,11 +32,24 @@ unformatted: bool
 logger: Logger or None
     Used to record progress.
 
+lazy: bool
+    If True, then arrays are read-on-demand views of a :class:`numpy.memmap`
+    of the file rather than being read into memory. Non-native byte order
+    is handled by the view's dtype, so data is byteswapped on access.
+    Modifications are kept in memory and never written back to the file.
+    Only meaningful when reading and if `binary`.
+
+zones: list(string) or None
+    If not None, then only the named zones (of the form ``zone_N``, numbered
+    from 1 in file order) are read. Other zones are skipped.
+
 Default argument values are set for a typical 3D multiblock single-precision
 Fortran unformatted file.  When writing, zones are assumed in Cartesian
 coordinates with data located at the vertices.
 """
 
+import os
+
 import numpy
 
 from openmdao.util.log import NullLogger
@@ -46,10 +59,13 @@ from openmdao.lib.datatypes.domain.domain import DomainObj
 from openmdao.lib.datatypes.domain.zone import Zone
 from openmdao.lib.datatypes.domain.vector import Vector
 
+_Q_VARIABLES = ('density', 'momentum', 'energy_stagnation_density')
+
 
 def read_plot3d_q(grid_file, q_file, multiblock=True, dim=3, blanking=False,
                   planes=False, binary=True, big_endian=False,
-                  single_precision=True, unformatted=True, logger=None):
+                  single_precision=True, unformatted=True, logger=None,
+                  lazy=False, zones=None, variables=None):
     """
     Returns a :class:`DomainObj` initialized from Plot3D `grid_file` and
     `q_file`.  Q variables are assigned to 'density', 'momentum', and
@@ -61,26 +77,36 @@ def read_plot3d_q(grid_file, q_file, multiblock=True, dim=3, blanking=False,
 
     q_file: string
         Q data filename.
+
+    variables: list(string) or None
+        If not None, then only these Q variables are read.
     """
     logger = logger or NullLogger()
 
-    domain = read_plot3d_grid(grid_file, multiblock, dim, blanking, planes,
-                              binary, big_endian, single_precision,
-                              unformatted, logger)
+    if variables is not None:
+        unknown = [name for name in variables if name not in _Q_VARIABLES]
+        if unknown:
+            raise ValueError('unknown Q variables %s' % unknown)
+
+    domain, shape = _read_plot3d_grid(grid_file, multiblock, dim, blanking,
+                                      planes, binary, big_endian,
+                                      single_precision, unformatted, logger,
+                                      lazy, zones)
 
     mode = 'rb' if binary else 'r'
     with open(q_file, mode) as inp:
         logger.info('reading Q file %r', q_file)
         stream = Stream(inp, binary, big_endian, single_precision, False,
                         unformatted, False)
+        raw = _map_file(q_file, stream, lazy)
         if multiblock:
             # Read number of zones.
             nblocks = stream.read_int(full_record=True)
         else:
             nblocks = 1
-        if nblocks != len(domain.zones):
+        if nblocks != len(shape):
             raise RuntimeError('Q zones %d != Grid zones %d'
-                               % (nblocks, len(domain.zones)))
+                               % (nblocks, len(shape)))
 
         # Read zone dimensions.
         if unformatted:
@@ -89,19 +115,19 @@ def read_plot3d_q(grid_file, q_file, multiblock=True, dim=3, blanking=False,
             if reclen != expected:
                 logger.warning('unexpected dimensions recordlength'
                                ' %d vs. %d', reclen, expected)
-        for zone in domain.zones:
-            name = domain.zone_name(zone)
+        for i in range(nblocks):
+            name = 'zone_%d' % (i+1)
             imax, jmax, kmax = _read_plot3d_dims(stream, dim)
             if dim > 2:
                 logger.debug('    %s: %dx%dx%d', name, imax, jmax, kmax)
-                zone_i, zone_j, zone_k = zone.shape
+                zone_i, zone_j, zone_k = shape[i]
                 if imax != zone_i or jmax != zone_j or kmax != zone_k:
                     raise RuntimeError('%s: Q %dx%dx%d != Grid %dx%dx%d'
                                        % (name, imax, jmax, kmax,
                                           zone_i, zone_j, zone_k))
             else:
                 logger.debug('    %s: %dx%d', name, imax, jmax)
-                zone_i, zone_j = zone.shape
+                zone_i, zone_j = shape[i]
                 if imax != zone_i or jmax != zone_j:
                     raise RuntimeError('%s: Q %dx%d != Grid %dx%d'
                                        % (name, imax, jmax, zone_i, zone_j))
@@ -112,18 +138,24 @@ def read_plot3d_q(grid_file, q_file, multiblock=True, dim=3, blanking=False,
                                ' %d vs. %d', reclen2, reclen)
 
         # Read zone scalars and variables.
-        for zone in domain.zones:
-            name = domain.zone_name(zone)
-            logger.debug('reading data for %s', name)
+        for i in range(nblocks):
+            name = 'zone_%d' % (i+1)
+            zone = getattr(domain, name, None)
+            if zone is None:
+                logger.debug('skipping data for %s', name)
+            else:
+                logger.debug('reading data for %s', name)
             _read_plot3d_qscalars(zone, stream, logger)
-            _read_plot3d_qvars(zone, stream, planes, logger)
+            _read_plot3d_qvars(zone, stream, shape[i], planes, variables,
+                               raw, logger)
 
     return domain
 
 
 def read_plot3d_f(grid_file, f_file, varnames=None, multiblock=True, dim=3,
                   blanking=False, planes=False, binary=True, big_endian=False,
-                  single_precision=True, unformatted=True, logger=None):
+                  single_precision=True, unformatted=True, logger=None,
+                  lazy=False, zones=None, variables=None):
     """
     Returns a :class:`DomainObj` initialized from Plot3D `grid_file` and
     `f_file`.  Variables are assigned to names of the form `f_N`.
@@ -133,26 +165,34 @@ def read_plot3d_f(grid_file, f_file, varnames=None, multiblock=True, dim=3,
 
     f_file: string
         Function data filename.
+
+    varnames: list(string) or None
+        Names to assign to the variables, in file order.
+
+    variables: list(string) or None
+        If not None, then only these variables (by assigned name) are read.
     """
     logger = logger or NullLogger()
 
-    domain = read_plot3d_grid(grid_file, multiblock, dim, blanking, planes,
-                              binary, big_endian, single_precision,
-                              unformatted, logger)
+    domain, shape = _read_plot3d_grid(grid_file, multiblock, dim, blanking,
+                                      planes, binary, big_endian,
+                                      single_precision, unformatted, logger,
+                                      lazy, zones)
 
     mode = 'rb' if binary else 'r'
     with open(f_file, mode) as inp:
         logger.info('reading F file %r', f_file)
         stream = Stream(inp, binary, big_endian, single_precision, False,
                         unformatted, False)
+        raw = _map_file(f_file, stream, lazy)
         if multiblock:
             # Read number of zones.
             nblocks = stream.read_int(full_record=True)
         else:
             nblocks = 1
-        if nblocks != len(domain.zones):
+        if nblocks != len(shape):
             raise RuntimeError('F zones %d != Grid zones %d'
-                               % (nblocks, len(domain.zones)))
+                               % (nblocks, len(shape)))
 
         # Read zone dimensions.
         if unformatted:
@@ -161,20 +201,20 @@ def read_plot3d_f(grid_file, f_file, varnames=None, multiblock=True, dim=3,
             if reclen != expected:
                 logger.warning('unexpected dimensions recordlength'
                                ' %d vs. %d', reclen, expected)
-        for zone in domain.zones:
-            name = domain.zone_name(zone)
+        for i in range(nblocks):
+            name = 'zone_%d' % (i+1)
             imax, jmax, kmax, nvars = _read_plot3d_dims(stream, dim, True)
             if dim > 2:
                 logger.debug('    %s: %dx%dx%d %d',
                              name, imax, jmax, kmax, nvars)
-                zone_i, zone_j, zone_k = zone.shape
+                zone_i, zone_j, zone_k = shape[i]
                 if imax != zone_i or jmax != zone_j or kmax != zone_k:
                     raise RuntimeError('%s: F %dx%dx%d != Grid %dx%dx%d'
                                        % (name, imax, jmax, kmax,
                                           zone_i, zone_j, zone_k))
             else:
                 logger.debug('    %s: %dx%d %d', name, imax, jmax, nvars)
-                zone_i, zone_j = zone.shape
+                zone_i, zone_j = shape[i]
                 if imax != zone_i or jmax != zone_j:
                     raise RuntimeError('%s: F %dx%d != Grid %dx%d'
                                        % (name, imax, jmax, zone_i, zone_j))
@@ -185,17 +225,22 @@ def read_plot3d_f(grid_file, f_file, varnames=None, multiblock=True, dim=3,
                                ' %d vs. %d', reclen2, reclen)
 
         # Read zone variables.
-        for zone in domain.zones:
-            name = domain.zone_name(zone)
-            logger.debug('reading data for %s', name)
-            _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes,
-                               logger)
+        for i in range(nblocks):
+            name = 'zone_%d' % (i+1)
+            zone = getattr(domain, name, None)
+            if zone is None:
+                logger.debug('skipping data for %s', name)
+            else:
+                logger.debug('reading data for %s', name)
+            _read_plot3d_fvars(zone, stream, shape[i], nvars, varnames,
+                               variables, planes, raw, logger)
     return domain
 
 
 def read_plot3d_grid(grid_file, multiblock=True, dim=3, blanking=False,
                      planes=False, binary=True, big_endian=False,
-                     single_precision=True, unformatted=True, logger=None):
+                     single_precision=True, unformatted=True, logger=None,
+                     lazy=False, zones=None):
     """
     Returns a :class:`DomainObj` initialized from Plot3D `grid_file`.
 
@@ -203,6 +248,18 @@ def read_plot3d_grid(grid_file, multiblock=True, dim=3, blanking=False,
         Grid filename.
     """
     logger = logger or NullLogger()
+    return _read_plot3d_grid(grid_file, multiblock, dim, blanking, planes,
+                             binary, big_endian, single_precision,
+                             unformatted, logger, lazy, zones)[0]
+
+
+def _read_plot3d_grid(grid_file, multiblock, dim, blanking, planes, binary,
+                      big_endian, single_precision, unformatted, logger,
+                      lazy, zones):
+    """
+    Returns ``(domain, shape)`` from Plot3D `grid_file`, where `shape` is
+    the list of dimensions for all zones in the file, including skipped ones.
+    """
     domain = DomainObj()
 
     mode = 'rb' if binary else 'r'
@@ -210,18 +267,28 @@ def read_plot3d_grid(grid_file, multiblock=True, dim=3, blanking=False,
         logger.info('reading grid file %r', grid_file)
         stream = Stream(inp, binary, big_endian, single_precision, False,
                         unformatted, False)
+        raw = _map_file(grid_file, stream, lazy)
 
         # Read zone dimensions.
         shape = _read_plot3d_shape(stream, multiblock, dim, logger)
 
+        names = ['zone_%d' % (i+1) for i in range(len(shape))]
+        if zones is not None:
+            unknown = [name for name in zones if name not in names]
+            if unknown:
+                raise ValueError('unknown zones %s' % unknown)
+
         # Read zone coordinates.
-        for i in range(len(shape)):
-            zone = domain.add_zone('', Zone())
-            name = domain.zone_name(zone)
-            logger.debug('reading coordinates for %s', name)
+        for i, name in enumerate(names):
+            if zones is None or name in zones:
+                zone = domain.add_zone(name, Zone())
+                logger.debug('reading coordinates for %s', name)
+            else:
+                zone = None
+                logger.debug('skipping coordinates for %s', name)
             _read_plot3d_coords(zone, stream, shape[i], blanking, planes,
-                                logger)
-    return domain
+                                raw, logger)
+    return (domain, shape)
 
 
 def read_plot3d_shape(grid_file, multiblock=True, dim=3, binary=True,
@@ -311,8 +378,11 @@ def _read_plot3d_dims(stream, dim, f_file=False):
         return (imax, jmax, kmax)
 
 
-def _read_plot3d_coords(zone, stream, shape, blanking, planes, logger):
-    """ Reads coordinates (& blanking) from given Plot3D stream. """
+def _read_plot3d_coords(zone, stream, shape, blanking, planes, raw, logger):
+    """
+    Reads coordinates (& blanking) from given Plot3D stream.
+    If `zone` is None, the coordinates are skipped.
+    """
     if blanking:
         raise NotImplementedError('blanking not supported yet')
 
@@ -332,18 +402,17 @@ def _read_plot3d_coords(zone, stream, shape, blanking, planes, logger):
             logger.warning('unexpected coords recordlength'
                            ' %d vs. %d', reclen, expected)
 
-    zone.grid_coordinates.x = stream.read_floats(shape, order='Fortran')
-    logger.debug('    x min %g, max %g',
-                 zone.grid_coordinates.x.min(), zone.grid_coordinates.x.max())
-
-    zone.grid_coordinates.y = stream.read_floats(shape, order='Fortran')
-    logger.debug('    y min %g, max %g',
-                 zone.grid_coordinates.y.min(), zone.grid_coordinates.y.max())
-
+    skip = zone is None
+    x = _read_plot3d_array(stream, shape, raw, 'x', skip, logger)
+    y = _read_plot3d_array(stream, shape, raw, 'y', skip, logger)
     if dim > 2:
-        zone.grid_coordinates.z = stream.read_floats(shape, order='Fortran')
-        logger.debug('    z min %g, max %g',
-                     zone.grid_coordinates.z.min(), zone.grid_coordinates.z.max())
+        z = _read_plot3d_array(stream, shape, raw, 'z', skip, logger)
+
+    if not skip:
+        zone.grid_coordinates.x = x
+        zone.grid_coordinates.y = y
+        if dim > 2:
+            zone.grid_coordinates.z = z
 
     if stream.unformatted:
         reclen2 = stream.read_recordmark()
@@ -353,8 +422,13 @@ def _read_plot3d_coords(zone, stream, shape, blanking, planes, logger):
 
 
 def _read_plot3d_qscalars(zone, stream, logger):
-    """ Reads Mach number, alpha, Reynolds number, and time. """
+    """
+    Reads Mach number, alpha, Reynolds number, and time.
+    If `zone` is None, the scalars are skipped.
+    """
     mach, alpha, reynolds, time = stream.read_floats(4, full_record=True)
+    if zone is None:
+        return
     logger.debug('    mach %g, alpha %g, reynolds %g, time %g',
                  mach, alpha, reynolds, time)
     zone.flow_solution.mach = mach
@@ -363,13 +437,19 @@ def _read_plot3d_qscalars(zone, stream, logger):
     zone.flow_solution.time = time
 
 
-def _read_plot3d_qvars(zone, stream, planes, logger):
-    """ Reads 'density', 'momentum' and 'energy_stagnation_density'. """
+def _read_plot3d_qvars(zone, stream, shape, planes, variables, raw, logger):
+    """
+    Reads 'density', 'momentum' and 'energy_stagnation_density'.
+    Variables not in `variables` (if not None), or all variables if `zone`
+    is None, are skipped.
+    """
     if planes:
         raise NotImplementedError('planar format not supported yet')
 
-    shape = zone.shape
     dim = len(shape)
+    skip = dict([(name, zone is None or
+                        (variables is not None and name not in variables))
+                 for name in _Q_VARIABLES])
 
     if stream.unformatted: 
         if dim > 2:
@@ -384,28 +464,26 @@ def _read_plot3d_qvars(zone, stream, planes, logger):
             logger.warning('unexpected Q variables recordlength'
                            ' %d vs. %d', reclen, expected)
     name = 'density'
-    arr = stream.read_floats(shape, order='Fortran')
-    logger.debug('    %s min %g, max %g', name, arr.min(), arr.max())
-    zone.flow_solution.add_array(name, arr)
+    arr = _read_plot3d_array(stream, shape, raw, name, skip[name], logger)
+    if not skip[name]:
+        zone.flow_solution.add_array(name, arr)
 
+    name = 'momentum'
     vec = Vector()
-
-    vec.x = stream.read_floats(shape, order='Fortran')
-    logger.debug('    momentum.x min %g, max %g', vec.x.min(), vec.x.max())
-
-    vec.y = stream.read_floats(shape, order='Fortran')
-    logger.debug('    momentum.y min %g, max %g', vec.y.min(), vec.y.max())
-
+    vec.x = _read_plot3d_array(stream, shape, raw, 'momentum.x', skip[name],
+                               logger)
+    vec.y = _read_plot3d_array(stream, shape, raw, 'momentum.y', skip[name],
+                               logger)
     if dim > 2:
-        vec.z = stream.read_floats(shape, order='Fortran')
-        logger.debug('    momentum.z min %g, max %g', vec.z.min(), vec.z.max())
-
-    zone.flow_solution.add_vector('momentum', vec)
+        vec.z = _read_plot3d_array(stream, shape, raw, 'momentum.z',
+                                   skip[name], logger)
+    if not skip[name]:
+        zone.flow_solution.add_vector(name, vec)
 
     name = 'energy_stagnation_density'
-    arr = stream.read_floats(shape, order='Fortran')
-    logger.debug('    %s min %g, max %g', name, arr.min(), arr.max())
-    zone.flow_solution.add_array(name, arr)
+    arr = _read_plot3d_array(stream, shape, raw, name, skip[name], logger)
+    if not skip[name]:
+        zone.flow_solution.add_array(name, arr)
 
     if stream.unformatted:
         reclen2 = stream.read_recordmark()
@@ -414,12 +492,16 @@ def _read_plot3d_qvars(zone, stream, planes, logger):
                            ' %d vs. %d', reclen2, reclen)
 
 
-def _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes, logger):
-    """ Reads 'function' variables. """
+def _read_plot3d_fvars(zone, stream, shape, nvars, varnames, variables,
+                       planes, raw, logger):
+    """
+    Reads 'function' variables.
+    Variables not in `variables` (if not None), or all variables if `zone`
+    is None, are skipped.
+    """
     if planes:
         raise NotImplementedError('planar format not supported yet')
 
-    shape = zone.shape
     dim = len(shape)
 
     if stream.unformatted: 
@@ -439,9 +521,11 @@ def _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes, logger):
             name = varnames[i]
         else:
             name = 'f_%d' % (i+1)
-        arr = stream.read_floats(shape, order='Fortran')
-        zone.flow_solution.add_array(name, arr)
-        logger.debug('    %s min %g, max %g', name, arr.min(), arr.max())
+        skip = zone is None or (variables is not None and
+                                name not in variables)
+        arr = _read_plot3d_array(stream, shape, raw, name, skip, logger)
+        if not skip:
+            zone.flow_solution.add_array(name, arr)
 
     if stream.unformatted:
         reclen2 = stream.read_recordmark()
@@ -450,6 +534,46 @@ def _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes, logger):
                            ' %d vs. %d', reclen2, reclen)
 
 
+def _map_file(filename, stream, lazy):
+    """
+    Returns a copy-on-write :class:`numpy.memmap` of `filename` if `lazy`
+    and `stream` is binary, else None.
+    """
+    if lazy and stream.binary:
+        return numpy.memmap(filename, dtype=numpy.uint8, mode='c')
+    return None
+
+
+def _read_plot3d_array(stream, shape, raw, name, skip, logger):
+    """
+    Returns next float array of `shape` from Plot3D `stream`, or None if
+    `skip`. If `raw` is not None, the array is a view of that file mapping
+    and only the file position of `stream` is advanced. Skipped binary data
+    is not read.
+    """
+    if stream.binary and (raw is not None or skip):
+        count = 1
+        for size in shape:
+            count *= size
+        offset = stream.file.tell()
+        nbytes = stream.reclen_floats(count)
+        stream.file.seek(nbytes, os.SEEK_CUR)
+        if skip:
+            return None
+        dtype = numpy.dtype(numpy.float32 if stream.single_precision
+                                          else numpy.float64)
+        dtype = dtype.newbyteorder('>' if stream.big_endian else '<')
+        arr = raw[offset:offset+nbytes].view(dtype).reshape(shape, order='F')
+        logger.debug('    %s mapped at offset %d', name, offset)
+        return arr
+
+    arr = stream.read_floats(shape, order='Fortran')
+    if skip:
+        return None
+    logger.debug('    %s min %g, max %g', name, arr.min(), arr.max())
+    return arr
+
+
 def write_plot3d_q(domain, grid_file, q_file, planes=False, binary=True,
                    big_endian=False, single_precision=True, unformatted=True,
                    logger=None):
@@ -5,12 +5,42 @@ regions in a domain.
 
 from math import cos, sin, sqrt
 
+import numpy
+
 from openmdao.lib.datatypes.domain.flow import CELL_CENTER
 from openmdao.lib.datatypes.domain.zone import CYLINDRICAL
 from openmdao.lib.datatypes.domain.metrics import get_metric, list_metrics, \
                                                   create_scalar_metric
 _SCHEMES = ('area', 'mass')
 
+# Index offsets of the points defining the diagonals of a face (or 2D cell),
+# relative to its lowest indexed vertex, and the scale applied to their
+# cross product: (diag1_end, diag1_start, diag2_end, diag2_start, scale).
+_FACE_DIAGONALS = {
+    'i': ((0, 1, 0), (0, 0, 1), (0, 1, 1), (0, 0, 0), -0.5),
+    'j': ((1, 0, 0), (0, 0, 1), (1, 0, 1), (0, 0, 0), 0.5),
+    'k': ((0, 1, 0), (1, 0, 0), (1, 1, 0), (0, 0, 0), 0.5),
+    'cell': ((0, 1), (1, 0), (1, 1), (0, 0), 0.5),
+}
+
+# Index offsets of the cell centers sharing a face (or of a 2D cell's
+# center), relative to the face's lowest indexed vertex.
+# FIXME: built-in ghosts
+_FACE_CELLS = {
+    'i': ((1, 1, 1), (0, 1, 1)),
+    'j': ((1, 1, 1), (1, 0, 1)),
+    'k': ((1, 1, 1), (1, 1, 0)),
+    'cell': ((1, 1),),
+}
+
+# Index offsets of the vertices of a face (or 2D cell).
+_FACE_NODES = {
+    'i': ((0, 0, 0), (0, 1, 0), (0, 1, 1), (0, 0, 1)),
+    'j': ((0, 0, 0), (1, 0, 0), (1, 0, 1), (0, 0, 1)),
+    'k': ((0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)),
+    'cell': ((0, 0), (0, 1), (1, 1), (1, 0)),
+}
+
 # TODO: account for ghost cells in index calculations.
 
 
@@ -48,6 +78,9 @@ def mesh_probe(domain, regions, variables, weighting_scheme='area'):
         face get equal weight. This will lead to inaccuracies for highly
         irregular grids.
 
+    Surfaces are evaluated with whole-array operations if the metric class
+    provides :meth:`calculate_region` (see :meth:`register_metric`),
+    otherwise face by face.
     """
     # Check validity of region specifications.
     _regions = _check_regions(domain, regions)
@@ -254,12 +287,12 @@ def _calc_weights(scheme, domain, regions):
 
         zone_name = region[0]
         zone = getattr(domain, zone_name)
-        zone_weights *= zone.symmetry_instances  # Adjust for symmetry.
         if zone_name in weights:
             raise RuntimeError('Zone %r used more than once' % zone_name)
         else:
             weights[zone_name] = zone_weights
-        weight_total += sum(zone_weights)
+        # Adjust for symmetry.
+        weight_total += float(numpy.sum(zone_weights)) * zone.symmetry_instances
 
     return (weights, weight_total)
 
@@ -279,54 +312,28 @@ def _surface_weights_3d(scheme, domain, region):
     cell_center = flow.grid_location == CELL_CENTER
 
     if cylindrical:
-        c1 = grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
+        c1, c2, c3 = grid.z, grid.r, grid.t
     else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = grid.z.item
+        c1, c2, c3 = grid.x, grid.y, grid.z
 
     if scheme == 'mass':
         try:
             if cylindrical:
-                mom_c1 = flow.momentum.z.item
-                mom_c2 = flow.momentum.r.item
-                mom_c3 = flow.momentum.t.item
+                mom_c1 = flow.momentum.z
+                mom_c2 = flow.momentum.r
+                mom_c3 = flow.momentum.t
             else:
-                mom_c1 = flow.momentum.x.item
-                mom_c2 = flow.momentum.y.item
-                mom_c3 = flow.momentum.z.item
+                mom_c1 = flow.momentum.x
+                mom_c2 = flow.momentum.y
+                mom_c3 = flow.momentum.z
         except AttributeError:
             raise AttributeError("For mass averaging zone %s is missing"
                                  " 'momentum'." % zone_name)
-    if imin == imax:
-        imax += 1
-        face_normal = _iface_normal
-        face_value = _iface_cell_value if cell_center else _iface_node_value
-    elif jmin == jmax:
-        jmax += 1
-        face_normal = _jface_normal
-        face_value = _jface_cell_value if cell_center else _jface_node_value
-    else:
-        kmax += 1
-        face_normal = _kface_normal
-        face_value = _kface_cell_value if cell_center else _kface_node_value
 
-    weights = []
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-            for k in range(kmin, kmax):
-                sc1, sc2, sc3 = face_normal(c1, c2, c3, i, j, k, cylindrical)
-                if scheme == 'mass':
-                    loc = (i, j, k)
-                    rvu = face_value(mom_c1, loc)
-                    rvv = face_value(mom_c2, loc)
-                    rvw = face_value(mom_c3, loc)
-                    weights.append(rvu*sc1 + rvv*sc2 + rvw*sc3)
-                else:
-                    weights.append(sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3))
-    return weights
+    face, lo, hi = _face_range(region)
+    return _face_weights(scheme, face, lo, hi, cylindrical, cell_center,
+                         (c1, c2, c3),
+                         (mom_c1, mom_c2, mom_c3) if scheme == 'mass' else None)
 
 
 def _surface_weights_2d(scheme, domain, region):
@@ -339,59 +346,45 @@ def _surface_weights_2d(scheme, domain, region):
     cell_center = flow.grid_location == CELL_CENTER
 
     if cylindrical:
-        c1 = None if grid.z is None else grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
+        c1, c2, c3 = grid.z, grid.r, grid.t
     else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = None if grid.z is None else grid.z.item
+        c1, c2, c3 = grid.x, grid.y, grid.z
 
     if scheme == 'mass':
         try:
             if cylindrical:
-                mom_c1 = None if flow.momentum.z is None else flow.momentum.z.item
-                mom_c2 = flow.momentum.r.item
-                mom_c3 = flow.momentum.t.item
+                mom_c1 = flow.momentum.z
+                mom_c2 = flow.momentum.r
+                mom_c3 = flow.momentum.t
             else:
-                mom_c1 = flow.momentum.x.item
-                mom_c2 = flow.momentum.y.item
-                mom_c3 = None if flow.momentum.z is None else flow.momentum.z.item
+                mom_c1 = flow.momentum.x
+                mom_c2 = flow.momentum.y
+                mom_c3 = flow.momentum.z
         except AttributeError:
             raise AttributeError("For mass averaging zone %s is missing"
                                  " 'momentum'." % zone_name)
 
-    weights = []
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-                sc1, sc2, sc3 = _cell_normal(c1, c2, c3, i, j, cylindrical)
-                if scheme == 'mass':
-                    ip1 = i + 1
-                    jp1 = j + 1
-                    if cell_center:
-                        # Cell value is value.
-# FIXME: built-in ghosts
-                        rvu = 0. if mom_c1 is None else mom_c1(ip1, jp1)
-                        rvv = mom_c2(ip1, jp1)
-                        rvw = 0. if mom_c1 is None else mom_c3(ip1, jp1)
-                    else:
-                        # Average across vertices.
-                        if mom_c1 is None:
-                            rvu = 0.
-                        else:
-                            rvu = 0.25 * (mom_c1(i, j) + mom_c1(ip1, j) + \
-                                          mom_c1(i, jp1) + mom_c1(ip1, jp1))
-                        rvv = 0.25 * (mom_c2(i, j) + mom_c2(ip1, j) + \
-                                      mom_c2(i, jp1) + mom_c2(ip1, jp1))
-                        if mom_c3 is None:
-                            rvw = 0.
-                        else:
-                            rvw = 0.25 * (mom_c3(i, j) + mom_c3(ip1, j) + \
-                                          mom_c3(i, jp1) + mom_c3(ip1, jp1))
-                    weights.append(rvu*sc1 + rvv*sc2 + rvw*sc3)
-                else:
-                    weights.append(sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3))
-    return weights
+    lo, hi = (imin, jmin), (imax, jmax)
+    return _face_weights(scheme, 'cell', lo, hi, cylindrical, cell_center,
+                         (c1, c2, c3),
+                         (mom_c1, mom_c2, mom_c3) if scheme == 'mass' else None)
+
+
+def _face_weights(scheme, face, lo, hi, cylindrical, cell_center,
+                  coords, momentum):
+    """
+    Returns flattened array of weights for the faces (or 2D cells) with
+    lowest indexed vertex in the index range [`lo`, `hi`).
+    """
+    sc1, sc2, sc3 = _face_normals(coords, face, lo, hi, cylindrical)
+    if scheme == 'mass':
+        offsets = _FACE_CELLS[face] if cell_center else _FACE_NODES[face]
+        rvu, rvv, rvw = [_face_average(arr, lo, hi, offsets)
+                         for arr in momentum]
+        weights = rvu*sc1 + rvv*sc2 + rvw*sc3
+    else:
+        weights = numpy.sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3)
+    return weights.ravel()
 
 
 def _curve_weights_3d(scheme, domain, region):
@@ -528,7 +521,9 @@ def _calc_metric(name, domain, region, weights, reference_state):
     elif dim == 2:
         if geometry not in ('surface', 'any'):
             raise RuntimeError('metric %r not applicable to surfaces')
-        if len(region) == 7:
+        if hasattr(metric, 'calculate_region'):
+            total = _surface_region(metric, integrate, zone, region, weights)
+        elif len(region) == 7:
             total = _surface_3d(metric, integrate, zone, region, weights)
         else:
             total = _surface_2d(metric, integrate, zone, region, weights)
@@ -606,6 +601,123 @@ def _volume(metric, integrate, zone, region, weights):
 '''
 
 
+def _surface_region(metric, integrate, zone, region, weights):
+    """
+    Calculate metric on a 2D or 3D (index space) surface using
+    :meth:`calculate_region` to evaluate all faces at once.
+    """
+    grid = zone.grid_coordinates
+    flow = zone.flow_solution
+    cylindrical = zone.coordinate_system == CYLINDRICAL
+    cell_center = flow.grid_location == CELL_CENTER
+
+    if cylindrical:
+        coords = (grid.z, grid.r, grid.t)
+    else:
+        coords = (grid.x, grid.y, grid.z)
+
+    if len(region) == 7:
+        face, lo, hi = _face_range(region)
+    else:
+        zone_name, imin, imax, jmin, jmax = region
+        face, lo, hi = 'cell', (imin, jmin), (imax, jmax)
+
+    normal = None
+    if integrate:
+        normal = _face_normals(coords, face, lo, hi, cylindrical)
+
+    # Average across cells sharing surface, or across vertices.
+    offsets = _FACE_CELLS[face] if cell_center else _FACE_NODES[face]
+    val = metric.calculate_region(_region_slices(lo, hi, offsets[0]), normal)
+    for offset in offsets[1:]:
+        val = val + metric.calculate_region(_region_slices(lo, hi, offset),
+                                            normal)
+    if len(offsets) > 1:
+        val = val * (1. / len(offsets))
+
+    if integrate:
+        return float(numpy.sum(val))
+    else:
+        return float(numpy.sum(numpy.ravel(val) * weights))
+
+
+def _face_range(region):
+    """
+    Returns ``(face, lo, hi)`` for the 3D (index space) surface `region`.
+    `face` is 'i', 'j', or 'k', and [`lo`, `hi`) is the index range of the
+    lowest indexed vertex of each face.
+    """
+    zone_name, imin, imax, jmin, jmax, kmin, kmax = region
+    if imin == imax:
+        return ('i', (imin, jmin, kmin), (imax+1, jmax, kmax))
+    elif jmin == jmax:
+        return ('j', (imin, jmin, kmin), (imax, jmax+1, kmax))
+    else:
+        return ('k', (imin, jmin, kmin), (imax, jmax, kmax+1))
+
+
+def _region_slices(lo, hi, offset):
+    """ Returns tuple of slices for index range [`lo`, `hi`) + `offset`. """
+    return tuple([slice(low+off, high+off)
+                  for low, high, off in zip(lo, hi, offset)])
+
+
+def _region_values(arr, lo, hi, offset):
+    """
+    Returns float64 values of `arr` over index range [`lo`, `hi`) + `offset`.
+    If `arr` is None, returns zeros.
+    """
+    if arr is None:
+        return numpy.zeros([high-low for low, high in zip(lo, hi)])
+    return numpy.asarray(arr[_region_slices(lo, hi, offset)],
+                         dtype=numpy.float64)
+
+
+def _face_average(arr, lo, hi, offsets):
+    """ Returns average of `arr` over `offsets`, each face in [`lo`, `hi`). """
+    val = _region_values(arr, lo, hi, offsets[0])
+    for offset in offsets[1:]:
+        val = val + _region_values(arr, lo, hi, offset)
+    if len(offsets) > 1:
+        val = val * (1. / len(offsets))
+    return val
+
+
+def _face_normals(coords, face, lo, hi, cylindrical):
+    """
+    Returns arrays of the components of the non-dimensional vectors normal
+    to each `face` ('i', 'j', 'k', or 2D 'cell') in index range [`lo`, `hi`),
+    with magnitude equal to area. Array equivalent of :meth:`_iface_normal`
+    and friends. `coords` is ``(c1, c2, c3)``, one of which may be None for
+    2D cells.
+    """
+    c1, c2, c3 = coords
+    end1, start1, end2, start2, scale = _FACE_DIAGONALS[face]
+
+    # upper-left - lower-right.
+    diag_c11 = _region_values(c1, lo, hi, end1) - _region_values(c1, lo, hi, start1)
+    diag_c21 = _region_values(c2, lo, hi, end1) - _region_values(c2, lo, hi, start1)
+    diag_c31 = _region_values(c3, lo, hi, end1) - _region_values(c3, lo, hi, start1)
+
+    # upper-right - lower-left.
+    diag_c12 = _region_values(c1, lo, hi, end2) - _region_values(c1, lo, hi, start2)
+    diag_c22 = _region_values(c2, lo, hi, end2) - _region_values(c2, lo, hi, start2)
+    diag_c32 = _region_values(c3, lo, hi, end2) - _region_values(c3, lo, hi, start2)
+
+    if cylindrical:
+        r1 = (_region_values(c2, lo, hi, start1) + _region_values(c2, lo, hi, end1)) / 2.
+        r2 = (_region_values(c2, lo, hi, start2) + _region_values(c2, lo, hi, end2)) / 2.
+    else:
+        r1 = 1.
+        r2 = 1.
+
+    sc1 = scale * ( r2 * diag_c21 * diag_c32 - r1 * diag_c22 * diag_c31)
+    sc2 = scale * (-r2 * diag_c11 * diag_c32 + r1 * diag_c12 * diag_c31)
+    sc3 = scale * (      diag_c11 * diag_c22 -      diag_c12 * diag_c21)
+
+    return (sc1, sc2, sc3)
+
+
 def _surface_3d(metric, integrate, zone, region, weights):
     """ Calculate metric on a 3D (index space) surface. """
     zone_name, imin, imax, jmin, jmax, kmin, kmax = region
@@ -1189,42 +1301,3 @@ def _kedge_length(c1, c2, c3, loc, cylindrical):
         dz = c3(i, j, kp1) - c3(i, j, k)
 
     return sqrt(dx*dx + dy*dy + dz*dz)
-
-
-def _iface_cell_value(arr, loc):
-    """ Returns I face value for cell-centered data. """
-    i, j, k = loc
-# FIXME: built-in ghosts
-    return 0.5 * (arr(i+1, j+1, k+1) + arr(i, j+1, k+1))
-
-def _jface_cell_value(arr, loc):
-    """ Returns J face value for cell-centered data. """
-    i, j, k = loc
-# FIXME: built-in ghosts
-    return 0.5 * (arr(i+1, j+1, k+1) + arr(i+1, j, k+1))
-
-def _kface_cell_value(arr, loc):
-    """ Returns K face value for cell-centered data. """
-    i, j, k = loc
-# FIXME: built-in ghosts
-    return 0.5 * (arr(i+1, j+1, k+1) + arr(i+1, j+1, k))
-
-
-def _iface_node_value(arr, loc):
-    """ Returns I face value for vertex data. """
-    i, j, k = loc
-    return 0.25 * (arr(i, j+1, k+1) + arr(i, j, k+1) +
-                   arr(i, j+1, k) + arr(i, j, k))
-
-def _jface_node_value(arr, loc):
-    """ Returns J face value for vertex data. """
-    i, j, k = loc
-    return 0.25 * (arr(i+1, j, k+1) + arr(i, j, k+1) +
-                   arr(i+1, j, k) + arr(i, j, k))
-
-def _kface_node_value(arr, loc):
-    """ Returns K face value for vertex data. """
-    i, j, k = loc
-    return 0.25 * (arr(i+1, j+1, k) + arr(i, j+1, k) +
-                   arr(i+1, j, k) + arr(i, j, k))
-
@@ -8,6 +8,8 @@ import tempfile
 import shutil
 import unittest
 
+import numpy
+
 from openmdao.lib.datatypes.domain import read_plot3d_q, write_plot3d_q, \
                                           read_plot3d_f, write_plot3d_f, \
                                           read_plot3d_shape, write_plot3d_grid
@@ -205,6 +207,74 @@ class TestCase(unittest.TestCase):
         self.assertTrue((test_flow.f_3 == wedge_flow.momentum.y).all())
         self.assertTrue((test_flow.f_4 == wedge_flow.energy_stagnation_density).all())
 
+    def test_lazy(self):
+        logging.debug('')
+        logging.debug('test_lazy')
+
+        logger = logging.getLogger()
+        wedge = create_wedge_3d((30, 20, 10), 5., 0.5, 2., 30.)
+        wedge.add_zone('', wedge.xyzzy, make_copy=True)
+        wedge.zone_2.flow_solution.density *= 2.
+        wedge_flow = wedge.zone_2.flow_solution
+
+        # Big-endian unformatted, all zones.
+        write_plot3d_q(wedge, 'be-unformatted.xyz', 'be-unformatted.q',
+                       logger=logger, big_endian=True)
+        domain = read_plot3d_q('be-unformatted.xyz', 'be-unformatted.q',
+                               logger=logger, big_endian=True, lazy=True)
+        self.assertTrue(isinstance(domain.zone_1.grid_coordinates.x,
+                                   numpy.memmap))
+        domain.rename_zone('xyzzy', domain.zone_1)
+        self.assertTrue(domain.is_equivalent(wedge, logger=logger))
+
+        # Writing mapped (non-native byte order) data.
+        write_plot3d_q(domain, 'unformatted.xyz', 'unformatted.q',
+                       logger=logger)
+        domain = read_plot3d_q('unformatted.xyz', 'unformatted.q',
+                               logger=logger)
+        domain.rename_zone('xyzzy', domain.zone_1)
+        self.assertTrue(domain.is_equivalent(wedge, logger=logger))
+
+        # Selected zone and variable, lazy and not.
+        for lazy in (True, False):
+            domain = read_plot3d_q('be-unformatted.xyz', 'be-unformatted.q',
+                                   logger=logger, big_endian=True, lazy=lazy,
+                                   zones=['zone_2'], variables=['density'])
+            self.assertEqual(len(domain.zones), 1)
+            self.assertFalse(hasattr(domain, 'zone_1'))
+            test_flow = domain.zone_2.flow_solution
+            self.assertTrue((test_flow.density == wedge_flow.density).all())
+            self.assertFalse(hasattr(test_flow, 'momentum'))
+            self.assertEqual(test_flow.mach, wedge_flow.mach)
+            self.assertTrue((domain.zone_2.grid_coordinates.z ==
+                             wedge.zone_2.grid_coordinates.z).all())
+
+        write_plot3d_f(wedge, 'unformatted.xyz', 'unformatted.f',
+                       ('density', 'momentum'), logger=logger)
+        domain = read_plot3d_f('unformatted.xyz', 'unformatted.f',
+                               logger=logger, lazy=True, zones=['zone_2'],
+                               variables=['f_1', 'f_4'])
+        test_flow = domain.zone_2.flow_solution
+        self.assertTrue((test_flow.f_1 == wedge_flow.density).all())
+        self.assertTrue((test_flow.f_4 == wedge_flow.momentum.z).all())
+        self.assertFalse(hasattr(test_flow, 'f_2'))
+
+        # Mapped data may be modified without changing the file.
+        domain.zone_2.grid_coordinates.x[0, 0, 0] = 42.
+        domain = read_plot3d_f('unformatted.xyz', 'unformatted.f',
+                               logger=logger, lazy=True)
+        self.assertEqual(domain.zone_2.grid_coordinates.x[0, 0, 0],
+                         wedge.zone_2.grid_coordinates.x[0, 0, 0])
+
+        assert_raises(self, "read_plot3d_q('unformatted.xyz', 'unformatted.q',"
+                            " zones=['zone_3'])",
+                      globals(), locals(), ValueError,
+                      "unknown zones ['zone_3']")
+        assert_raises(self, "read_plot3d_q('unformatted.xyz', 'unformatted.q',"
+                            " variables=['froboz'])",
+                      globals(), locals(), ValueError,
+                      "unknown Q variables ['froboz']")
+
 
 if __name__ == '__main__':
     import nose
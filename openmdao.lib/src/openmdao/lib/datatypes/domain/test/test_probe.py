@@ -10,6 +10,9 @@ import unittest
 from math import pi
 
 from openmdao.lib.datatypes.domain import mesh_probe
+from openmdao.lib.datatypes.domain.metrics import Area, MassFlow, \
+                                                 create_scalar_metric, \
+                                                 get_metric, register_metric
 from openmdao.lib.datatypes.domain.test import restart, overflow
 from openmdao.lib.datatypes.domain.test.cube import create_cube
 from openmdao.lib.datatypes.domain.test.wedge import create_wedge_3d
@@ -167,6 +170,37 @@ class TestCase(unittest.TestCase):
                       area, area / 144., expected)
         assert_rel_error(self, area, expected, 0.000001)
 
+    def test_region(self):
+        logging.debug('')
+        logging.debug('test_region')
+
+        # Compare vectorized surface evaluation against per-point evaluation.
+        create_scalar_metric('density')
+        for name, cls, integrate in (('area', Area, True),
+                                     ('mass_flow', MassFlow, True),
+                                     ('density', get_metric('density')[0],
+                                      False)):
+            register_metric('pointwise_'+name, _pointwise(cls), integrate,
+                            'surface')
+
+        cube = create_cube((11, 7, 5), 5., 4., 3.)
+        wedge = create_wedge_3d((10, 8, 12), 5., 0.5, 2., 30.)
+        for domain in (cube, wedge):
+            for region in (('xyzzy', 2, 2, 0, -1, 0, -1),
+                           ('xyzzy', 0, -1, 1, 1, 0, -1),
+                           ('xyzzy', 0, -1, 0, -1, 2, 2)):
+                for weighting in ('area', 'mass'):
+                    variables = (('area', None), ('mass_flow', None),
+                                 ('density', None),
+                                 ('pointwise_area', None),
+                                 ('pointwise_mass_flow', None),
+                                 ('pointwise_density', None))
+                    metrics = mesh_probe(domain, (region,), variables,
+                                         weighting)
+                    for i in range(3):
+                        assert_rel_error(self, metrics[i], metrics[i+3],
+                                         0.000001)
+
     def test_adpac(self):
         # Verify correct metric values for data from real scenario.
         logging.debug('')
@@ -426,6 +460,21 @@ class TestCase(unittest.TestCase):
         self.assertEqual(pt_area_1d, pt_area_3d)
 
 
+def _pointwise(cls):
+    """ Return subclass of `cls` evaluated one point at a time. """
+    class Pointwise(cls):
+        def __getattribute__(self, name):
+            if name == 'calculate_region':
+                raise AttributeError(name)
+            return cls.__getattribute__(self, name)
+
+        def calculate(self, loc, geom):
+            # The formula is still the region one, at a single location.
+            return float(cls.calculate_region(self, loc, geom))
+    Pointwise.__name__ = 'Pointwise%s' % cls.__name__
+    return Pointwise
+
+
 if __name__ == '__main__':
     import nose
     import sys
@@ -3,25 +3,38 @@
 
 """
 
+from cPickle import dumps, loads, HIGHEST_PROTOCOL
 from cStringIO import StringIO
+import atexit
+import copy
+from functools import partial
 import gc
+import hashlib
 import logging
 import os.path
 import Queue
 import sys
 import thread
 import threading
+import time
 from uuid import uuid1, getnode
 
-from numpy import array
+try:
+    import sqlite3
+except ImportError:  # pragma no cover
+    sqlite3 = None
 
-from openmdao.main.api import Driver, VariableTree
-from openmdao.main.datatypes.api import Bool, Dict, Enum, Int
+from numpy import array, ascontiguousarray, generic, ndarray
+
+from openmdao.main.api import Assembly, Driver, VariableTree
+from openmdao.main.datatypes.api import Bool, Dict, Enum, Float, Int, \
+                                        List, Str
 from openmdao.main.exceptions import traceback_str, exception_str
 from openmdao.main.expreval import ExprEvaluator
 from openmdao.main.hasparameters import HasVarTreeParameters
 from openmdao.main.hasresponses import HasVarTreeResponses
 from openmdao.main.interfaces import IHasParameters, IHasResponses, implements
+from openmdao.main.mp_support import OpenMDAO_Proxy
 from openmdao.main.rbac import get_credentials, set_credentials
 from openmdao.main.resource import ResourceAllocationManager as RAM
 from openmdao.main.resource import LocalAllocator
@@ -36,6 +49,14 @@ _EMPTY     = 'empty'
 _LOADING   = 'loading'
 _EXECUTING = 'executing'
 
+# Types of values tracked for update of models in persistent servers and
+# case cache keys. Lists, tuples and dictionaries are checked recursively.
+_STATE_TYPES = (basestring, bool, int, long, float, complex, generic,
+                ndarray, list, tuple, dict, type(None))
+
+# Open case result caches, keyed by filename.
+_CACHES = {}
+
 
 class _Case(object):
     """ Input data and required outputs for a particular simulation run. """
@@ -54,6 +75,7 @@ class _Case(object):
         self.index = index  # Index of input and output values.
         self.retries = 0    # Retry counter.
         self.exc = None     # a sys.exec_info() tuple
+        self.cache_key = None  # Key of results in case cache.
         self._exprs = None  # Dictionary of ExprEvaluators.
 
         self._inputs = {}
@@ -96,6 +118,8 @@ class _Case(object):
         Take the values of all of the inputs in this case and apply them
         to the specified scope.
         """
+        remote = isinstance(scope, OpenMDAO_Proxy)
+        replies = []
         for name, value in self._inputs.items():
             if self._exprs is None:
                 expr = None
@@ -103,8 +127,14 @@ class _Case(object):
                 expr = self._exprs.get(name)
             if expr:
                 expr.set(value, scope) #, tovector=True)
+            elif remote:
+                # Pipeline requests to avoid a round-trip per input.
+                replies.append(scope._callmethod('set', (name, value),
+                                                 wait=False))
             else:
                 scope.set(name, value)
+        for reply in replies:
+            reply.result()
 
         parent._system.vec.get('u').set_from_scope(scope)
             
@@ -135,11 +165,17 @@ class _Case(object):
                 except Exception:
                     exc = sys.exc_info()
         else:
-            for name in outputs:
-                if extra and name == itername:
-                    continue
+            names = [name for name in outputs
+                          if not (extra and name == itername)]
+            if isinstance(scope, OpenMDAO_Proxy):
+                # Pipeline requests to avoid a round-trip per output.
+                getters = [scope._callmethod('get', (name,), wait=False).result
+                           for name in names]
+            else:
+                getters = [partial(scope.get, name) for name in names]
+            for name, getter in zip(names, getters):
                 try:
-                    value = scope.get(name)
+                    value = getter()
                     data.append((name, value))
                 except Exception:
                     exc = sys.exc_info()
@@ -176,7 +212,12 @@ class _ServerData(object):
         self.top = None         # Top level object in server.
         self.state = _EMPTY     # See states above.
         self.case = None        # Current case being evaluated.
+        self.batch = None       # Current cases if evaluating a batch.
+        self.results = None     # Results from evaluating a batch.
         self.exception = None   # sys.exc_info() from last operation.
+        self.started = None     # Time current case(s) started executing.
+        self.redispatched = False  # True if current case(s) re-dispatched.
+        self.abandoned = False  # True if only running redundant case(s).
 
         self.server = None      # Remote server proxy.
         self.info = None        # Identifying information (host, pid, etc.)
@@ -185,6 +226,76 @@ class _ServerData(object):
         self.load_failures = 0  # Load failure count.
 
 
+class _CaseCache(object):
+    """
+    Case outputs stored in a SQLite database, keyed by a hash of the model
+    configuration and case inputs. `filename` may be ``:memory:``.
+    """
+
+    def __init__(self, filename):
+        if sqlite3 is None:  # pragma no cover
+            raise RuntimeError('No sqlite3 support for case cache')
+        self.filename = filename
+        self._connection = sqlite3.connect(filename, check_same_thread=False)
+        # Each case is committed as it completes so an interrupted run can
+        # be resumed. Write-ahead logging keeps these commits cheap while
+        # the database survives a crash.
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._connection.execute('PRAGMA synchronous = NORMAL')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS cases'
+                                 ' (key TEXT PRIMARY KEY, outputs BLOB)')
+        self._connection.commit()
+
+    def close(self):
+        """ Close the database connection. """
+        self._connection.close()
+
+    def get(self, key):
+        """ Return dictionary of outputs for `key`, or None. """
+        cur = self._connection.execute('SELECT outputs FROM cases'
+                                       ' WHERE key=?', (key,))
+        row = cur.fetchone()
+        if row is None:
+            return None
+        try:
+            return loads(str(row[0]))
+        except Exception:
+            return None  # Treat unreadable entry as a miss.
+
+    def put(self, key, outputs):
+        """ Save dictionary of `outputs` for `key`. """
+        data = sqlite3.Binary(dumps(outputs, HIGHEST_PROTOCOL))
+        self._connection.execute('INSERT OR REPLACE INTO cases(key, outputs)'
+                                 ' VALUES(?,?)', (key, data))
+        self._connection.commit()
+
+
+def _open_cache(filename):
+    """
+    Return :class:`_CaseCache` for `filename`, opening it if necessary.
+    Caches are kept at module level so the connection isn't part of the
+    driver state which gets copied when saving the model.
+    """
+    if filename != ':memory:':
+        filename = os.path.abspath(filename)
+    try:
+        return _CACHES[filename]
+    except KeyError:
+        cache = _CACHES[filename] = _CaseCache(filename)
+        return cache
+
+
+def _close_caches():
+    """ Close open case result caches. """
+    for cache in _CACHES.values():
+        try:
+            cache.close()
+        except Exception:  # pragma no cover
+            pass
+    _CACHES.clear()
+
+atexit.register(_close_caches)
+
 
 @add_delegate(HasVarTreeParameters, HasVarTreeResponses)
 class CaseIteratorDriver(Driver):
@@ -217,6 +328,42 @@ class CaseIteratorDriver(Driver):
                                         ' requirements will be included in the'
                                         ' generated egg.')
 
+    batch_size = Int(1, low=1, iotype='in',
+                     desc='Number of cases sent to a server per request during'
+                          ' concurrent evaluation. The model is reloaded'
+                          ' between batches rather than cases.')
+
+    keep_servers = Bool(False, iotype='in',
+                        desc='If True, concurrent evaluation servers are kept'
+                             ' between executions and the model is only'
+                             ' re-sent when its configuration changes.')
+
+    cache_file = Str('', iotype='in',
+                     desc='If set, name of SQLite database (or :memory:)'
+                          ' used to cache case outputs. Cases whose model'
+                          ' configuration, other model inputs, and case'
+                          ' inputs match a cached case are recorded from'
+                          ' the cache rather than evaluated.')
+
+    cache_hits = Int(0, iotype='out',
+                     desc='Number of cases found in the cache during the'
+                          ' last execution.')
+
+    cache_misses = Int(0, iotype='out',
+                       desc='Number of cases not found in the cache during'
+                            ' the last execution.')
+
+    straggler_factor = Float(0., low=0., iotype='in',
+                             desc='If > 0, during concurrent evaluation a'
+                                  ' case running longer than this multiple'
+                                  ' of the median case duration is also'
+                                  ' started on an idle server. The first'
+                                  ' result obtained is used.')
+
+    case_costs = List(Float, iotype='in',
+                      desc='Optional predicted cost of each case. If set,'
+                           ' cases are started in order of decreasing cost.')
+
     def __init__(self, *args, **kwargs):
         super(CaseIteratorDriver, self).__init__(*args, **kwargs)
         self._iter = None  # Set to None when iterator is empty.
@@ -238,6 +385,16 @@ class CaseIteratorDriver(Driver):
         self._rerun = []  # Cases that failed and should be retried.
         self._generation = 0  # Used to keep worker names unique.
 
+        self._done = set()     # Indices of cases successfully evaluated.
+        self._in_flight = {}   # Number of executing copies keyed by index.
+        self._durations = []   # Durations of successful case evaluations.
+
+        # Servers kept between executions, keyed by server name.
+        self._pool = {}
+        self._pool_config = None  # Configuration hash of model in pool.
+        self._egg_state = {}      # Model input digests when egg was saved.
+        self._state_delta = []    # (path, value) changed since egg saved.
+
         # var wasn't showing up in parent depgraph without this
         self.error_policy = 'ABORT'
 
@@ -304,39 +461,8 @@ class CaseIteratorDriver(Driver):
                 obj = obj.parent
             obj._setup()
             
-        if not self.sequential:
-            # Save model to egg.
-            # Must do this before creating any locks or queues.
-            self._replicants += 1
-            version = 'replicant.%d' % (self._replicants)
-
-            # If only local host will be used, we can skip determining
-            # distributions required by the egg.
-            allocators = RAM.list_allocators()
-            need_reqs = False
-            if not self.ignore_egg_requirements:
-                for allocator in allocators:
-                    if not isinstance(allocator, LocalAllocator):
-                        need_reqs = True
-                        break
-
-            # Replicate and mutate model to run our workflow once.
-            # Originally this was done in-place, but that 'invalidated'
-            # various workflow quantities.
-            replicant = self.parent.copy()
-            workflow = replicant.get(self.name+'.workflow')
-            driver = replicant.add('driver', Driver())
-            workflow.parent = driver
-            workflow.scope = None
-            replicant.driver.workflow = workflow
-            egg_info = replicant.save_to_egg(self.name, version,
-                                             need_requirements=need_reqs)
-            replicant = workflow = driver = None  # Release objects.
-            gc.collect()  # Collect/compact before possible fork.
-
-            self._egg_file = egg_info[0]
-            self._egg_required_distributions = egg_info[1]
-            self._egg_orphan_modules = [name for name, path in egg_info[2]]
+        if self._pool and (self.sequential or not self.keep_servers):
+            self.release_servers()
 
         inp_paths = []
         inp_values = []
@@ -362,9 +488,280 @@ class CaseIteratorDriver(Driver):
                                parent_uuid=self._case_uuid))
         self.init_responses(length)
 
+        if self.cache_file:
+            cases = self._replay_cached(cases)
+        else:
+            self.cache_hits = self.cache_misses = 0
+
+        costs = self.case_costs
+        if costs:
+            if len(costs) != length:
+                self.raise_exception('case_costs has %d entries, but there'
+                                     ' are %d cases' % (len(costs), length),
+                                     ValueError)
+            cases.sort(key=lambda case: -costs[case.index])
+
+        self._done = set()
+        self._in_flight = {}
+        self._durations = []
+
+        if not self.sequential and cases:
+            if self.keep_servers:
+                config = self._config_hash()
+            else:
+                config = None
+            delta = None
+            if self._pool and config == self._pool_config and \
+               self._egg_file and os.path.exists(self._egg_file):
+                delta = self._changed_values()
+            if delta is None:
+                self._save_model()
+                self._pool_config = config
+            else:
+                # Servers already have the model, just send changed values.
+                self._state_delta = delta
+                self._logger.debug('reusing model, %d changed values',
+                                   len(delta))
+
         self._iter = iter(cases)
         self._abort_exc = None
 
+    def _replay_cached(self, cases):
+        """
+        Record those `cases` found in the case cache and return the cases
+        which still need to be evaluated. Cases to be evaluated have their
+        `cache_key` set so their outputs will be saved.
+        """
+        base = self._cache_base()
+        if base is None:
+            self.cache_hits = 0
+            self.cache_misses = len(cases)
+            return cases
+        cache = _open_cache(self.cache_file)
+        todo = []
+        for case in cases:
+            sha = base.copy()
+            for name in sorted(case._inputs):
+                sha.update(name)
+                _update_hash(sha, case._inputs[name])
+            case.cache_key = sha.hexdigest()
+
+            values = cache.get(case.cache_key)
+            if values is not None:
+                try:
+                    outputs = [(name, values[name]) for name in case._outputs]
+                    extra = [(name, values[name])
+                             for name in self._batch_extra(case)]
+                except KeyError:  # Cached with different outputs.
+                    values = None
+            if values is None:
+                todo.append(case)
+            else:
+                case.cache_key = None
+                self._record_results(None, case, (outputs, extra))
+
+        self.cache_hits = len(cases) - len(todo)
+        self.cache_misses = len(todo)
+        self._logger.info('%d cached cases, %d to evaluate',
+                          self.cache_hits, self.cache_misses)
+        return todo
+
+    def _cache_base(self):
+        """
+        Return hash object updated with the configuration of our model and
+        the values of model inputs which may affect case results (see
+        :meth:`_model_state`). Case cache keys are generated from copies of
+        this. Returns None if some input value can't be hashed, in which
+        case the cache isn't used.
+        """
+        state, opaque = self._model_state()
+        if opaque:
+            self._logger.warning('Not using case cache, can\'t hash %s',
+                                 ', '.join(opaque))
+            return None
+
+        config = [_config_signature(self.parent),
+                  sorted([str(path) for path in self.get_parameters()])]
+        sha = hashlib.sha1(repr(config))
+        for path, value in sorted(state.items()):
+            sha.update(path)
+            _update_hash(sha, value)
+        return sha
+
+    def _cache_case(self, case, outputs):
+        """ Save `outputs`, a list of ``(name, value)``, for `case`. """
+        values = {}
+        for name, value in outputs:
+            if isinstance(value, VariableTree):
+                value = value.copy()  # Don't pickle the model via parent.
+            values[name] = value
+        try:
+            _open_cache(self.cache_file).put(case.cache_key, values)
+        except Exception as exc:
+            self._logger.warning('Exception caching case %s: %s',
+                                 case.index, exc)
+
+    def _save_model(self):
+        """ Save model to egg for loading into servers. """
+        # Must do this before creating any locks or queues.
+        if self._egg_file and os.path.exists(self._egg_file):
+            os.remove(self._egg_file)  # Replacing pooled model.
+        self._replicants += 1
+        version = 'replicant.%d' % (self._replicants)
+
+        # If only local host will be used, we can skip determining
+        # distributions required by the egg.
+        allocators = RAM.list_allocators()
+        need_reqs = False
+        if not self.ignore_egg_requirements:
+            for allocator in allocators:
+                if not isinstance(allocator, LocalAllocator):
+                    need_reqs = True
+                    break
+
+        # Replicate and mutate model to run our workflow once.
+        # Originally this was done in-place, but that 'invalidated'
+        # various workflow quantities.
+        # Pooled servers are not part of the model.
+        pool, self._pool = self._pool, {}
+        try:
+            replicant = self.parent.copy()
+        finally:
+            self._pool = pool
+        workflow = replicant.get(self.name+'.workflow')
+        driver = replicant.add('driver', Driver())
+        workflow.parent = driver
+        workflow.scope = None
+        replicant.driver.workflow = workflow
+        egg_info = replicant.save_to_egg(self.name, version,
+                                         need_requirements=need_reqs)
+        replicant = workflow = driver = None  # Release objects.
+        gc.collect()  # Collect/compact before possible fork.
+
+        self._egg_file = egg_info[0]
+        self._egg_required_distributions = egg_info[1]
+        self._egg_orphan_modules = [name for name, path in egg_info[2]]
+
+        if self.keep_servers:
+            state, opaque = self._model_state()
+            if opaque:
+                self._egg_state = None  # Must save model every time.
+            else:
+                self._egg_state = dict((path, _digest(value))
+                                       for path, value in state.items())
+        else:
+            self._egg_state = {}
+        self._state_delta = []
+
+    def _config_hash(self):
+        """
+        Return hash of the configuration of our model as replicated into
+        servers. Servers are only sent a new model when this changes.
+        """
+        config = [_config_signature(self.parent),
+                  sorted([str(path) for path in self.get_parameters()]),
+                  sorted(self.get_responses().keys()),
+                  sorted(self.workflow._rec_outputs),
+                  self.ignore_egg_requirements,
+                  sorted(self.extra_resources.items())]
+        return hashlib.sha1(repr(config)).hexdigest()
+
+    def _model_state(self):
+        """
+        Return ``(state, opaque)`` for input values in the part of our model
+        which is replicated and run by our workflow: inputs of our parent
+        and of every component we iterate over, including drivers and
+        components within assemblies. Framework variables, case inputs, and
+        inputs connected to outputs computed by the workflow are not
+        included. `state` is a dictionary of values keyed by path, with
+        VariableTrees expanded to their variables. `opaque` is a list of
+        paths whose values can't be digested or sent to servers.
+        """
+        state = {}
+        opaque = []
+        parent = self.parent
+        comps = self.iteration_set()
+
+        # Names of components which compute outputs during the workflow.
+        computed = set()
+        for comp in [self] + list(comps):
+            computed.add(comp.name)
+            if isinstance(comp, Driver):
+                computed.update(comp.workflow.get_names(full=True))
+
+        exclude = set()
+        for param in self.get_parameters().values():
+            for target in param.targets:
+                exclude.add(target.split('[')[0])
+        for src, dst in parent.list_connections():
+            if src.split('.')[0] in computed:
+                exclude.add(dst.split('[')[0])
+
+        _input_state(parent, '', exclude, state, opaque, recurse=False)
+        for comp in sorted(comps, key=lambda comp: comp.name):
+            _input_state(comp, comp.name+'.', exclude, state, opaque)
+        return state, opaque
+
+    def _changed_values(self):
+        """
+        Return list of ``(path, value)`` for model inputs which have changed
+        since the egg was saved. Outputs are recomputed by the servers.
+        Returns None if the model must be saved again because some value
+        can't be digested or sent.
+        """
+        if self._egg_state is None:
+            return None
+        state, opaque = self._model_state()
+        if opaque:
+            self._logger.debug('model must be saved, opaque %s',
+                               ', '.join(opaque))
+            return None
+
+        delta = []
+        egg_state = self._egg_state
+        for path, value in sorted(state.items()):
+            if egg_state.get(path) != _digest(value):
+                delta.append((path, copy.deepcopy(value)))
+        return delta
+
+    def release_servers(self):
+        """
+        Shut-down servers kept between executions (see `keep_servers`).
+        The next concurrent execution will save and load a new model.
+        """
+        pool, self._pool = self._pool, {}
+        if pool:
+            self._logger.debug('releasing %d pooled servers', len(pool))
+            self._reply_q = Queue.Queue()  # For shut-down replies.
+            try:
+                self._shutdown(pool)
+            finally:
+                self._reply_q = None
+        self._pool_config = None
+        self._egg_state = {}
+        self._state_delta = []
+        if self._egg_file and os.path.exists(self._egg_file):
+            os.remove(self._egg_file)
+            self._egg_file = None
+
+    def __getstate__(self):
+        """
+        Return dict representing this driver's state.
+        Servers kept between executions are not included.
+        """
+        state = super(CaseIteratorDriver, self).__getstate__()
+        state['_pool'] = {}
+        state['_pool_config'] = None
+        state['_servers'] = {}
+        state['_reply_q'] = None
+        state['_server_lock'] = None
+        return state
+
+    def pre_delete(self):
+        """ Release any servers kept between executions. """
+        self.release_servers()
+        super(CaseIteratorDriver, self).pre_delete()
+
     def _start(self):
         """ Start evaluating cases concurrently. """
         # Need credentials in case we're using a PublicKey server.
@@ -385,23 +782,34 @@ class CaseIteratorDriver(Driver):
             self.raise_exception(msg, RuntimeError)
 
         # Kick off initial wave of cases.
+        # Locks and queues can't be copied, so they only exist while
+        # executing (see _save_model()).
         self._server_lock = threading.Lock()
         self._reply_q = Queue.Queue()
         self._generation += 1
         n_servers = 0
+
+        # Reuse servers kept from previous executions.
+        for name in sorted(self._pool):
+            if n_servers >= max_servers or not self._grab_cases():
+                break
+
+            n_servers += 1
+            self._logger.debug('reusing worker %r', name)
+            server = self._servers[name] = self._pool[name]
+            server.state = _EMPTY
+            server.case = None
+            server.exception = None
+            server.load_failures = 0
+            server.in_use = self._server_ready(server)
+
         while n_servers < max_servers:
             if not self._more_to_go():
                 break
 
-            # Get next case. Limits servers started if max_servers > cases.
-            try:
-                case = self._iter.next()
-            except StopIteration:
-                if not self._rerun:
-                    self._iter = None
-                    break
-
-            self._todo.append(case)
+            # Get next case(s). Limits servers started if max_servers > cases.
+            if not self._grab_cases() and not self._rerun:
+                break
 
             # Start server worker thread.
             n_servers += 1
@@ -411,7 +819,7 @@ class CaseIteratorDriver(Driver):
             server.in_use = True
             server_thread = threading.Thread(target=self._service_loop,
                                              args=(name, resources,
-                                                   credentials, self._reply_q))
+                                                   credentials))
             server_thread.daemon = True
             try:
                 server_thread.start()
@@ -453,6 +861,7 @@ class CaseIteratorDriver(Driver):
                     server.in_use = self._server_ready(server)
 
         # Continue until no servers are busy.
+        last_reply = time.time()
         while self._busy():
             if self._more_to_go():
                 timeout = None
@@ -461,10 +870,18 @@ class CaseIteratorDriver(Driver):
                 # This has happened with a server that got 'lost'
                 # in RAM.allocate()
                 timeout = 60
+            if self.straggler_factor:
+                # Poll so stragglers are detected while waiting.
+                self._redispatch_stragglers()
+                wait = 1.
+            else:
+                wait = timeout
             try:
-                name, result, exc = self._reply_q.get(timeout=timeout)
-            # Hard to force worker to hang, which is handled here.
-            except Queue.Empty:  # pragma no cover
+                name, result, exc = self._reply_q.get(timeout=wait)
+            except Queue.Empty:
+                if timeout is None or time.time() - last_reply < timeout:
+                    continue  # Just polling.
+                # Hard to force worker to hang, which is handled here.
                 msgs = []
                 for name, server in self._servers.items():
                     if server.in_use:
@@ -483,30 +900,132 @@ class CaseIteratorDriver(Driver):
                     for msg in msgs:
                         self._logger.error('    %s', msg)
             else:
-                server = self._servers[name]
+                last_reply = time.time()
+                server = self._servers.get(name)
+                if server is None:
+                    continue  # Late reply from a previous execution.
+                server.abandoned = False
                 server.in_use = self._server_ready(server)
+                self._abandon_redundant()
+
+        if self.keep_servers:
+            # Keep (started) servers which haven't had problems loading
+            # and aren't still executing a redundant case.
+            servers = {}
+            for name, server in self._servers.items():
+                if server.queue is None:
+                    continue
+                if server.load_failures or server.abandoned:
+                    servers[name] = server
+                else:
+                    self._pool[name] = server
+            self._logger.debug('keeping %d servers', len(self._pool))
+        else:
+            servers = self._servers
 
         # Shut-down (started) servers.
         self._logger.debug('Shut-down (started) servers')
-        n_queues = 0
-        for server in self._servers.values():
+        self._shutdown(servers)
+
+    def _shutdown(self, servers):
+        """
+        Shut-down (started) `servers`, a dictionary keyed by name.
+        Abandoned servers will shut-down when their current request
+        completes, we don't wait for them.
+        """
+        pending = set()
+        for name, server in servers.items():
             if server.queue is not None:
                 server.queue.put(None)
-                n_queues += 1
-        for i in range(n_queues):
+                if server.abandoned:
+                    server.queue = None
+                else:
+                    pending.add(name)
+        while pending:
             try:
                 name, status, exc = self._reply_q.get(True, 60)
             # Hard to force worker to hang, which is handled here.
             except Queue.Empty:  # pragma no cover
-                pass
+                break
             else:
-                self._servers[name].queue = None
+                if name in pending:
+                    pending.remove(name)
+                    servers[name].queue = None
         # Hard to force worker to hang, which is handled here.
-        for server in self._servers.values():  # pragma no cover
+        for server in servers.values():  # pragma no cover
             if server.queue is not None:
                 self._logger.warning('Timeout waiting for %r to shut-down.',
                                      server.name)
 
+    def _grab_cases(self):
+        """
+        Move the next `batch_size` cases from the iterator to the startup
+        list. Returns the number of cases moved.
+        """
+        count = 0
+        while count < self.batch_size and self._iter is not None:
+            try:
+                self._todo.append(self._iter.next())
+            except StopIteration:
+                self._iter = None
+            else:
+                count += 1
+        return count
+
+    def _redispatch_stragglers(self):
+        """
+        Start cases which have been executing longer than `straggler_factor`
+        times the median case duration on idle servers.
+        """
+        if not self._durations:
+            return
+        idle = [server for server in self._servers.values()
+                if not server.in_use and server.state == _EMPTY and
+                   server.queue is not None and server.load_failures < 3]
+        if not idle:
+            return
+
+        durations = sorted(self._durations)
+        limit = self.straggler_factor * durations[len(durations) // 2]
+        now = time.time()
+        for server in self._servers.values():
+            if not idle:
+                break
+            if not server.in_use or server.state != _EXECUTING or \
+               server.redispatched:
+                continue
+            cases = server.batch or [server.case]
+            elapsed = now - server.started
+            if elapsed < limit * len(cases):
+                continue
+            cases = [case for case in cases if case.index not in self._done]
+            if not cases:
+                continue
+
+            self._logger.info('re-dispatching %d cases from %r after %.1f'
+                              ' seconds', len(cases), server.name, elapsed)
+            server.redispatched = True
+            for case in cases:
+                dup = copy.copy(case)
+                dup.exc = None
+                self._todo.append(dup)
+            target = idle.pop(0)
+            target.in_use = self._start_processing(target)
+
+    def _abandon_redundant(self):
+        """
+        Stop waiting for servers which are only executing cases already
+        evaluated by another server (see `straggler_factor`).
+        """
+        for server in self._servers.values():
+            if server.in_use and server.state == _EXECUTING:
+                cases = server.batch or [server.case]
+                if all([case.index in self._done for case in cases]):
+                    self._logger.debug('abandoning redundant execution'
+                                       ' in %r', server.name)
+                    server.abandoned = True
+                    server.in_use = False
+
     def _busy(self):
         """ Return True while at least one server is in use. """
         for server in self._servers.values():
@@ -521,13 +1040,17 @@ class CaseIteratorDriver(Driver):
               for workers which haven't shut down by now.
         """
         self._iter = None
-        self._reply_q = None
-        self._server_lock = None
         self._servers = {}
         self._seq_server.top = None  # Avoid leak.
         self._todo = []
         self._rerun = []
 
+        self._reply_q = None
+        self._server_lock = None
+
+        if self._pool:
+            return  # Egg is needed for reloading pooled servers.
+
         if self._egg_file and os.path.exists(self._egg_file):
             os.remove(self._egg_file)
             self._egg_file = None
@@ -564,32 +1087,21 @@ class CaseIteratorDriver(Driver):
                         in_use = False
 
         elif state == _EXECUTING:
-            case = server.case
-            server.case = None
-            if server.exception is None:
-                # Grab the results from the model and record.
-                try:
-                    self._record_case(server.top, case)
-                except Exception as exc:
-                    msg = 'Exception recording case: %s' % exc
-                    self._logger.debug('    %s', msg)
-                    self._logger.debug('%s', case)
-                    case.msg = '%s: %s' % (self.get_pathname(), msg)
+            if server.batch is not None:
+                self._batch_done(server)
             else:
-                self._logger.debug('    exception while executing: %r', server.exception[1])
-                case.exc = server.exception
-
-            if case.exc is not None:
-                if self.error_policy == 'ABORT':
-                    if self._abort_exc is None:
-                        self._abort_exc = case.exc
-                    self._stop = True
-                elif case.retries < self.max_retries:
-                    case.exc = None
-                    case.retries += 1
-                    self._rerun.append(case)
-                else:
-                    self._logger.error('Too many retries for %s', case)
+                case = server.case
+                server.case = None
+                failed = server.exception is not None
+                if self._accept(case, failed, time.time() - server.started):
+                    if failed:
+                        self._logger.debug('    exception while executing:'
+                                           ' %r', server.exception[1])
+                        case.exc = server.exception
+                    else:
+                        # Grab the results from the model and record.
+                        self._record_results(server.top, case)
+                    self._case_done(case)
 
             # Set up for next case.
             in_use = self._start_processing(server, reload=True)
@@ -624,6 +1136,86 @@ class CaseIteratorDriver(Driver):
 
         return in_use
 
+    def _batch_done(self, server):
+        """ Record results of a batch of cases evaluated by `server`. """
+        cases = server.batch
+        results = server.results
+        server.batch = server.results = None
+        duration = (time.time() - server.started) / len(cases)
+        if server.exception is None:
+            results, errors = results
+            for i, case in enumerate(cases):
+                if not self._accept(case, errors[i] is not None, duration):
+                    continue
+                if errors[i] is None:
+                    values = [result[i] for result in results]
+                    n_outputs = len(case._outputs)
+                    outputs = zip(case._outputs, values[:n_outputs])
+                    extra = zip(self._batch_extra(case), values[n_outputs:])
+                    self._record_results(None, case, (outputs, extra))
+                else:
+                    self._logger.debug('    exception while executing: %s',
+                                       errors[i])
+                    try:
+                        raise RuntimeError(errors[i])
+                    except RuntimeError:
+                        case.exc = sys.exc_info()
+                self._case_done(case)
+        else:
+            self._logger.debug('    exception while executing batch: %r',
+                               server.exception[1])
+            for case in cases:
+                if self._accept(case, True, duration):
+                    case.exc = server.exception
+                    self._case_done(case)
+
+    def _accept(self, case, failed, duration):
+        """
+        Note that `case` finished executing, taking `duration` seconds.
+        Returns False if the result should be ignored because another copy
+        of the case (see `straggler_factor`) has already been evaluated, or
+        this copy failed while another copy is still executing.
+        """
+        index = case.index
+        self._in_flight[index] = self._in_flight.get(index, 1) - 1
+        if index in self._done:
+            self._logger.debug('    ignoring redundant result for case %s',
+                               index)
+            return False
+        if failed:
+            if self._in_flight[index]:
+                self._logger.debug('    ignoring failure of case %s, another'
+                                   ' copy is executing', index)
+                return False
+        else:
+            self._done.add(index)
+            self._durations.append(duration)
+        return True
+
+    def _record_results(self, scope, case, fetched=None):
+        """ Record results for `case`, noting any exception. """
+        try:
+            self._record_case(scope, case, fetched)
+        except Exception as exc:
+            msg = 'Exception recording case: %s' % exc
+            self._logger.debug('    %s', msg)
+            self._logger.debug('%s', case)
+            case.msg = '%s: %s' % (self.get_pathname(), msg)
+
+    def _case_done(self, case):
+        """ Apply `error_policy` if `case` failed. """
+        if case.exc is not None:
+            if self.error_policy == 'ABORT':
+                if self._abort_exc is None:
+                    self._abort_exc = case.exc
+                self._stop = True
+            elif case.retries < self.max_retries:
+                case.exc = None
+                case.retries += 1
+                self._rerun.append(case)
+            else:
+                self._logger.error('Too many retries for %s', case)
+
     def _more_to_go(self):
         """ Return True if there's more work to do. """
         if self._stop:
@@ -664,7 +1256,27 @@ class CaseIteratorDriver(Driver):
     def _start_next_case(self, server):
         """ Look for the next case and start it. """
 
-        if self._todo:
+        if self.batch_size > 1 and server.queue is not None:
+            cases = []
+            while len(cases) < self.batch_size:
+                if self._todo:
+                    cases.append(self._todo.pop(0))
+                elif self._rerun:
+                    cases.append(self._rerun.pop(0))
+                elif self._iter is None:
+                    break
+                else:
+                    try:
+                        cases.append(self._iter.next())
+                    except StopIteration:
+                        self._iter = None
+            if cases:
+                self._logger.debug('    run batch of %d cases', len(cases))
+                in_use = self._run_batch(cases, server)
+            else:
+                self._logger.debug('    no more cases')
+                in_use = False
+        elif self._todo:
             self._logger.debug('    run startup case')
             case = self._todo.pop(0)
             in_use = self._run_case(case, server)
@@ -690,6 +1302,8 @@ class CaseIteratorDriver(Driver):
 
     def _run_case(self, case, server):
         """ Setup and start a case. Returns True if started. """
+        if case.index in self._done:  # Redundant copy of re-dispatched case.
+            return self._start_next_case(server)
         case.exc = None
 
         # We record the case and are responsible for unique case ids.
@@ -708,16 +1322,49 @@ class CaseIteratorDriver(Driver):
             return self._start_processing(server)
 
         server.case = case
+        server.started = time.time()
+        server.redispatched = False
+        self._in_flight[case.index] = self._in_flight.get(case.index, 0) + 1
         self._model_execute(server)
         server.state = _EXECUTING
         return True
 
-    def _record_case(self, scope, case):
+    def _run_batch(self, cases, server):
+        """ Setup and start a batch of cases. Returns True if started. """
+        # Skip redundant copies of re-dispatched cases.
+        cases = [case for case in cases if case.index not in self._done]
+        if not cases:
+            return self._start_next_case(server)
+        for case in cases:
+            case.exc = None
+            case.uuid = _Case.next_uuid()
+            case.parent_uuid = self._case_uuid
+            self._in_flight[case.index] = self._in_flight.get(case.index, 0) + 1
+        server.batch = cases
+        server.started = time.time()
+        server.redispatched = False
+        server.results = None
+        server.exception = None
+        server.queue.put((self._remote_batch_execute, server))
+        server.state = _EXECUTING
+        return True
+
+    def _batch_extra(self, case):
+        """ Return extra outputs to be returned for `case` in a batch. """
+        itername = '%s.workflow.itername' % self.name
+        return [name for name in case._extra_outputs if name != itername]
+
+    def _record_case(self, scope, case, fetched=None):
         """
         Record case data from `scope` in ``case_outputs``.
-        Also sends case data to recorders.
+        Also sends case data to recorders and saves it in the case cache.
+        If `fetched` is not None, it is ``(outputs, extra_outputs)`` already
+        obtained from the model, and `scope` is not used.
         """
-        case_outputs, exc = case.fetch_outputs(scope)
+        if fetched is None:
+            case_outputs, exc = case.fetch_outputs(scope)
+        else:
+            case_outputs, exc = fetched[0], None
         if exc is None and case.exc is None:
             index = case.index
             for path, value in case_outputs:
@@ -726,8 +1373,21 @@ class CaseIteratorDriver(Driver):
                     value = value.copy()
                 self.set('case_outputs.%s[%d]'%(path,index), value)
 
-        # Record workflow data in recorders.
         workflow = self.workflow
+        itername = '%s.workflow.itername' % self.name
+        extra, extra_exc = [], None
+        if workflow._rec_required or case.cache_key:
+            if fetched is None:
+                extra, extra_exc = case.fetch_outputs(scope, extra=True,
+                                                      itername=itername)
+            else:
+                extra = fetched[1]
+
+        if case.cache_key and case.exc is None and exc is None and \
+           extra_exc is None:
+            self._cache_case(case, case_outputs + extra)
+
+        # Record workflow data in recorders.
         if workflow._rec_required:
             inputs = []
             recording = workflow._rec_parameters
@@ -745,9 +1405,6 @@ class CaseIteratorDriver(Driver):
                         value = value.copy()
                     outputs.append(value)
 
-            itername = '%s.workflow.itername' % self.name
-            extra, extra_exc = case.fetch_outputs(scope, extra=True,
-                                                  itername=itername)
             for path, value in extra:
                 if self.sequential and isinstance(value, VariableTree):
                     value = value.copy()
@@ -759,7 +1416,7 @@ class CaseIteratorDriver(Driver):
                 else:
                     outputs.append('%s' % (case.index+1))
 
-            top = scope
+            top = self if scope is None else scope
             while top.parent:
                 top = top.parent
             for recorder in top.recorders:
@@ -767,15 +1424,19 @@ class CaseIteratorDriver(Driver):
                                 case.exc or exc or extra_exc,
                                 case.uuid, self._case_uuid)
 
-    def _service_loop(self, name, resource_desc, credentials, reply_q):
-        """ Each server has an associated thread executing this. """
+    def _service_loop(self, name, resource_desc, credentials):
+        """
+        Each server has an associated thread executing this.
+        Replies go to the reply queue of the current execution since the
+        server may be kept for later executions (see `keep_servers`).
+        """
         set_credentials(credentials)
 
         server, server_info = RAM.allocate(resource_desc)
         # Just being defensive, this should never happen.
         if server is None:  # pragma no cover
             self._logger.error('Server allocation for %r failed :-(', name)
-            reply_q.put((name, False, None))
+            self._reply((name, False, None))
             return
         else:
             # Clear egg re-use indicator.
@@ -796,7 +1457,7 @@ class CaseIteratorDriver(Driver):
                 sdata.info = server_info
                 sdata.queue = request_q
 
-            reply_q.put((name, True, None))  # ACK startup.
+            self._reply((name, True, None))  # ACK startup.
 
             while True:
                 request = request_q.get()
@@ -810,7 +1471,7 @@ class CaseIteratorDriver(Driver):
                     result = None
                 else:
                     req_exc = None
-                reply_q.put((name, result, req_exc))
+                self._reply((name, result, req_exc))
         except Exception as exc:  # pragma no cover
             # This can easily happen if we take a long time to allocate and
             # we get 'cleaned-up' before we get started.
@@ -819,7 +1480,13 @@ class CaseIteratorDriver(Driver):
         finally:
             self._logger.debug('%r releasing server', name)
             RAM.release(server)
-            reply_q.put((name, True, None))  # ACK shutdown.
+            self._reply((name, True, None))  # ACK shutdown.
+
+    def _reply(self, reply):
+        """ Send `reply` from a server thread, if anyone is listening. """
+        reply_q = self._reply_q
+        if reply_q is not None:
+            reply_q.put(reply)
 
     def _load_model(self, server):
         """ Load a model into a server. """
@@ -852,6 +1519,20 @@ class CaseIteratorDriver(Driver):
                                self._egg_file, exc)
             server.top = None
             server.exception = sys.exc_info()
+            return
+
+        # Update values changed since the egg was saved.
+        # Requests are pipelined to avoid a round-trip per value.
+        try:
+            replies = [tlo._callmethod('set', (path, value), wait=False)
+                       for path, value in self._state_delta]
+            for (path, value), reply in zip(self._state_delta, replies):
+                reply.result()
+        except Exception as exc:
+            self._logger.error('server %r update of %r failed: %r',
+                               server.name, path, exc)
+            server.top = None
+            server.exception = sys.exc_info()
         else:
             server.top = tlo
 
@@ -868,6 +1549,35 @@ class CaseIteratorDriver(Driver):
         else:
             server.queue.put((self._remote_model_execute, server))
 
+    def _remote_batch_execute(self, server):
+        """ Execute a batch of cases in remote server with one request. """
+        cases = server.batch
+        inputs = sorted(cases[0]._inputs.keys())
+        values = []
+        for name in inputs:
+            vals = [case._inputs[name] for case in cases]
+            try:
+                arr = array(vals)
+            except Exception:
+                arr = None
+            # Only floats, numpy bool/int scalars may fail trait validation.
+            if arr is not None and arr.dtype.kind in 'fc':
+                vals = arr
+            values.append(vals)
+        outputs = cases[0]._outputs + self._batch_extra(cases[0])
+        try:
+            server.results = server.top.run_cases(
+                                 inputs, values, outputs,
+                                 [case.uuid for case in cases],
+                                 self.get_itername(),
+                                 [case.index+1 for case in cases])
+        except Exception as exc:
+            server.exception = sys.exc_info()
+            self._logger.error('Caught exception from server %r,'
+                               ' PID %d on %s: %r',
+                               server.info['name'], server.info['pid'],
+                               server.info['host'], exc)
+
     def _remote_model_execute(self, server):
         """ Execute model in remote server. """
         case = server.case
@@ -880,3 +1590,100 @@ class CaseIteratorDriver(Driver):
                                ' PID %d on %s: %r',
                                server.info['name'], server.info['pid'],
                                server.info['host'], exc)
+
+
+def _config_signature(assembly):
+    """
+    Return nested lists describing the configuration of `assembly`:
+    its children with their types and variables, driver workflows, and
+    connections.
+    """
+    children = []
+    for name in sorted(assembly.list_containers()):
+        obj = getattr(assembly, name)
+        cls = type(obj)
+        entry = [name, '%s.%s' % (cls.__module__, cls.__name__)]
+        if hasattr(obj, 'list_inputs'):
+            entry.append(sorted(obj.list_inputs()))
+            entry.append(sorted(obj.list_outputs()))
+        if isinstance(obj, Driver):
+            entry.append(obj.workflow.get_names(full=True))
+        elif isinstance(obj, Assembly):
+            entry.append(_config_signature(obj))
+        children.append(entry)
+    return [children, sorted(assembly.list_connections())]
+
+
+def _update_hash(sha, value):
+    """ Update hash object `sha` with `value`. """
+    if isinstance(value, ndarray):
+        sha.update('%s%s' % (value.dtype.str, value.shape))
+        sha.update(ascontiguousarray(value).tostring())
+    elif isinstance(value, (list, tuple)):
+        sha.update('[%d' % len(value))
+        for item in value:
+            _update_hash(sha, item)
+    elif isinstance(value, dict):
+        sha.update('{%d' % len(value))
+        for key in sorted(value):
+            _update_hash(sha, key)
+            _update_hash(sha, value[key])
+    else:
+        sha.update(repr(value))
+
+
+def _input_state(obj, prefix, exclude, state, opaque, recurse=True):
+    """
+    Add input values of `obj` to `state` and paths of values which can't be
+    digested to `opaque` (see :meth:`CaseIteratorDriver._model_state`).
+    Paths are `prefix` plus variable name. Paths in `exclude` are skipped.
+    If `obj` is an assembly and `recurse`, inputs of its components are
+    added, except those connected within the assembly.
+    """
+    for name in obj.list_inputs():
+        path = prefix+name
+        if path in exclude or obj.get_metadata(name, 'framework_var'):
+            continue
+        try:
+            value = obj.get(name)
+        except Exception:
+            opaque.append(path)
+        else:
+            _add_state(path, value, state, opaque)
+
+    if recurse and isinstance(obj, Assembly):
+        connected = set(prefix+dst.split('[')[0]
+                        for src, dst in obj.list_connections())
+        for name in sorted(obj.list_components()):
+            _input_state(getattr(obj, name), prefix+name+'.', connected,
+                         state, opaque)
+
+
+def _add_state(path, value, state, opaque):
+    """ Add `value` at `path` to `state`, or `path` to `opaque`. """
+    if isinstance(value, VariableTree):
+        for name in sorted(value.list_vars()):
+            _add_state(path+'.'+name, getattr(value, name), state, opaque)
+    elif _digestable(value):
+        state[path] = value
+    else:
+        opaque.append(path)
+
+
+def _digestable(value):
+    """ Return True if `value` can be digested by :func:`_update_hash`. """
+    if isinstance(value, ndarray):
+        return value.dtype.kind != 'O'
+    if isinstance(value, (list, tuple)):
+        return all(_digestable(item) for item in value)
+    if isinstance(value, dict):
+        return all(_digestable(key) and _digestable(item)
+                   for key, item in value.items())
+    return isinstance(value, _STATE_TYPES)
+
+
+def _digest(value):
+    """ Return digest of `value` for detecting changes. """
+    sha = hashlib.sha1()
+    _update_hash(sha, value)
+    return sha.digest()
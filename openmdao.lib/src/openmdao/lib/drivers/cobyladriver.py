@@ -10,7 +10,7 @@ COBYLA is gradient-free and can handle inequality constraints.
 
 from math import isnan
 
-from numpy import zeros, array, hstack
+from numpy import zeros, hstack
 
 from cobyla.cobyla import cobyla, closeunit
 
@@ -150,7 +150,7 @@ class COBYLAdriver(Driver):
             self.raise_exception(msg, RuntimeError)
 
         # Constraints (COBYLA defines positive as satisfied)
-        cons = -1. * array(self.eval_ineq_constraints())
+        cons = -1. * self.eval_ineq_constraints(as_array=True)
 
         # Side Constraints
         vals = self.eval_parameters(self.parent)
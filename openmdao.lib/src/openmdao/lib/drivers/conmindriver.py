@@ -377,25 +377,25 @@ class CONMINdriver(Driver):
 
             # Note. CONMIN is driving the finite difference estimation of the
             # gradient.
-            if self.cnmn1.igoto == 3:
-
-                # update the parameters in the model
-                self.set_parameters(self.design_vals[:-2])
-                super(CONMINdriver, self).run_iteration()
+            nineq = self.total_ineq_constraints()
+            cached = self.memo_lookup(self.design_vals[:-2], 'func')
+            if cached is not None:
+                self.cnmn1.obj, self.constraint_vals[0:nineq] = cached
 
             else:
-                # update the parameters in the model
-                self.set_parameters(self.design_vals[:-2])
+                # update the parameters in the model and run it
+                self.memo_run(self.design_vals[:-2])
 
-                # Run the model for this step
-                super(CONMINdriver, self).run_iteration()
+                # calculate objective
+                self.cnmn1.obj = self.eval_objective()
 
-            # calculate objective
-            self.cnmn1.obj = self.eval_objective()
+                # update constraint value array
+                self.constraint_vals[0:nineq] = \
+                    self.eval_ineq_constraints(as_array=True)
 
-            # update constraint value array
-            self.constraint_vals[0:self.total_ineq_constraints()] = \
-                self.eval_ineq_constraints()
+                self.memo_store(self.design_vals[:-2], 'func',
+                                (self.cnmn1.obj,
+                                 self.constraint_vals[0:nineq].copy()))
 
             #self._logger.debug('constraints = %s' % self.constraint_vals)
 
@@ -404,15 +404,17 @@ class CONMINdriver(Driver):
         # only return gradients of active/violated constraints.
         elif self.cnmn1.info == 2 and self.cnmn1.nfdg == 1:
 
-            # Sometimes, CONMIN wants the derivatives at a different point.
-            self.set_parameters(self.design_vals[:-2])
-            super(CONMINdriver, self).run_iteration()
-
             inputs = self.list_param_group_targets()
             obj = self.list_objective_targets()
             con = self.list_ineq_constraint_targets()
 
-            J = self.workflow.calc_gradient(inputs, obj + con)
+            J = self.memo_lookup(self.design_vals[:-2], 'grad')
+            if J is None:
+                # Sometimes, CONMIN wants the derivatives at a different
+                # point.
+                self.memo_run(self.design_vals[:-2])
+                J = self.workflow.calc_gradient(inputs, obj + con)
+                self.memo_store(self.design_vals[:-2], 'grad', J)
 
             nobj = len(obj)
             self.d_obj[:-2] = J[0:nobj, :].ravel()
@@ -430,6 +432,9 @@ class CONMINdriver(Driver):
             self.raise_exception('Unexpected value for flag INFO returned'
                                  ' from CONMIN.', RuntimeError)
 
+        if self.cnmn1.igoto == 0:
+            self.memo_finish()
+
 
     def post_iteration(self):
         """ Checks CONMIN's return status and writes out cases."""
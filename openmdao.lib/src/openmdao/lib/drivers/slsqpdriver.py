@@ -10,7 +10,7 @@ inequality constraints.
 
 # pylint: disable=E0611,F0401
 from math import isnan
-from numpy import zeros, array
+from numpy import zeros
 
 from slsqp.slsqp import slsqp, closeunit, pyflush
 
@@ -155,6 +155,8 @@ class SLSQPdriver(Driver):
             self._logger.error(str(err))
             raise
 
+        self.memo_finish()
+
         if self.iprint > 0:
             closeunit(self.iout)
 
@@ -170,8 +172,12 @@ class SLSQPdriver(Driver):
         evaluations.
 
         Note: m, me, la, n, f, and g are unused inputs."""
-        self.set_parameters(xnew)
-        super(SLSQPdriver, self).run_iteration()
+        cached = self.memo_lookup(xnew, 'func')
+        if cached is not None:
+            f, g = cached
+            return f, g.copy()
+
+        self.memo_run(xnew)
         f = self.eval_objective()
 
         if isnan(f):
@@ -180,11 +186,12 @@ class SLSQPdriver(Driver):
 
         # Constraints. Note that SLSQP defines positive as satisfied.
         if self.ncon > 0:
-            g = -1. * array(self.eval_constraints(self.parent))
+            g = -1. * self.eval_constraints(self.parent, as_array=True)
 
         if self.iprint > 0:
             pyflush(self.iout)
 
+        self.memo_store(xnew, 'func', (f, g.copy()))
         return f, g
 
     def _grad(self, m, me, la, n, f, g, df, dg, xnew):
@@ -193,7 +200,13 @@ class SLSQPdriver(Driver):
 
         Note: m, me, la, n, f, and g are unused inputs."""
 
-        J = self.workflow.calc_gradient(self.inputs, self.obj + self.con)
+        J = self.memo_lookup(xnew, 'grad')
+        if J is None:
+            if self.memo_size > 0:
+                # A memoized _func may have left the model elsewhere.
+                self.memo_run(xnew)
+            J = self.workflow.calc_gradient(self.inputs, self.obj + self.con)
+            self.memo_store(xnew, 'grad', J)
         #print "gradient", J
         df[0:self.nparam] = J[0, :].ravel()
 
@@ -60,6 +60,8 @@ class DrivenComponent(Component):
     y = Array([1., 1., 1., 1., 1., 1., 1., 1., 1., 1.], iotype='in')
     raise_error = Bool(False, iotype='in')
     sleep = Float(0., iotype='in')
+    stall = Float(0., iotype='in')
+    stall_file = Str(iotype='in')
 
     rosen_suzuki = Float(0., iotype='out')
     sum_y = Float(0., iotype='out')
@@ -73,12 +75,27 @@ class DrivenComponent(Component):
                               self.x, self.y, self.raise_error)
         if self.sleep:
             time.sleep(self.sleep)
+        if self.stall and not os.path.exists(self.stall_file):
+            # Only stall the first execution, wherever it is.
+            open(self.stall_file, 'w').close()
+            time.sleep(self.stall)
         self.rosen_suzuki = rosen_suzuki(self.x)
         self.sum_y = sum(self.y)
         if self.raise_error:
             self.raise_exception('Forced error', RuntimeError)
 
 
+class LogCapture(logging.Handler):
+    """ Saves messages logged. """
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
 class MyModel(Assembly):
     """ Use CaseIteratorDriver with DrivenComponent. """
 
@@ -93,6 +110,46 @@ class MyModel(Assembly):
         driver.add_response('driven.sum_y')
 
 
+class ScaleParams(VariableTree):
+    """ VariableTree input of ScaledComponent. """
+
+    scale = Float(1.)
+
+
+class ScaledComponent(Component):
+    """ Computes `y` from `x` using VarTree and plain inputs. """
+
+    x = Float(iotype='in')
+    offset = Float(iotype='in')
+    params = VarTree(ScaleParams(), iotype='in')
+    y = Float(iotype='out')
+
+    def execute(self):
+        self.y = self.params.scale * self.x + self.offset
+
+
+class NestedModel(Assembly):
+    """ Use CaseIteratorDriver with a sub-assembly and VarTree input. """
+
+    def configure(self):
+        sub = self.add('sub', Assembly())
+        sub.add('comp', ScaledComponent())
+        sub.driver.workflow.add('comp')
+        sub.create_passthrough('comp.x')
+        sub.create_passthrough('comp.y')
+
+        self.add('scaled', ScaledComponent())
+
+        driver = self.add('driver', CaseIteratorDriver())
+        driver.workflow.add(['sub', 'scaled'])
+        driver.add_parameter('sub.x')
+        driver.add_parameter('scaled.x')
+        driver.add_response('sub.y')
+        driver.add_response('scaled.y')
+        driver.case_inputs.sub.x = [1., 2., 3.]
+        driver.case_inputs.scaled.x = [1., 2., 3.]
+
+
 class Generator(Component):
     """ Generates cases to be evaluated. """
 
@@ -132,6 +189,20 @@ class TracedComponent(Component):
         self.itername = self.get_itername()
 
 
+class OrderedComponent(Component):
+    """ Used to check case evaluation order. """
+
+    inp = Int(iotype='in')
+    order = Int(iotype='out')
+
+    executions = 0
+
+    def execute(self):
+        """ Record order of execution. """
+        OrderedComponent.executions += 1
+        self.order = OrderedComponent.executions
+
+
 class CIDriver(CaseIteratorDriver):
 
     def __init__(self, max_iterations, comp_name):
@@ -248,6 +319,193 @@ class TestCase(unittest.TestCase):
         self.model.driver.extra_resources = {'allocator': name}
         self.run_cases(sequential=False)
 
+    def test_concurrent_batch(self):
+        logging.debug('')
+        logging.debug('test_concurrent_batch')
+        init_cluster(encrypted=True, allow_shell=True)
+        self.model.driver.batch_size = 3
+        self.run_cases(sequential=False)
+
+        self.generate_cases(force_errors=True)
+        self.run_cases(sequential=False, forced_errors=True, retry=True)
+
+    def test_keep_servers(self):
+        logging.debug('')
+        logging.debug('test_keep_servers')
+        init_cluster(encrypted=True, allow_shell=True)
+        driver = self.model.driver
+        driver.keep_servers = True
+
+        self.run_cases(sequential=False)
+        servers = sorted(driver._pool.keys())
+        egg_file = driver._egg_file
+        self.assertTrue(servers)
+        self.assertTrue(os.path.exists(egg_file))
+        # Locks and queues would prevent copying the model.
+        self.assertEqual(driver._reply_q, None)
+        self.assertEqual(driver._server_lock, None)
+
+        # Same configuration, reuse servers and model, sending changes.
+        self.generate_cases()
+        self.model.driven.sleep = 0.1
+        self.model.run()
+        self.verify_results()
+        self.assertEqual(sorted(driver._pool.keys()), servers)
+        self.assertEqual(driver._egg_file, egg_file)
+        self.assertEqual(driver._state_delta, [('driven.sleep', 0.1)])
+
+        # New configuration, reuse servers with new model.
+        driver.remove_response('driven.sum_y')
+        self.model.run()
+        self.assertEqual(sorted(driver._pool.keys()), servers)
+        self.assertNotEqual(driver._egg_file, egg_file)
+        self.assertFalse(os.path.exists(egg_file))
+        self.assertEqual(driver._state_delta, [])
+
+        driver.release_servers()
+        self.assertEqual(driver._pool, {})
+        self.assertEqual(driver._egg_file, None)
+
+        # Changes to VarTree inputs and inputs within assemblies are sent.
+        self.model.pre_delete()
+        self.model = set_as_top(NestedModel())
+        driver = self.model.driver
+        driver.sequential = False
+        driver.keep_servers = True
+        self.model.run()
+        egg_file = driver._egg_file
+        self.assertEqual(list(driver.case_outputs.sub.y), [1., 2., 3.])
+
+        self.model.sub.comp.offset = 1.
+        self.model.scaled.params.scale = 2.
+        self.model.run()
+        self.assertEqual(driver._egg_file, egg_file)
+        self.assertEqual(driver._state_delta, [('scaled.params.scale', 2.),
+                                               ('sub.comp.offset', 1.)])
+        self.assertEqual(list(driver.case_outputs.sub.y), [2., 3., 4.])
+        self.assertEqual(list(driver.case_outputs.scaled.y), [2., 4., 6.])
+
+    def test_cache(self):
+        logging.debug('')
+        logging.debug('test_cache')
+        driver = self.model.driver
+        driver.cache_file = 'cases.db'
+        self.model.recorders = [ListCaseRecorder()]
+
+        self.run_cases(sequential=True)
+        self.assertEqual((driver.cache_hits, driver.cache_misses), (0, 10))
+        exec_count = self.model.driven.exec_count
+        recorded = len(self.model.recorders[0].get_iterator())
+
+        # All cases cached.
+        self.model.run()
+        self.verify_results()
+        self.assertEqual((driver.cache_hits, driver.cache_misses), (10, 0))
+        self.assertEqual(self.model.driven.exec_count, exec_count)
+        # Cached cases are recorded just as evaluated cases are.
+        self.assertEqual(len(self.model.recorders[0].get_iterator()),
+                         recorded * 2)
+
+        # Partial overlap, cache is persistent across models.
+        x = driver.case_inputs.driven.x
+        y = driver.case_inputs.driven.y
+        self.model.pre_delete()
+        self.model = set_as_top(MyModel())
+        driver = self.model.driver
+        driver.cache_file = 'cases.db'
+        driver.case_inputs.driven.x = x[:5] + \
+            [numpy_random.normal(size=4) for i in range(5)]
+        driver.case_inputs.driven.y = y
+        driver.case_inputs.driven.raise_error = [False] * 10
+        self.model.run()
+        self.verify_results()
+        self.assertEqual((driver.cache_hits, driver.cache_misses), (5, 5))
+        self.assertEqual(self.model.driven.exec_count, 5)
+
+        # Other model inputs are part of the key.
+        self.model.driven.sleep = 0.01
+        self.model.run()
+        self.assertEqual((driver.cache_hits, driver.cache_misses), (0, 10))
+
+    def test_cache_nested(self):
+        logging.debug('')
+        logging.debug('test_cache_nested')
+        self.model.pre_delete()
+        self.model = set_as_top(NestedModel())
+        driver = self.model.driver
+        driver.cache_file = 'cases.db'
+        self.model.run()
+        self.assertEqual((driver.cache_hits, driver.cache_misses), (0, 3))
+        self.model.run()
+        self.assertEqual((driver.cache_hits, driver.cache_misses), (3, 0))
+
+        # Input within a sub-assembly.
+        self.model.sub.comp.offset = 1.
+        self.model.run()
+        self.assertEqual((driver.cache_hits, driver.cache_misses), (0, 3))
+        self.assertEqual(list(driver.case_outputs.sub.y), [2., 3., 4.])
+
+        # VarTree input.
+        self.model.scaled.params.scale = 2.
+        self.model.run()
+        self.assertEqual((driver.cache_hits, driver.cache_misses), (0, 3))
+        self.assertEqual(list(driver.case_outputs.scaled.y), [2., 4., 6.])
+
+    def test_stragglers(self):
+        logging.debug('')
+        logging.debug('test_stragglers')
+        init_cluster(encrypted=True, allow_shell=True)
+        driver = self.model.driver
+        driver.add_parameter('driven.sleep')
+        driver.add_parameter('driven.stall')
+        driver.case_inputs.driven.sleep = [0.1] * 10
+        driver.case_inputs.driven.stall = [0.] * 9 + [20.]
+        stall_file = os.path.join(self.tempdir, 'stalled')
+        self.model.driven.stall_file = stall_file
+        driver.straggler_factor = 2.
+
+        handler = LogCapture()
+        logging.getLogger().addHandler(handler)
+        try:
+            start = time.time()
+            self.run_cases(sequential=False)
+            elapsed = time.time() - start
+        finally:
+            logging.getLogger().removeHandler(handler)
+
+        # The stalled case was re-dispatched, its copy finished first
+        # (results are checked by run_cases()), and the stalled server was
+        # abandoned rather than waited for.
+        self.assertTrue(os.path.exists(stall_file))
+        redispatched = [msg for msg in handler.messages
+                        if msg.startswith('re-dispatching 1 cases')]
+        abandoned = [msg for msg in handler.messages
+                     if msg.startswith('abandoning redundant execution')]
+        self.assertEqual(len(redispatched), 1)
+        self.assertEqual(len(abandoned), 1)
+        self.assertTrue(elapsed < 20., 'elapsed %s' % elapsed)
+
+    def test_case_costs(self):
+        logging.debug('')
+        logging.debug('test_case_costs')
+        top = set_as_top(Assembly())
+        cid = top.add('driver', CaseIteratorDriver())
+        top.add('comp', OrderedComponent())
+        cid.workflow.add('comp')
+        cid.add_parameter('comp.inp')
+        cid.add_response('comp.order')
+
+        cid.case_inputs.comp.inp = range(4)
+        cid.case_costs = [1., 5., 3., 0.]
+        OrderedComponent.executions = 0
+        top.run()
+        self.assertEqual(list(cid.case_outputs.comp.order), [3, 1, 2, 4])
+
+        cid.case_costs = [1., 2.]
+        assert_raises(self, 'top.run()', globals(), locals(), ValueError,
+                      'driver: case_costs has 2 entries, but there are'
+                      ' 4 cases')
+
     def run_cases(self, sequential, forced_errors=False, retry=True):
         """ Evaluate cases, either sequentially or across multiple servers. """
         driver = self.model.driver
@@ -122,6 +122,40 @@ class SLSPQdriverTestCase(unittest.TestCase):
         self.assertEqual(self.top.comp.result,
                          end_case.get_output('_pseudo_0'))
 
+    def test_memo(self):
+        self.top.driver.add_objective('comp.result')
+        map(self.top.driver.add_parameter,
+            ['comp.x[0]', 'comp.x[1]', 'comp.x[2]', 'comp.x[3]'])
+
+        # pylint: disable=C0301
+        map(self.top.driver.add_constraint, [
+            'comp.x[0]**2+comp.x[0]+comp.x[1]**2-comp.x[1]+comp.x[2]**2+comp.x[2]+comp.x[3]**2-comp.x[3] < 8',
+            'comp.x[0]**2-comp.x[0]+2*comp.x[1]**2+comp.x[2]**2+2*comp.x[3]**2-comp.x[3] < 10',
+            '2*comp.x[0]**2+2*comp.x[0]+comp.x[1]**2-comp.x[1]+comp.x[2]**2-comp.x[3] < 5'])
+        self.top.driver.memo_size = 2
+
+        self.top.run()
+
+        # pylint: disable=E1101
+        self.assertAlmostEqual(self.top.comp.opt_objective,
+                               self.top.driver.eval_objective(), places=2)
+        for i in range(4):
+            self.assertAlmostEqual(self.top.comp.opt_design_vars[i],
+                                   self.top.comp.x[i], places=1)
+        self.assertTrue(self.top.driver.memo_misses > 0)
+
+        # Least recently used points are discarded.
+        driver = self.top.driver
+        driver._memo_clear()
+        driver.memo_store([1., 2.], 'func', 1.)
+        driver.memo_store([3., 4.], 'func', 2.)
+        self.assertEqual(driver.memo_lookup([1., 2.], 'func'), 1.)
+        driver.memo_store([5., 6.], 'func', 3.)
+        self.assertEqual(driver.memo_lookup([3., 4.], 'func'), None)
+        self.assertEqual(driver.memo_lookup([1., 2.], 'func'), 1.)
+        self.assertEqual(driver.memo_lookup([1., 2.], 'grad'), None)
+        self.assertEqual((driver.memo_hits, driver.memo_misses), (2, 2))
+
     def test_max_iter(self):
         self.top.driver.add_objective('comp.result')
         map(self.top.driver.add_parameter,
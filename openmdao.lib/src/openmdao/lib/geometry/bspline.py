@@ -1,14 +1,30 @@
-import cPickle
+import hashlib
 import os.path
+import tempfile
+
+from numpy import linspace, hstack, dstack, less, less_equal, logical_and, \
+    arange, asarray, ascontiguousarray, clip, empty, load, ones, savez, \
+    searchsorted, where, zeros
 
-from numpy import linspace, hstack, dstack, less ,less_equal, logical_and, \
-    array, empty, matrix, dot
-    
-from scipy.optimize import fsolve, newton
 from scipy.sparse import csr_matrix
 
-class Bspline(object): 
-    def __init__(self,controls,points,order=3): #controls and points are 2-d arrays of points 
+# Directory where the B matrices of point sets are cached between runs.
+# Set to None to disable the cache.
+CACHE_DIR = os.environ.get('OPENMDAO_BSPLINE_CACHE',
+                           os.path.join('~', '.openmdao', 'bspline_cache'))
+
+# Maximum total size in bytes of the files in CACHE_DIR. The least recently
+# used files are removed when it is exceeded.
+CACHE_SIZE = 256*1024*1024
+
+_CACHE_VERSION = '1'
+
+# Bisection steps used by find(), enough to resolve t to about 1e-12.
+_FIND_ITERS = 40
+
+
+class Bspline(object):
+    def __init__(self,controls,points,order=3): #controls and points are 2-d arrays of points
 
         self.controls = controls
         self.order = order
@@ -17,99 +33,184 @@ class Bspline(object):
         self.knots =  hstack(([0,]*(self.degree),
                               hstack((linspace(0,1,self.n-self.order+2),[1,]*(self.degree)))
                              ))
-        self.__b_cache = {} #uses for memoizing the b_jn function
-        self.max_x = max(points[:,0]) 
-
-        #see if we can 
-        h1 = str(hash(tuple(points.flatten()))).replace("-","n")
-        h2 = str(hash(tuple(controls.flatten()))).replace("-","n")
-        pkl_file_name = "%s__%s.bspline_pkl"%(h1,h2)
-        pkl_folder = "pyBspline_pkl"
-        pkl_file_name = os.path.join(pkl_folder,pkl_file_name)
-        if not os.path.exists(pkl_folder): 
-            os.mkdir(pkl_folder)
-        if os.path.exists(pkl_file_name): 
-
-            self.B = cPickle.load(open(pkl_file_name))
-        else: 
+        self.max_x = max(points[:,0])
+
+        key = self._cache_key(points)
+        self.B = _cache_load(key)
+        if self.B is None:
             self.B = self._calc_jacobian(points)
-            cPickle.dump(self.B,open(pkl_file_name,'w'))
-
-   
-    def _calc_jacobian(self,points):                       
-        #pre-calculate the B matrix
-        n_p = points.shape[0]
-        B = matrix(empty((n_p,self.n))) #1 row per point, one column per control_point
-        
-        r = range(0,self.n)
-        for i,p in enumerate(points): 
-            t = self.find(p[0])
-            for j in r: 
-                B[i,j] = self.b_jn_wrapper(j,self.degree,t)    
-                
-        #self.B = csr_matrix(B)
-        self.B = B
+            _cache_store(key, self.B)
+
+    def _cache_key(self, points):
+        """Returns a key identifying the B matrix for `points`."""
+        sha = hashlib.sha1(_CACHE_VERSION)
+        for arr in (self.knots, self.controls[:,0], points[:,0]):
+            sha.update(ascontiguousarray(arr, dtype=float).tostring())
+        return sha.hexdigest()
+
+    def _calc_jacobian(self,points):
+        """Returns the sparse B matrix, with 1 row per point and one column
+        per control point."""
+        t = self.find(points[:,0])
+        cols, vals = self._basis(t)
+
+        rows = arange(len(t)).repeat(self.order)
+        self.B = csr_matrix((vals.ravel(), (rows, cols.ravel())),
+                            shape=(len(t), self.n))
         return self.B
-                    
+
     def calc(self,C,points=None):
         self.controls = C
-        if points: 
+        if points is not None:
             self.B = self._calc_jacobian(points)
-            
-        return array(self.B.dot(C))     
-                    
-     
+
+        return asarray(self.B.dot(C))
+
+    def _basis(self, t):
+        """Returns the column indices and values of the `order` nonzero
+        basis functions at each parameter value in `t`, as arrays of shape
+        (len(t), order). This is the Cox-de Boor recursion evaluated for all
+        of `t` at once, rather than per point as :meth:`b_jn` does."""
+        t = clip(asarray(t, dtype=float).ravel(), 0., 1.)
+        knots = self.knots
+        p = self.degree
+        n_t = len(t)
+
+        # Knot span of each t. t == 1 goes in the last nonempty span, so the
+        # last basis function is 1 there.
+        span = clip(searchsorted(knots, t, side='right')-1, p, self.n-1)
+
+        N = zeros((n_t, p+1))
+        N[:,0] = 1.
+        left = empty((n_t, p+1))
+        right = empty((n_t, p+1))
+        for j in range(1, p+1):
+            left[:,j] = t - knots[span+1-j]
+            right[:,j] = knots[span+j] - t
+            saved = zeros(n_t)
+            for r in range(j):
+                temp = N[:,r] / (right[:,r+1] + left[:,j-r])
+                N[:,r] = saved + right[:,r+1]*temp
+                saved = left[:,j-r]*temp
+            N[:,j] = saved
+
+        cols = span[:,None] - p + arange(p+1)
+        return cols, N
+
+    def _x(self, t):
+        """Returns the x coordinates of the curve at parameter values `t`."""
+        cols, N = self._basis(t)
+        return (N*self.controls[:,0][cols]).sum(axis=1)
+
     def find(self,X):
-        """returns the parametric coordinate that matches the given x location""" 
-        
-        try:     
-            return array([fsolve(lambda f: self(f)[:,0][0] - x,[x/self.max_x,],xtol=1e-5) for x in X])[:,0]
-        except TypeError:
-            return fsolve(lambda f: self(f)[:,0] - X,[X/self.max_x,],xtol=1e-5)
-                 
-        
-    def b_jn(self,j,n,t):         
+        """returns the parametric coordinates that match the given x locations.
+        Locations beyond either end of the curve map to that end."""
+
+        X = asarray(X, dtype=float).ravel()
+        sign = 1. if self.controls[-1,0] >= self.controls[0,0] else -1.
+
+        # Bisection on all locations at once.
+        lo = zeros(X.shape)
+        hi = ones(X.shape)
+        for i in range(_FIND_ITERS):
+            mid = .5*(lo+hi)
+            below = sign*(self._x(mid)-X) < 0
+            lo = where(below, mid, lo)
+            hi = where(below, hi, mid)
+        return .5*(lo+hi)
+
+    def b_jn(self,j,n,t):
         t_j   = self.knots[j]
         t_j1  = self.knots[j+1]
         t_jn  = self.knots[j+n]
         t_jn1 = self.knots[j+n+1]
-        
-        if n==0:       
-            return logical_and(less_equal(t_j,t),less(t,t_j1))                
-        
-        if t_jn-t_j:     
+
+        if n==0:
+            return logical_and(less_equal(t_j,t),less(t,t_j1))
+
+        if t_jn-t_j:
             q1 = (t-t_j)/(t_jn-t_j)
-        else: 
-            q1 = 0    
-            
-        if t_jn1-t_j1: 
+        else:
+            q1 = 0
+
+        if t_jn1-t_j1:
             q2 = (t_jn1-t)/(t_jn1-t_j1)
-        else: 
+        else:
             q2 = 0
-                
-        B = q1*self.b_jn(j,n-1,t) + q2*self.b_jn(j+1,n-1,t)   
-        
+
+        B = q1*self.b_jn(j,n-1,t) + q2*self.b_jn(j+1,n-1,t)
+
         return B
-        
-    #dirty hack to fix some weird corner case that shows up    
-    def b_jn_wrapper(self,j,n,t): 
-        tuple_t = tuple(t)
-        try: 
-            return self.__b_cache[(j,n,tuple_t)]
-        except KeyError:     
-            B = self.b_jn(j,n,t)
-            if j == self.n-1: 
-                try: 
-                    B[t==1]=1 #anywhere t=1, set B = 1
-                except TypeError: 
-                    B = 1   
-            self.__b_cache[(j,n,tuple_t)] = B         
-            return B 
-        
-    def __call__(self,t): 
-        rng = range(0,self.n)
-        b = [self.b_jn_wrapper(i,self.degree,t) for i in rng]
-        X = dot(self.controls[:,0],b)
-        Y = dot(self.controls[:,1],b)
-        return dstack((X,Y))[0]     
-        
\ No newline at end of file
+
+    def __call__(self,t):
+        cols, N = self._basis(t)
+        X = (N*self.controls[:,0][cols]).sum(axis=1)
+        Y = (N*self.controls[:,1][cols]).sum(axis=1)
+        return dstack((X,Y))[0]
+
+
+def _cache_path(key):
+    if not CACHE_DIR:
+        return None
+    return os.path.join(os.path.expanduser(CACHE_DIR), key+'.npz')
+
+
+def _cache_load(key):
+    """Returns the cached B matrix for `key`, or None."""
+    path = _cache_path(key)
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        data = load(path)
+        try:
+            B = csr_matrix((data['data'], data['indices'], data['indptr']),
+                           shape=tuple(data['shape']))
+        finally:
+            data.close()
+        os.utime(path, None)  # Mark as recently used.
+    except (IOError, OSError, KeyError, ValueError):
+        return None
+    return B
+
+
+def _cache_store(key, B):
+    """Save B matrix for `key`, then trim the cache to CACHE_SIZE. Failures
+    are ignored since the cache is only an optimization."""
+    path = _cache_path(key)
+    if path is None:
+        return
+    cache_dir = os.path.dirname(path)
+    tmp = None
+    try:
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        # Write then rename so other processes never see partial files.
+        fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=cache_dir)
+        with os.fdopen(fd, 'wb') as out:
+            savez(out, data=B.data, indices=B.indices, indptr=B.indptr,
+                  shape=B.shape)
+        if os.path.exists(path):
+            os.remove(path)
+        os.rename(tmp, path)
+        tmp = None
+        _cache_trim(cache_dir)
+    except (IOError, OSError):
+        if tmp is not None and os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _cache_trim(cache_dir):
+    """Remove least recently used files until the cache fits CACHE_SIZE."""
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith('.npz'):
+            path = os.path.join(cache_dir, name)
+            info = os.stat(path)
+            entries.append((info.st_mtime, info.st_size, path))
+
+    total = sum(entry[1] for entry in entries)
+    for mtime, size, path in sorted(entries):
+        if total <= CACHE_SIZE:
+            break
+        os.remove(path)
+        total -= size
@@ -0,0 +1,67 @@
+# pylint: disable-msg=C0111,C0103
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from openmdao.lib.geometry import bspline
+from openmdao.lib.geometry.bspline import Bspline
+
+
+class BsplineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = bspline.CACHE_DIR
+        self.cache_size = bspline.CACHE_SIZE
+        self.tempdir = tempfile.mkdtemp(prefix='test_bspline-')
+        bspline.CACHE_DIR = self.tempdir
+
+        n = 6
+        x = np.linspace(0., 2., n)**2
+        self.C = np.array(zip(x, np.sin(x)))
+        self.points = np.zeros((25, 3))
+        self.points[:, 0] = np.linspace(0., 4., 25)
+
+    def tearDown(self):
+        bspline.CACHE_DIR = self.cache_dir
+        bspline.CACHE_SIZE = self.cache_size
+        shutil.rmtree(self.tempdir, ignore_errors=True)
+
+    def test_basis(self):
+        for order in (2, 3, 4):
+            bs = Bspline(self.C, self.points, order)
+            t = bs.find(self.points[:, 0])
+            B = bs.B.toarray()
+
+            for j in range(bs.n):
+                expected = bs.b_jn(j, bs.degree, t)
+                if j == bs.n-1:
+                    expected[t == 1] = 1
+                np.testing.assert_allclose(B[:, j], expected, atol=1e-12)
+
+            # Evaluating the curve at found t recovers the x locations.
+            np.testing.assert_allclose(bs.calc(self.C)[:, 0],
+                                       self.points[:, 0], atol=1e-9)
+            np.testing.assert_allclose(bs(t), bs.calc(self.C), atol=1e-12)
+
+    def test_cache(self):
+        bs = Bspline(self.C, self.points)
+        self.assertEqual(len(os.listdir(self.tempdir)), 1)
+
+        bs2 = Bspline(self.C, self.points)
+        self.assertEqual(abs(bs.B - bs2.B).max(), 0.)
+
+        bspline.CACHE_SIZE = 0
+        Bspline(self.C, self.points[:10])
+        self.assertEqual(os.listdir(self.tempdir), [])
+
+        bspline.CACHE_DIR = None
+        bs3 = Bspline(self.C, self.points)
+        self.assertEqual(abs(bs.B - bs3.B).max(), 0.)
+
+
+if __name__ == "__main__":
+    unittest.main()
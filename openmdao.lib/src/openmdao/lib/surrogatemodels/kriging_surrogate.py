@@ -1,17 +1,67 @@
 """ Surrogate model based on Kriging. """
-from math import log, e, sqrt
+from multiprocessing import Pool, current_process
 
 # pylint: disable-msg=E0611,F0401
-from numpy import array, zeros, dot, ones, eye, abs, vstack, exp, \
-                  sum, log10
-from numpy.linalg import det, linalg, lstsq
+from numpy import array, zeros, dot, ones, abs, vstack, exp, sum, log, \
+                  log10, sqrt, diag, newaxis, atleast_2d, column_stack, \
+                  fill_diagonal, eye, outer, tensordot
+from numpy.linalg import det, linalg, lstsq, pinv
+from numpy.random import uniform
 from scipy.linalg import cho_factor, cho_solve
 from scipy.optimize import minimize
 
 from openmdao.main.api import Container
+from openmdao.main.datatypes.api import Enum, Int
 from openmdao.main.interfaces import implements, ISurrogate
 from openmdao.main.uncertain_distributions import NormalDistribution
 
+# bounds on log10(theta) during hyperparameter fitting
+_THETA_BOUNDS = (log10(1e-2), log10(3))
+
+
+def _concentrated_nll(log10t, D, Y, nugget):
+    """Returns the negative concentrated log-likelihood of the training data
+    and its gradient with respect to log10(thetas). D holds the squared
+    distances between training points, with shape (n, n, m)."""
+    n = len(Y)
+    thetas = 10.**log10t
+
+    R = exp(-dot(D, thetas))*(1.0 - nugget)
+    fill_diagonal(R, 1.0)
+
+    try:
+        R_fact = cho_factor(R)
+        Rinv = cho_solve(R_fact, eye(n))
+        log_det = 2.*sum(log(diag(R_fact[0])))
+    except (linalg.LinAlgError, ValueError):
+        Rinv = pinv(R)
+        log_det = log(abs(det(R) + 1.e-16))
+
+    Rinv_one = sum(Rinv, 1)
+    mu = dot(Rinv_one, Y)/sum(Rinv_one)
+    alpha = dot(Rinv, Y - mu)
+    sig2 = dot(Y - mu, alpha)/n
+
+    nll = n/2.*log(sig2) + 1./2.*log_det
+
+    # d(nll)/d(theta_k) = 1/2 tr((Rinv - alpha alpha^T/sig2) dR/d(theta_k))
+    # with dR/d(theta_k) = -D_k*R; mu and sig2 drop out at their optimum.
+    W = 0.5*(Rinv - outer(alpha, alpha)/sig2)*R
+    grad = -log(10.)*thetas*tensordot(W, D, 2)
+
+    return nll, grad
+
+
+def _fit_thetas(args):
+    """Run one L-BFGS-B fit of log10(thetas) from the given start point.
+    Returns a tuple of the final negative log-likelihood and log10(thetas).
+    Module level so that it can be run in a worker process."""
+    D, Y, nugget, start = args
+    bounds = [_THETA_BOUNDS]*len(start)
+    result = minimize(_concentrated_nll, start, args=(D, Y, nugget),
+                      jac=True, method='L-BFGS-B', bounds=bounds)
+    return result.fun, result.x
+
 
 class KrigingSurrogate(Container):
     """Surrogate Modeling method based on the simple Kriging interpolation.
@@ -19,6 +69,20 @@ class KrigingSurrogate(Container):
 
     implements(ISurrogate)
 
+    optimizer = Enum('COBYLA', ['COBYLA', 'L-BFGS-B'],
+                     desc="Optimizer used to fit the correlation parameters. "
+                          "L-BFGS-B uses the analytic gradient of the "
+                          "likelihood and supports multiple restarts.")
+
+    n_restarts = Int(4, low=1,
+                     desc="Number of L-BFGS-B fits to run from different "
+                          "start points. The first start point is the "
+                          "previous fit, if there is one.")
+
+    n_processes = Int(1, low=1,
+                      desc="Number of worker processes used to run the "
+                           "L-BFGS-B restarts.")
+
     def __init__(self):
         super(KrigingSurrogate, self).__init__()
 
@@ -41,55 +105,46 @@ class KrigingSurrogate(Container):
         """Calculates a predicted value of the response based on the current
         trained model for the supplied list of inputs.
         """
+        f, RMSE = self.predict_many(atleast_2d(new_x))
+        return NormalDistribution(f[0], RMSE[0])
+
+    def predict_many(self, new_X):
+        """Calculates predicted values of the response for a batch of points.
+
+        new_X: 2D array (n_points x m)
+            Each row is one set of inputs.
+
+        Returns a tuple of arrays ``(f, RMSE)`` holding the predicted mean
+        and root mean squared error at each point.
+        """
         if self.m is None:  # untrained surrogate
             raise RuntimeError("KrigingSurrogate has not been trained, so no "
                                "prediction can be made")
-        r = zeros(self.n)
-        X, Y = self.X, self.Y
+        X, Y = array(self.X), array(self.Y)
         thetas = 10.**self.thetas
-        XX = array(X)
-        new_x = array(new_x)
-        for i in range(self.n):
-            r[i] = sum(thetas*(XX[i] - new_x)**2.)
-        r = exp(-r)
+        new_X = atleast_2d(array(new_X, dtype=float))
+
+        # correlation of each new point (rows) with each training point (cols)
+        r = exp(-sum(thetas*(new_X[:, newaxis, :] - X[newaxis, :, :])**2., 2))
 
         one = ones(self.n)
+        rhs = column_stack([Y-dot(one, self.mu), one, r.T])
         if self.R_fact is not None:
             #---CHOLESKY DECOMPOSTION ---
-            #f = self.mu+dot(r,cho_solve(self.R_fact,Y-dot(one,self.mu)))
-            #term1 = dot(r,cho_solve(self.R_fact,r))
-            #term2 = (1.0-dot(one,cho_solve(self.R_fact,r)))**2./dot(one,cho_solve(self.R_fact,one))
-
-            rhs = vstack([(Y-dot(one, self.mu)), r, one]).T
-            R_fact = (self.R_fact[0].T, not self.R_fact[1])
-            cho = cho_solve(R_fact, rhs).T
-
-            f = self.mu + dot(r, cho[0])
-            term1 = dot(r, cho[1])
-            term2 = (1.0 - dot(one, cho[1]))**2./dot(one, cho[2])
-
+            sol = cho_solve(self.R_fact, rhs)
         else:
             #-----LSTSQ-------
-            rhs = vstack([(Y-dot(one, self.mu)), r, one]).T
-            lsq = lstsq(self.R.T, rhs)[0].T
+            sol = lstsq(self.R.T, rhs)[0]
+
+        Rinv_r = sol[:, 2:]
+        f = self.mu + dot(r, sol[:, 0])
+        term1 = sum(r.T*Rinv_r, 0)
+        term2 = (1.0 - dot(one, Rinv_r))**2./dot(one, sol[:, 1])
 
-            f = self.mu + dot(r, lsq[0])
-            term1 = dot(r, lsq[1])
-            term2 = (1.0 - dot(one, lsq[1]))**2./dot(one, lsq[2])
-            """
-      #-----LSTSQ-------
-      rhs = vstack([(Y-dot(one, self.mu)), r, one]).T
-      lsq = lstsq(self.R.T, rhs)[0].T
-
-      f = self.mu + dot(r, lsq[0])
-      term1 = dot(r, lsq[1])
-      term2 = (1.0 - dot(one, lsq[1]))**2./dot(one, lsq[2])
-      """
         MSE = self.sig2*(1.0 - term1 + term2)
         RMSE = sqrt(abs(MSE))
 
-        dist = NormalDistribution(f, RMSE)
-        return dist
+        return f, RMSE
 
     def train(self, X, Y):
         """Train the surrogate model with the given set of inputs and outputs."""
@@ -103,11 +158,18 @@ class KrigingSurrogate(Container):
                 self.Y.append(out)
             else: "duplicate training point" """
 
+        previous = self.thetas
+
         self.X = X
         self.Y = Y
         self.m = len(X[0])
         self.n = len(X)
 
+        if self.optimizer == 'L-BFGS-B':
+            self.thetas = self._fit_lbfgsb(previous)
+            self._calculate_log_likelihood()
+            return
+
         thetas = zeros(self.m)
         #print "initial guess", thetas
 
@@ -134,19 +196,50 @@ class KrigingSurrogate(Container):
         #print self.thetas
         self._calculate_log_likelihood()
 
+    def _fit_lbfgsb(self, previous):
+        """Fit log10(thetas) by running n_restarts L-BFGS-B fits, in
+        n_processes worker processes if requested, and return the best.
+        When retraining, e.g. as MetaModel adds training points, the
+        previous thetas are used as the first start point."""
+        X = array(self.X, dtype=float)
+        D = (X[:, newaxis, :] - X[newaxis, :, :])**2.
+        Y = array(self.Y, dtype=float)
+
+        if previous is not None and len(previous) == self.m:
+            starts = [array(previous)]
+        else:
+            starts = [zeros(self.m)]
+        low, high = _THETA_BOUNDS
+        for i in range(self.n_restarts - 1):
+            starts.append(uniform(low, high, self.m))
+
+        args = [(D, Y, self.nugget, start) for start in starts]
+        num_procs = min(self.n_processes, len(starts))
+        if num_procs > 1 and not current_process().daemon:
+            pool = Pool(num_procs)
+            try:
+                results = pool.map(_fit_thetas, args, chunksize=1)
+                pool.close()
+            except Exception:
+                pool.terminate()
+                raise
+            finally:
+                pool.join()
+        else:
+            results = [_fit_thetas(arg) for arg in args]
+
+        return min(results, key=lambda result: result[0])[1]
+
     def _calculate_log_likelihood(self):
         #if self.m == None:
         #    Give error message
-        R = zeros((self.n, self.n))
         X, Y = array(self.X), array(self.Y)
         thetas = 10.**self.thetas
 
         #weighted distance formula
-        for i in range(self.n):
-            R[i, i+1:self.n] = e**(-sum(thetas*(X[i] - X[i+1:self.n])**2., 1))
-
+        R = exp(-sum(thetas*(X[:, newaxis, :] - X[newaxis, :, :])**2., 2))
         R = R*(1.0 - self.nugget)
-        R = R + R.T + eye(self.n)
+        fill_diagonal(R, 1.0)
         self.R = R
 
         one = ones(self.n)
@@ -161,8 +254,9 @@ class KrigingSurrogate(Container):
             self.sig2 = dot(ymdotone, cho_solve(self.R_fact,
                                                 (ymdotone)))/self.n
             #self.log_likelihood = -self.n/2.*log(self.sig2)-1./2.*log(abs(det(self.R)+1.e-16))-sum(thetas)
-            self.log_likelihood = -self.n/2.*log(self.sig2) - \
-                                  1./2.*log(abs(det(self.R) + 1.e-16))
+            # log(det(R)) from the diagonal of the Cholesky factor
+            log_det = 2.*sum(log(diag(self.R_fact[0])))
+            self.log_likelihood = -self.n/2.*log(self.sig2) - 1./2.*log_det
 
         except (linalg.LinAlgError, ValueError):
             #------LSTSQ---------
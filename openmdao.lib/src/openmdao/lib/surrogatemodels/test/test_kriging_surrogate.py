@@ -3,10 +3,13 @@
 import unittest
 import random
 
-from numpy import array, linspace, sin, cos, pi
+import numpy.random as numpy_random
+
+from numpy import array, linspace, sin, cos, pi, eye, newaxis
 from scipy.optimize import minimize
 
-from openmdao.lib.surrogatemodels.kriging_surrogate import KrigingSurrogate
+from openmdao.lib.surrogatemodels.kriging_surrogate import KrigingSurrogate, \
+                                                         _concentrated_nll
 from openmdao.main.uncertain_distributions import NormalDistribution
 
 
@@ -14,6 +17,7 @@ class KrigingSurrogateTests(unittest.TestCase):
 
     def setUp(self):
         random.seed(10)
+        numpy_random.seed(10)  # L-BFGS-B restart points.
 
     def test_1d_kriging1(self):
 
@@ -68,6 +72,79 @@ class KrigingSurrogateTests(unittest.TestCase):
         self.assertAlmostEqual(5.79, pred.sigma, places=0)
         self.assertAlmostEqual(25.34, pred.mu, places=1)
 
+    def test_predict_many(self):
+        x = array([[0.05], [.25], [0.61], [0.95]])
+        y = array([0.738513784857542, -0.210367746201974, -0.489015457891476, 12.3033138316612])
+        krig1 = KrigingSurrogate()
+        krig1.train(x, y)
+
+        new_x = array([[0.05], [0.5], [0.8]])
+        mu, sigma = krig1.predict_many(new_x)
+        self.assertEqual(mu.shape, (3,))
+        self.assertEqual(sigma.shape, (3,))
+
+        for i, point in enumerate(new_x):
+            pred = krig1.predict(point)
+            self.assertAlmostEqual(pred.mu, mu[i], places=10)
+            self.assertAlmostEqual(pred.sigma, sigma[i], places=10)
+
+        self.assertAlmostEqual(y[0], mu[0], places=5)
+        self.assertAlmostEqual(-1.725, mu[1], places=3)
+
+    def test_likelihood_gradient(self):
+        x = array([[-2., 0.], [-0.5, 1.5], [1., 3.], [8.5, 4.5], [-3.5, 6.],
+                   [4., 7.5], [-5., 9.]])/10.
+        y = sin(x[:, 0]*3.) + cos(x[:, 1])
+        D = (x[:, newaxis, :] - x[newaxis, :, :])**2.
+        log10t = array([0.1, -0.5])
+
+        nll, grad = _concentrated_nll(log10t, D, y, 0.)
+        for i, step in enumerate(eye(2)*1e-6):
+            fd = (_concentrated_nll(log10t + step, D, y, 0.)[0] -
+                  _concentrated_nll(log10t - step, D, y, 0.)[0])/2e-6
+            self.assertAlmostEqual(fd, grad[i], places=5)
+
+    def test_lbfgsb_training(self):
+        x = array([[0.05], [.25], [0.61], [0.95]])
+        y = array([0.738513784857542, -0.210367746201974, -0.489015457891476, 12.3033138316612])
+
+        krig1 = KrigingSurrogate()
+        krig1.optimizer = 'L-BFGS-B'
+        krig1.train(x, y)
+        self.assertAlmostEqual(.4771, krig1.thetas[0], places=4)
+
+        pred = krig1.predict(array([0.5]))
+        self.assertAlmostEqual(.41552, pred.sigma, places=3)
+        self.assertAlmostEqual(-1.725, pred.mu, places=3)
+
+        # retrain on an enlarged training set, starting from the last fit
+        x = array([[0.05], [.25], [0.4], [0.61], [0.95]])
+        y = array([0.738513784857542, -0.210367746201974, 0.0, -0.489015457891476, 12.3033138316612])
+        krig1.train(x, y)
+        self.assertAlmostEqual(.4771, krig1.thetas[0], places=4)
+
+    def test_lbfgsb_parallel_restarts(self):
+        def bran(x):
+            y = (x[1]-(5.1/(4.*pi**2.))*x[0]**2.+5.*x[0]/pi-6.)**2.+10.*(1.-1./(8.*pi))*cos(x[0])+10.
+            return y
+
+        x = array([[-2., 0.], [-0.5, 1.5], [1., 3.], [8.5, 4.5], [-3.5, 6.], [4., 7.5], [-5., 9.], [5.5, 10.5],
+                   [10., 12.], [7., 13.5], [2.5, 15.]])
+        y = array([bran(case) for case in x])
+
+        krig1 = KrigingSurrogate()
+        krig1.train(x, y)
+
+        krig2 = KrigingSurrogate()
+        krig2.optimizer = 'L-BFGS-B'
+        krig2.n_restarts = 4
+        krig2.n_processes = 2
+        krig2.train(x, y)
+
+        self.assertTrue(krig2.log_likelihood >= krig1.log_likelihood - 1e-6)
+        pred = krig2.predict([-2., 0.])
+        self.assertAlmostEqual(bran(x[0]), pred.mu, places=5)
+
     def test_get_uncertain_value(self):
         x = array([[0.05], [.25], [0.61], [0.95]])
         y = array([0.738513784857542, -0.210367746201974, -0.489015457891476, 12.3033138316612])
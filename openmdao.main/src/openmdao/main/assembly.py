@@ -9,9 +9,10 @@ import re
 import sys
 import threading
 import traceback
+from collections import OrderedDict
 from itertools import chain
 
-from numpy import ndarray
+from numpy import array, ndarray
 
 # pylint: disable=E0611,F0401
 import networkx as nx
@@ -27,10 +28,11 @@ from openmdao.main.interfaces import implements, IAssembly, IDriver, \
 from openmdao.main.mp_support import has_interface
 from openmdao.main.container import _copydict
 from openmdao.main.component import Component, Container
-from openmdao.main.variable import Variable
+from openmdao.main.variable import Variable, is_legal_name
 from openmdao.main.vartree import VariableTree
 from openmdao.main.datatypes.api import List, Slot, Bool, VarTree
 from openmdao.main.driver import Driver
+from openmdao.main.workflow import Workflow
 from openmdao.main.rbac import rbac
 from openmdao.main.mp_support import is_instance
 from openmdao.main.printexpr import eliminate_expr_ws
@@ -149,6 +151,9 @@ class Assembly(Component):
                     framework_var=True, deriv_ignore=True,
                     desc='Case recording options (only valid at top level).')
 
+    # Maximum number of setups kept in _setup_cache.
+    setup_cache_size = 4
+
     def __init__(self):
 
         super(Assembly, self).__init__()
@@ -167,6 +172,10 @@ class Assembly(Component):
         self._reduced_graph = nx.DiGraph()
         self._setup_depgraph = None
 
+        # setup state for recently used (inputs, outputs) sets, so
+        # alternating calc_gradient requests don't redo the full setup.
+        self._setup_cache = OrderedDict()
+
         for name, trait in self.class_traits().items():
             if trait.iotype:  # input or output
                 self._depgraph.add_boundary_var(self, name, iotype=trait.iotype)
@@ -227,6 +236,82 @@ class Assembly(Component):
         if seqno:
             self._top_driver.workflow.set_initial_count(seqno)
 
+    @rbac(('owner', 'user'))
+    def run_cases(self, inputs, values, outputs, case_uuids, itername='',
+                  seqnos=None):
+        """
+        Run a batch of cases and return ``(results, errors)``.
+        This is typically used by :class:`CaseIteratorDriver` on a remote
+        top level assembly to evaluate several cases in one request.
+
+        inputs: list(string)
+            Paths (or expressions) of inputs to be set.
+
+        values: list
+            For each input, a sequence (typically a :class:`numpy.ndarray`)
+            with one value per case.
+
+        outputs: list(string)
+            Paths (or expressions) of outputs to be returned.
+
+        case_uuids: list(string)
+            Identifier for each case.
+
+        itername: string
+            Iteration coordinates, see :meth:`set_itername`.
+
+        seqnos: list(int)
+            Initial execution count for each case, see :meth:`set_itername`.
+
+        `results` contains a sequence for each output with one value per
+        case, a :class:`numpy.ndarray` if all cases succeeded and the values
+        are numeric. `errors` contains None or a traceback string per case.
+        Output values of failed cases are None.
+        """
+        exprs = {}
+        for name in inputs + outputs:
+            if not is_legal_name(name):
+                exprs[name] = ExprEvaluator(name)
+
+        results = [[] for name in outputs]
+        errors = []
+        for i, case_uuid in enumerate(case_uuids):
+            try:
+                for name, vals in zip(inputs, values):
+                    expr = exprs.get(name)
+                    if expr:
+                        expr.set(vals[i], self)
+                    else:
+                        self.set(name, vals[i])
+                if seqnos:
+                    self.set_itername(itername, seqnos[i])
+                self.run(case_uuid=case_uuid)
+                row = []
+                for name in outputs:
+                    expr = exprs.get(name)
+                    if expr:
+                        row.append(expr.evaluate(self))
+                    else:
+                        row.append(self.get(name))
+            except Exception:
+                errors.append(traceback.format_exc())
+                row = [None] * len(outputs)
+            else:
+                errors.append(None)
+            for result, value in zip(results, row):
+                result.append(value)
+
+        if all([err is None for err in errors]):
+            for i, result in enumerate(results):
+                try:
+                    arr = array(result)
+                except Exception:
+                    continue
+                if arr.dtype.kind in 'biufc':
+                    results[i] = arr
+
+        return (results, errors)
+
     def find_referring_connections(self, name):
         """Returns a list of connections where the given name is referred
         to either in the source or the destination.
@@ -740,6 +825,7 @@ class Assembly(Component):
         self._pre_driver = None
         self.J_input_keys = self.J_output_keys = None
         self._system = None
+        self._setup_cache = OrderedDict()
 
     def _set_failed(self, path, value):
         parts = path.split('.', 1)
@@ -1480,6 +1566,22 @@ class Assembly(Component):
         else:
             comm = None
 
+        # a cached setup is only usable on a single process, where
+        # there are no communicators to set up.
+        if comm is None:
+            key = self._setup_key(inputs, outputs)
+            state = self._setup_cache.pop(key, None)
+            if state is not None and self._setup_valid(state):
+                self._setup_cache[key] = state
+                self.pre_setup()
+                for obj, attrs in state[0]:
+                    for name, val in attrs.items():
+                        setattr(obj, name, val)
+                self.post_setup()
+                return
+        else:
+            key = None
+
         self._var_meta = {}
 
         try:
@@ -1497,6 +1599,88 @@ class Assembly(Component):
             raise
         self.post_setup()
 
+        if key is not None:
+            self._setup_cache[key] = self._get_setup_state()
+            while len(self._setup_cache) > self.setup_cache_size:
+                self._setup_cache.popitem(last=False)
+
+    def _setup_objects(self):
+        """Yields (obj, attrnames) for each object in this Assembly
+        (recursively) whose setup state is stored in the setup cache.
+        """
+        yield self, ('_var_meta', '_setup_depgraph', '_reduced_graph',
+                     'name2collapsed', '_derivs_required', '_system')
+        for comp in self.get_comps_and_pseudos():
+            if has_interface(comp, IDriver):
+                yield comp, ('_system', '_reduced_graph')
+                yield comp.workflow, ('_system', '_reduced_graph',
+                                      '_cycle_vars')
+            elif has_interface(comp, IAssembly):
+                for item in comp._setup_objects():
+                    yield item
+
+    def _setup_key(self, inputs, outputs):
+        """Returns a hashable key identifying a setup for the given `inputs`
+        and `outputs` along with the calc_gradient inputs and outputs
+        of all workflows involved.
+        """
+        def _freeze(names):
+            if names is None:
+                return None
+            return tuple([n if isinstance(n, basestring) else tuple(n)
+                          for n in names])
+
+        grads = []
+        for obj, attrs in self._setup_objects():
+            if isinstance(obj, Workflow):
+                grads.append((
+                    _freeze(getattr(obj, '_calc_gradient_inputs', None)),
+                    _freeze(getattr(obj, '_calc_gradient_outputs', None))))
+
+        derivs = self.parent is not None and self.parent._derivs_required
+        return (_freeze(inputs), _freeze(outputs), derivs, tuple(grads))
+
+    def _get_setup_state(self):
+        """Returns a snapshot of the current setup: a list of
+        (obj, attrs) and a list of (scope, varname, shape) for all
+        array variables sized during setup.
+        """
+        objs = []
+        shapes = []
+        for obj, names in self._setup_objects():
+            attrs = {}
+            for name in names:
+                if hasattr(obj, name):
+                    attrs[name] = getattr(obj, name)
+            objs.append((obj, attrs))
+            if isinstance(obj, Assembly):
+                for name, meta in obj._var_meta.items():
+                    if 'shape' in meta and isinstance(name, basestring):
+                        shapes.append((obj, name, meta['shape']))
+        return (objs, shapes)
+
+    def _setup_valid(self, state):
+        """Returns True if the given setup state may be reused, i.e., the
+        model still contains the same objects and no variable has changed
+        shape since the state was saved.
+        """
+        objs, shapes = state
+        current = [obj for obj, names in self._setup_objects()]
+        if len(current) != len(objs):
+            return False
+        for obj, (old, attrs) in zip(current, objs):
+            if obj is not old:
+                return False
+
+        for scope, name, shape in shapes:
+            try:
+                val, idx = get_val_and_index(scope, name)
+            except Exception:
+                return False
+            if getattr(val, 'shape', None) != shape:
+                return False
+        return True
+
 
 def dump_iteration_tree(obj, f=sys.stdout, full=True, tabsize=4, derivs=False):
     """Returns a text version of the iteration tree
@@ -0,0 +1,163 @@
+"""
+Support for overlapping the execution of independent components which
+spend most of their time waiting, such as
+:class:`openmdao.lib.components.external_code.ExternalCode` running a
+local command.
+
+Each component is run in its own thread, but only one thread at a time
+holds the run lock and executes Python code (so the current directory and
+model data aren't changed underneath a component). A component releases
+the run lock while it waits by using :func:`waiting`, and may limit the
+number of concurrently executing local processes via :func:`process_slot`.
+Outside of :func:`run_concurrently` both are no-ops.
+"""
+
+import os
+import sys
+import threading
+from contextlib import contextmanager
+import Queue
+
+from openmdao.main.rbac import get_credentials, set_credentials
+from openmdao.util.wrkpool import WorkerPool
+
+_RUN_LOCK = threading.Lock()  # Held by the thread executing Python code.
+_STATE = threading.local()    # `active` is True while holding _RUN_LOCK.
+
+_SLOTS = None  # Semaphore limiting concurrent local processes.
+_SLOTS_LOCK = threading.Lock()
+
+
+def is_concurrent():
+    """ Return True if the current thread is part of a concurrent run. """
+    return getattr(_STATE, 'active', False)
+
+
+def run_concurrently(calls):
+    """
+    Call each of `calls` (a list of callables taking no arguments) in a
+    separate thread and wait for all of them to complete. If any call raises
+    an exception, the first exception (by order in `calls`) is re-raised
+    after all calls have completed.
+    """
+    outermost = not is_concurrent()
+    if outermost:
+        _RUN_LOCK.acquire()
+        _STATE.active = True
+
+    try:
+        cwd = os.getcwd()
+        credentials = get_credentials()
+        reply_q = Queue.Queue()
+        workers = []
+        for i, call in enumerate(calls):
+            worker_q = WorkerPool.get()
+            worker_q.put((_run, (i, call, cwd, credentials), {}, reply_q))
+            workers.append(worker_q)
+
+        errors = {}
+        with waiting():
+            for worker_q in workers:
+                worker_q, retval, exc, trace = reply_q.get()
+                WorkerPool.release(worker_q)
+                if retval is not None:
+                    index, exc_info = retval
+                    errors[index] = exc_info
+                elif exc is not None:  # pragma no cover
+                    errors[len(calls)] = (RuntimeError, RuntimeError(trace),
+                                          None)
+        if errors:
+            exc_info = errors[min(errors)]
+            raise exc_info[0], exc_info[1], exc_info[2]
+    finally:
+        if outermost:
+            _STATE.active = False
+            _RUN_LOCK.release()
+
+
+def _run(index, call, cwd, credentials):
+    """
+    Run `call` in a worker thread while holding the run lock.
+    Returns ``(index, sys.exc_info())`` if `call` raised an exception.
+    """
+    set_credentials(credentials)
+    _RUN_LOCK.acquire()
+    _STATE.active = True
+    try:
+        os.chdir(cwd)
+        call()
+    except Exception:
+        return (index, sys.exc_info())
+    finally:
+        _STATE.active = False
+        _RUN_LOCK.release()
+
+
+@contextmanager
+def waiting():
+    """
+    Context manager to be used around waiting for something external, such
+    as a process. If running concurrently, other components may run while
+    this thread waits. The current directory is restored on exit.
+    """
+    if not is_concurrent():
+        yield
+        return
+
+    cwd = os.getcwd()
+    _STATE.active = False
+    _RUN_LOCK.release()
+    try:
+        yield
+    finally:
+        _RUN_LOCK.acquire()
+        _STATE.active = True
+        os.chdir(cwd)
+
+
+@contextmanager
+def process_slot():
+    """
+    Context manager to hold one of the local host's process slots while
+    running a local process. If running concurrently, this blocks (allowing
+    other components to run) until a slot is available. The number of slots
+    is obtained from the first :class:`LocalAllocator` registered with the
+    :class:`ResourceAllocationManager` when first needed.
+    """
+    if not is_concurrent():
+        yield
+        return
+
+    slots = _get_slots()
+    if not slots.acquire(False):
+        with waiting():
+            slots.acquire()
+    try:
+        yield
+    finally:
+        slots.release()
+
+
+def _get_slots():
+    """ Return semaphore limiting concurrent local processes. """
+    global _SLOTS
+    with _SLOTS_LOCK:
+        if _SLOTS is None:
+            _SLOTS = threading.Semaphore(local_process_limit())
+        return _SLOTS
+
+
+def local_process_limit():
+    """
+    Return the number of local processes which may run concurrently,
+    as reported by the first :class:`LocalAllocator`.
+    """
+    # Avoid import cycle (resource -> ... -> systems -> concurrency).
+    from openmdao.main.resource import ResourceAllocationManager as RAM
+    from openmdao.main.resource import LocalAllocator
+
+    for allocator in RAM.list_allocators():
+        if isinstance(allocator, LocalAllocator):
+            count, info = allocator.max_servers({})
+            return max(count, 1)
+    return 1
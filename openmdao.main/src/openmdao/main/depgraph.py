@@ -1555,6 +1555,28 @@ def find_all_connecting(graph, start, end):
 
     return fwdset.intersection(backset)
 
+def find_reachable(graph, nodes, reverse=False):
+    """Return the set of all nodes that can be reached from
+    any of the given nodes, including the nodes themselves.
+    If reverse is True, edges are followed backwards.
+    """
+    if reverse:
+        Gnext = graph.pred
+    else:
+        Gnext = graph.succ
+
+    reachable = set()
+
+    tmplst = list(nodes)
+    while tmplst:
+        node = tmplst.pop()
+        if node in reachable:
+            continue
+        reachable.add(node)
+        tmplst.extend(Gnext[node].keys())
+
+    return reachable
+
 def _dfs_connections(G, source, visited, reverse=False):
     """Produce connections in a depth-first-search starting at source."""
     # Slightly modified version of the networkx function dfs_edges
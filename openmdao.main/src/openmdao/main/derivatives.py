@@ -184,26 +184,7 @@ def applyJ(system, variables):
         #print 'applyJ', obj.name, arg, result
         return
 
-    if is_sys:
-        input_keys = system.list_inputs() + system.list_states()
-        output_keys = system.list_outputs() + system.list_residuals()
-    elif IAssembly.providedBy(obj):
-        input_keys = [item.partition('.')[-1] \
-                      for item in system.list_inputs()]
-        output_keys = [item.partition('.')[-1] \
-                       for item in system.list_outputs()]
-    else:
-        input_keys, output_keys = list_deriv_vars(obj)
-
-    #print 'J', input_keys, output_keys, J
-
-    # The Jacobian from provideJ is a 2D array containing the derivatives of
-    # the flattened output_keys with respect to the flattened input keys. We
-    # need to find the start and end index of each input and output.
-
-    if obj._provideJ_bounds is None:
-        obj._provideJ_bounds = get_bounds(obj, input_keys, output_keys, J)
-    ibounds, obounds = obj._provideJ_bounds
+    ibounds, obounds = provideJ_bounds(system, J)
 
     for okey in result:
 
@@ -369,23 +350,7 @@ def applyJT(system, variables):
         #print 'applyJT', obj.name, arg, result
         return
 
-    if is_sys:
-        input_keys = system.list_inputs() + system.list_states()
-        output_keys = system.list_outputs() + system.list_residuals()
-    elif IAssembly.providedBy(obj):
-        input_keys = [item.partition('.')[-1] \
-                      for item in system.list_inputs()]
-        output_keys = [item.partition('.')[-1] \
-                       for item in system.list_outputs()]
-    else:
-        input_keys, output_keys = list_deriv_vars(obj)
-
-    # The Jacobian from provideJ is a 2D array containing the derivatives of
-    # the flattened output_keys with respect to the flattened input keys. We
-    # need to find the start and end index of each input and output.
-    if obj._provideJ_bounds is None:
-        obj._provideJ_bounds = get_bounds(obj, input_keys, output_keys, J)
-    obounds, ibounds = obj._provideJ_bounds
+    obounds, ibounds = provideJ_bounds(system, J)
 
     used = set()
     for okey in result:
@@ -482,6 +447,34 @@ def applyMinvT(obj, inputs, shape_cache):
 
     return inputs
 
+def provideJ_bounds(system, J):
+    """ Returns the pair of dictionaries from get_bounds that locate each
+    input and output of the system's component in its Jacobian J. They are
+    cached on the component.
+    """
+
+    obj = system.inner()
+
+    # The Jacobian from provideJ is a 2D array containing the derivatives of
+    # the flattened output_keys with respect to the flattened input keys. We
+    # need to find the start and end index of each input and output.
+    if obj._provideJ_bounds is None:
+
+        if ISystem.providedBy(obj):
+            input_keys = system.list_inputs() + system.list_states()
+            output_keys = system.list_outputs() + system.list_residuals()
+        elif IAssembly.providedBy(obj):
+            input_keys = [item.partition('.')[-1] \
+                          for item in system.list_inputs()]
+            output_keys = [item.partition('.')[-1] \
+                           for item in system.list_outputs()]
+        else:
+            input_keys, output_keys = list_deriv_vars(obj)
+
+        obj._provideJ_bounds = get_bounds(obj, input_keys, output_keys, J)
+
+    return obj._provideJ_bounds
+
 def get_bounds(obj, input_keys, output_keys, J):
     """ Returns a pair of dictionaries that contain the stop and end index
     for each input and output in a pair of lists.
@@ -5,7 +5,10 @@ __all__ = ["Driver"]
 
 # pylint: disable=E0611,F0401
 
+from collections import OrderedDict
+
 from networkx.algorithms.components import strongly_connected_components
+from numpy import asarray
 
 from openmdao.main.mpiwrap import PETSc
 from openmdao.main.component import Component
@@ -58,6 +61,23 @@ class GradientOptions(VariableTree):
                                        "the full fd space.",
                                        framework_var=True)
 
+    fd_processes = Int(1, low=1,
+                       desc="Number of worker processes used to compute the "
+                            "finite difference columns of the Jacobian "
+                            "concurrently. Each worker runs the model on its "
+                            "own forked copy of the current model, so "
+                            "components must not depend on shared files "
+                            "being written in the current directory.",
+                       framework_var=True)
+
+    fd_coloring = Bool(False, desc="Set to True to detect the sparsity "
+                                   "pattern of the finite difference "
+                                   "Jacobian on the first calculation and "
+                                   "then perturb inputs that affect "
+                                   "different outputs together in the "
+                                   "same model run.",
+                       framework_var=True)
+
     fd_blocks = List([], desc="List of lists that contain comps which "
                               "should be finite-differenced together.",
                               framework_var=True)
@@ -79,7 +99,8 @@ class GradientOptions(VariableTree):
     #                          'by adding sets of component names.')
 
     # Linear Solver settings
-    lin_solver = Enum('scipy_gmres', ['scipy_gmres', 'petsc_ksp', 'linear_gs'],
+    lin_solver = Enum('scipy_gmres', ['scipy_gmres', 'petsc_ksp', 'linear_gs',
+                                      'direct_sparse'],
                       desc='Method to use for gradient calculation',
                       framework_var=True)
 
@@ -90,6 +111,12 @@ class GradientOptions(VariableTree):
                                framework_var=True)
     maxiter = Int(100, desc='Maximum number of iterations for the linear solver.',
                   framework_var=True)
+    gmres_block_size = Int(1, low=1,
+                           desc='Number of right-hand sides that the '
+                           'scipy_gmres linear solver solves together in a '
+                           'single block GMRES solve. The default of 1 '
+                           'solves one column at a time.',
+                           framework_var=True)
 
     def _lin_solver_changed(self, oldls, newls):
         # if PETSc has been imported prior to the creation of a remote object using
@@ -129,6 +156,13 @@ class Driver(Component):
                             "resulting System will always be serial.",
                        framework_var=True)
 
+    memo_size = Int(0, low=0, framework_var=True,
+                    desc='Number of design points for which a driver that '
+                         'supports it keeps evaluated objective, constraint '
+                         'and gradient values, so that revisiting a point '
+                         "doesn't rerun the workflow. Values are discarded at "
+                         'the start of each execution. 0 disables.')
+
     def __init__(self):
         self._iter = None
         super(Driver, self).__init__()
@@ -136,6 +170,7 @@ class Driver(Component):
         self.workflow = Dataflow(self)
         self._required_compnames = None
         self._reduced_graph = None
+        self._memo_clear()
 
         # clean up unwanted trait from Component
         self.remove_trait('missing_deriv_policy')
@@ -428,6 +463,9 @@ class Driver(Component):
 
         # Reset the workflow.
         self.workflow.reset()
+
+        # Inputs outside of the driver may have changed since last time.
+        self._memo_clear()
         super(Driver, self).run(case_uuid)
 
     @rbac(('owner', 'user'))
@@ -489,6 +527,7 @@ class Driver(Component):
 
     def run_iteration(self):
         """Runs workflow."""
+        self._memo_point = None
         wf = self.workflow
         if len(wf) == 0:
             self._logger.warning("'%s': workflow is empty!"
@@ -496,6 +535,68 @@ class Driver(Component):
 
         wf.run()
 
+    def _memo_clear(self):
+        """Discard all memoized evaluations and reset hit statistics."""
+        self._memo = OrderedDict()
+        self._memo_point = None  # Key of point workflow was last run at.
+        self._memo_last = None   # Last point looked up.
+        self.memo_hits = 0
+        self.memo_misses = 0
+
+    def memo_lookup(self, x, kind):
+        """Returns the value of `kind` (for example 'func' or 'grad') saved
+        by :meth:`memo_store` for design vector `x`, or None.
+        """
+        x = asarray(x, dtype=float)
+        self._memo_last = x.copy()
+        if self.memo_size < 1:
+            return None
+
+        key = x.tostring()
+        entry = self._memo.pop(key, None)
+        if entry is not None:
+            self._memo[key] = entry  # Most recently used.
+            if kind in entry:
+                self.memo_hits += 1
+                return entry[kind]
+        self.memo_misses += 1
+        return None
+
+    def memo_store(self, x, kind, value):
+        """Save `value` of `kind` for design vector `x`, discarding the least
+        recently used point if more than `memo_size` points are saved.
+        """
+        if self.memo_size < 1:
+            return
+
+        key = asarray(x, dtype=float).tostring()
+        entry = self._memo.pop(key, None) or {}
+        entry[kind] = value
+        self._memo[key] = entry
+        while len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+
+    def memo_run(self, x):
+        """Set parameters to design vector `x` and run the workflow, unless
+        it was already run at `x` by a previous call.
+        """
+        key = asarray(x, dtype=float).tostring()
+        if self.memo_size < 1 or key != self._memo_point:
+            self.set_parameters(x)
+            Driver.run_iteration(self)
+            self._memo_point = key
+
+    def memo_finish(self):
+        """Leave the model at the last point looked up, which may not be
+        where the workflow was last run if that lookup was a hit.
+        """
+        if self.memo_size < 1:
+            return
+        if self._memo_last is not None:
+            self.memo_run(self._memo_last)
+        self._logger.debug('memo hits: %d, misses: %d',
+                           self.memo_hits, self.memo_misses)
+
     def calc_derivatives(self, first=False, second=False):
         """ Calculate derivatives and save baseline states for all components
         in this workflow."""
@@ -579,9 +680,10 @@ class Driver(Component):
             forward or adjoint based on problem dimensions. Set to 'fd' to
             finite difference the entire workflow.
 
-        return_format: string in ['array', 'dict']
+        return_format: string in ['array', 'dict', 'sparse']
             Format for return value. Default is array, but some optimizers may
-            want a dictionary instead.
+            want a dictionary instead. 'sparse' returns a scipy.sparse CSR
+            matrix that only stores the nonzero entries.
 
         force_regen: boolean
             Set to True to force a regeneration of the system hierarchy. This
@@ -2,14 +2,39 @@
 """
 
 # pylint: disable=E0611,F0401
+import sys
+from multiprocessing import Pool, current_process
 from sys import float_info
 
 from openmdao.main.array_helpers import flattened_size
+from openmdao.main.depgraph import find_reachable
 from openmdao.main.interfaces import IVariableTree
 from openmdao.main.mp_support import has_interface
+from openmdao.main.mpiwrap import MPI
 from openmdao.util.graph import base_var
 
-from numpy import ndarray, zeros, ones, unravel_index, complex128
+from numpy import ndarray, zeros, ones, unravel_index, complex128, \
+                  column_stack, where, concatenate, repeat
+from numpy.random import uniform
+from scipy.sparse import coo_matrix
+
+# FiniteDifference object whose columns are being computed by forked worker
+# processes. Set only while FiniteDifference._run_parallel is active.
+_FD_WORKER = None
+
+
+def _fd_worker_group(args):
+    """Compute one group of Jacobian columns in a worker process."""
+    group, iterbase = args
+    return _FD_WORKER._run_group(group, iterbase)
+
+
+def _can_fork():
+    """Returns True if columns can be computed in forked worker processes.
+    Forking isn't available on Windows, doesn't mix with MPI, and isn't
+    allowed from daemonic processes such as our own server processes."""
+    return sys.platform != 'win32' and not MPI and \
+           not current_process().daemon
 
 
 class FiniteDifference(object):
@@ -153,6 +178,10 @@ class FiniteDifference(object):
                     osize = self.system.vec['u'][okey].size
                     isize = self.system.vec['p'][ikey].size
                     self.J[okey][ikey] = zeros((osize, isize))
+        elif return_format == 'sparse':
+            # Built from the nonzero entries of each column in solve.
+            self.J = None
+            self.J_shape = (out_size, in_size)
         else:
             self.J = zeros((out_size, in_size))
 
@@ -160,15 +189,84 @@ class FiniteDifference(object):
         self.y = zeros((out_size,))
         self.y2 = zeros((out_size,))
 
+        # Sparsity pattern of the Jacobian, used for column coloring.
+        self.sparsity = None
+        self.sparsity_probes = 2
+
     def solve(self, iterbase=''):
         """Return Jacobian for all inputs and outputs."""
 
         iterbase = 'fd-' + iterbase
         uvec = self.system.vec['u']
+        options = self.system.options
 
         uvec.set_to_array(self.y_base,
                           self.outputs)
 
+        columns = self._plan_columns()
+
+        # Once we know the sparsity pattern, structurally orthogonal columns
+        # can share a single model run.
+        if options.fd_coloring and self.sparsity is not None:
+            groups = self._color_columns(columns)
+        else:
+            groups = [[column] for column in columns]
+
+        num_procs = min(options.fd_processes, len(groups))
+        if num_procs > 1 and _can_fork():
+            results = self._run_parallel(groups, iterbase, num_procs)
+        else:
+            results = (self._run_group(group, iterbase) for group in groups)
+
+        jac_cols = [None]*len(columns)
+        rows, cols, vals = [], [], []
+        for group, Jfds in zip(groups, results):
+            for column, Jfd in zip(group, Jfds):
+                src, i1, i = column[0], column[1], column[2]
+                jac_cols[i] = Jfd
+
+                # Pack Jacobian in either an array or a dictionary.
+                if self.return_format == 'dict':
+                    start = end = 0
+                    for okey in self.outputs:
+
+                        sz = uvec[okey].size
+                        end += sz
+                        #print Jfd, start, end, i, self.J
+                        self.J[okey][src][:, i-i1] = Jfd[start:end]
+                        start += sz
+                elif self.return_format == 'sparse':
+                    nonzero = Jfd.nonzero()[0]
+                    rows.append(nonzero)
+                    cols.append(repeat(i, len(nonzero)))
+                    vals.append(Jfd[nonzero])
+                else:
+                    self.J[:, i] = Jfd
+
+        if self.return_format == 'sparse':
+            if vals:
+                rows = concatenate(rows)
+                cols = concatenate(cols)
+                vals = concatenate(vals)
+            self.J = coo_matrix((vals, (rows, cols)),
+                                shape=self.J_shape).tocsr()
+
+        if options.fd_coloring and self.sparsity is None:
+            self._detect_sparsity(columns, jac_cols, iterbase)
+
+        # Restore final inputs/outputs.
+        uvec.set_from_array(self.y_base, self.outputs)
+        uvec.set_to_scope(self.scope)
+
+        #print 'after FD', self.J
+        return self.J
+
+    def _plan_columns(self):
+        """Return a list of (src, i1, i, fd_step, form) tuples, one for each
+        column of the Jacobian, giving the step and difference form that
+        will be used to compute it."""
+
+        columns = []
         for j, src, in enumerate(self.inputs):
             # Users can customize the FD per variable
             if j in self.form_custom:
@@ -212,105 +310,239 @@ class FiniteDifference(object):
                     if current_val + fd_step > bound_val:
                         form = 'backward'
 
-                #--------------------
-                # Forward difference
-                #--------------------
-                if form == 'forward':
+                columns.append((src, i1, i, fd_step, form))
+
+        return columns
+
+    def _run_group(self, group, iterbase):
+        """Run the model for the step(s) of a group of Jacobian columns that
+        are perturbed together and return the differenced outputs for each
+        column. All columns in a group share the same difference form, and
+        a group with more than one column must be structurally orthogonal,
+        i.e., no output depends on more than one of its columns."""
+
+        form = group[0][4]
+
+        #--------------------
+        # Forward difference
+        #--------------------
+        if form == 'forward':
+
+            # Step
+            self._step_group(group, 1.0)
+
+            self.system.run(iterbase)
+            self.get_outputs(self.y)
+
+            # Forward difference
+            delta = self.y - self.y_base
+            denom = 1.0
+
+            # Undo step
+            self._step_group(group, -1.0)
+
+        #--------------------
+        # Backward difference
+        #--------------------
+        elif form == 'backward':
+
+            # Step
+            self._step_group(group, -1.0)
 
-                    # Step
-                    self.set_value(src, fd_step, i-i1)
+            self.system.run(iterbase)
+            self.get_outputs(self.y)
 
-                    self.system.run(iterbase)
-                    self.get_outputs(self.y)
+            # Backward difference
+            delta = self.y_base - self.y
+            denom = 1.0
 
-                    # Forward difference
-                    Jfd = (self.y - self.y_base)/fd_step
+            # Undo step
+            self._step_group(group, 1.0)
 
-                    # Undo step
-                    self.set_value(src, -fd_step, i-i1)
+        #--------------------
+        # Central difference
+        #--------------------
+        elif form == 'central':
 
-                #--------------------
-                # Backward difference
-                #--------------------
-                elif form == 'backward':
+            # Forward Step
+            self._step_group(group, 1.0)
 
-                    # Step
-                    self.set_value(src, -fd_step, i-i1)
+            self.system.run(iterbase)
+            self.get_outputs(self.y)
 
-                    self.system.run(iterbase)
-                    self.get_outputs(self.y)
+            # Backward Step
+            self._step_group(group, -2.0)
 
-                    # Backward difference
-                    Jfd = (self.y_base - self.y)/fd_step
+            self.system.run(iterbase)
+            self.get_outputs(self.y2)
 
-                    # Undo step
-                    self.set_value(src, fd_step, i-i1)
+            # Central difference
+            delta = self.y - self.y2
+            denom = 2.0
 
-                #--------------------
-                # Central difference
-                #--------------------
-                elif form == 'central':
+            # Undo step
+            self._step_group(group, 1.0)
 
-                    # Forward Step
-                    self.set_value(src, fd_step, i-i1)
+        #--------------------
+        # Complex Step
+        #--------------------
+        elif form == 'complex_step':
 
-                    self.system.run(iterbase)
-                    self.get_outputs(self.y)
+            yc = zeros(len(self.y), dtype=complex128)
+            self.system.set_complex_step(True)
 
-                    # Backward Step
-                    self.set_value(src, -2.0*fd_step, i-i1)
+            # Step
+            for src, i1, i, fd_step, form in group:
+                self.set_value_complex(src, fd_step, i-i1)
 
-                    self.system.run(iterbase)
-                    self.get_outputs(self.y2)
+            self.system.run(iterbase)
+            self.get_complex_outputs(yc)
 
-                    # Central difference
-                    Jfd = (self.y - self.y2)/(2.0*fd_step)
+            # Forward difference
+            delta = yc.imag
+            denom = 1.0
 
-                    # Undo step
-                    self.set_value(src, fd_step, i-i1)
+            # Undo step
+            for src, i1, i, fd_step, form in group:
+                self.set_value_complex(src, fd_step, i-i1,
+                                       undo_complex=True)
+            self.system.set_complex_step(False)
 
-                #--------------------
-                # Complex Step
-                #--------------------
-                elif form == 'complex_step':
+        if len(group) == 1:
+            return [delta/(denom*group[0][3])]
+
+        # Each output only responds to one column in the group, so pick out
+        # the rows that belong to each column.
+        return [where(self.sparsity[:, i], delta/(denom*fd_step), 0.0)
+                for src, i1, i, fd_step, form in group]
+
+    def _step_group(self, group, scale):
+        """Step every column in the group by scale times its stepsize."""
+
+        for src, i1, i, fd_step, form in group:
+            self.set_value(src, scale*fd_step, i-i1)
+
+    def _run_parallel(self, groups, iterbase, num_procs):
+        """Run the given groups of columns in a pool of forked worker
+        processes. Each worker starts from a copy of the model as it is right
+        now, so the groups can be run independently of each other and of
+        this process. Returns the differenced outputs in group order."""
+
+        global _FD_WORKER
+        _FD_WORKER = self
+        pool = Pool(num_procs)
+        try:
+            results = pool.map(_fd_worker_group,
+                               [(group, iterbase) for group in groups],
+                               chunksize=1)
+            pool.close()
+        except Exception:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+            _FD_WORKER = None
+
+        return results
+
+    def _detect_sparsity(self, columns, jac_cols, iterbase):
+        """Determine the sparsity pattern of the Jacobian from the fully
+        computed columns in jac_cols. Entries that the dependency graph
+        shows can't be connected are always zero. Because an entry can also
+        be zero at this particular point by coincidence, a few runs with
+        all inputs perturbed by random steps are compared against the
+        Jacobian, and any output that doesn't match is treated as
+        depending on every input it is connected to in the graph."""
+
+        mask = self._graph_mask(len(columns))
+        sparsity = (column_stack(jac_cols) != 0.0) & mask
+
+        for probe in range(self.sparsity_probes):
+            steps = zeros(len(columns))
+            for column in columns:
+                src, i1, i, fd_step, form = column
+                sign = -1.0 if form == 'backward' else 1.0
+                steps[i] = sign*fd_step*uniform(0.5, 1.0)
+                self.set_value(src, steps[i], i-i1)
 
-                    complex_step = fd_step
-                    yc = zeros(len(self.y), dtype=complex128)
-                    self.system.set_complex_step(True)
+            self.system.run(iterbase)
+            self.get_outputs(self.y)
 
-                    # Step
-                    self.set_value_complex(src, complex_step, i-i1)
+            for column in columns:
+                src, i1, i, fd_step, form = column
+                self.set_value(src, -steps[i], i-i1)
 
-                    self.system.run(iterbase)
-                    self.get_complex_outputs(yc)
+            delta = self.y - self.y_base
+            predicted = zeros(len(delta))
+            for i, Jfd in enumerate(jac_cols):
+                predicted += Jfd*steps[i]
 
-                    # Forward difference
-                    Jfd = (yc/fd_step).imag
+            missed = abs(delta - predicted) > \
+                     1.0e-3*(abs(delta) + abs(predicted))
+            sparsity[missed, :] = mask[missed, :]
 
-                    # Undo step
-                    self.set_value_complex(src, complex_step, i-i1,
-                                           undo_complex=True)
-                    self.system.set_complex_step(False)
+        self.sparsity = sparsity
 
-                # Pack Jacobian in either an array or a dictionary.
-                if self.return_format == 'dict':
-                    start = end = 0
-                    for okey in self.outputs:
+    def _graph_mask(self, num_cols):
+        """Return a boolean array with the shape of the Jacobian that is
+        False wherever the dependency graph shows there is no path from an
+        input to an output."""
 
-                        sz = uvec[okey].size
-                        end += sz
-                        #print Jfd, start, end, i, self.J
-                        self.J[okey][src][:, i-i1] = Jfd[start:end]
-                        start += sz
-                else:
-                    self.J[:, i] = Jfd
+        dgraph = self.scope._depgraph
+        uvec = self.system.vec['u']
 
-        # Restore final inputs/outputs.
-        uvec.set_from_array(self.y_base, self.outputs)
-        uvec.set_to_scope(self.scope)
+        out_bounds = []
+        start = 0
+        for okey in self.outputs:
+            end = start + uvec[okey].size
+            out_bounds.append((base_var(dgraph, okey), start, end))
+            start = end
 
-        #print 'after FD', self.J
-        return self.J
+        mask = ones((start, num_cols), dtype=bool)
+
+        for srcs in self.inputs:
+
+            # Support for parameter groups
+            if isinstance(srcs, basestring):
+                srcs = [srcs]
+
+            nodes = [base_var(dgraph, src) for src in srcs]
+            if not all(node in dgraph for node in nodes):
+                continue
+
+            # Everything downstream of the input.
+            reachable = find_reachable(dgraph, nodes)
+
+            i1, i2 = self.in_bounds[srcs[0]]
+            for onode, o1, o2 in out_bounds:
+                if onode in dgraph and onode not in reachable:
+                    mask[o1:o2, i1:i2] = False
+
+        return mask
+
+    def _color_columns(self, columns):
+        """Greedily partition the columns into groups that are structurally
+        orthogonal and share the same difference form, so that each group
+        needs only one set of model runs."""
+
+        sparsity = self.sparsity
+        groups = []
+        used_rows = []
+
+        # Densest columns first gives fewer colors.
+        order = sorted(columns, key=lambda col: -sparsity[:, col[2]].sum())
+        for column in order:
+            rows = sparsity[:, column[2]]
+            for group, used in zip(groups, used_rows):
+                if group[0][4] == column[4] and not (used & rows).any():
+                    group.append(column)
+                    used |= rows
+                    break
+            else:
+                groups.append([column])
+                used_rows.append(rows.copy())
+
+        return groups
 
     def get_outputs(self, x):
         """Return matrix of flattened values from output edges."""
@@ -8,7 +8,7 @@ import operator
 import ordereddict
 import weakref
 
-from numpy import ndarray
+from numpy import array, concatenate, ndarray
 
 from openmdao.main.expreval import ExprEvaluator
 from openmdao.main.interfaces import IHas2SidedConstraints, IDriver
@@ -61,6 +61,31 @@ def _get_scope(obj, scope=None):
     return scope
 
 
+def _gather_outputs(delegate, names):
+    """ Returns the values of the pseudocomp outputs of `delegate` as a flat
+    array taken directly from the 'u' vector of the parent driver's
+    workflow system, or None if that isn't possible (e.g., the workflow
+    hasn't been set up yet).  `names` is a callable returning the output
+    names, called only when the vector has changed since the last call.
+    """
+    try:
+        uvec = delegate.parent.workflow._system.vec['u']
+    except (AttributeError, KeyError, TypeError):
+        return None
+
+    # Any configuration change replaces the workflow's system, so
+    # the index array is valid for as long as the vector is.
+    cache = delegate._gather_cache
+    if cache is None or cache[0]() is not uvec:
+        cache = (weakref.ref(uvec), uvec.gather_indices(names()))
+        delegate._gather_cache = cache
+
+    idxs = cache[1]
+    if idxs is None:
+        return None
+    return uvec.array[idxs]
+
+
 class Constraint(object):
     """ Object that stores info for a single constraint. """
 
@@ -382,22 +407,42 @@ class _HasConstraintsBase(object):
     def __init__(self, parent, allowed_types=None):
         self._constraints = ordereddict.OrderedDict()
         self._parent = None if parent is None else weakref.ref(parent)
+        self._gather_cache = None
 
     def __getstate__(self):
         state = self.__dict__.copy()
         state['_parent'] = self.parent
+        state['_gather_cache'] = None
         return state
 
     def __setstate__(self, state):
         self.__dict__.update(state)
         parent = state['_parent']
         self._parent = None if parent is None else weakref.ref(parent)
+        self._gather_cache = None
 
     @property
     def parent(self):
         """ The object we are a delegate of. """
         return None if self._parent is None else self._parent()
 
+    def _eval_array(self, scope):
+        """Returns the values of all constraints as a flat array. When
+        evaluated in the driver's own scope after the model has been set up,
+        the values are gathered from the workflow's 'u' vector in one
+        operation rather than by evaluating each constraint.
+        """
+        if scope is _get_scope(self):
+            vals = _gather_outputs(self, lambda: ['%s.out0' % c.pcomp_name
+                                     for c in self._constraints.values()])
+            if vals is not None:
+                return vals
+
+        result = []
+        for constraint in self._constraints.values():
+            result.extend(constraint.evaluate(scope))
+        return array(result)
+
     def remove_constraint(self, key):
         """Removes the constraint with the given string."""
         key = _remove_spaces(key)
@@ -657,9 +702,12 @@ class HasEqConstraints(_HasConstraintsBase):
             return dict((key, value) for key, value in self._constraints.iteritems() \
                         if value.linear==linear)
 
-    def eval_eq_constraints(self, scope=None):
-        """Returns a list of constraint values."""
+    def eval_eq_constraints(self, scope=None, as_array=False):
+        """Returns a list of constraint values, or a flat array of them
+        if `as_array` is True."""
         scope = _get_scope(self, scope)
+        if as_array:
+            return self._eval_array(scope)
         result = []
         for constraint in self._constraints.values():
             result.extend(constraint.evaluate(scope))
@@ -795,9 +843,12 @@ class HasIneqConstraints(_HasConstraintsBase):
 
         return self._constraints
 
-    def eval_ineq_constraints(self, scope=None):
-        """Returns a list of constraint values."""
+    def eval_ineq_constraints(self, scope=None, as_array=False):
+        """Returns a list of constraint values, or a flat array of them
+        if `as_array` is True."""
         scope = _get_scope(self, scope)
+        if as_array:
+            return self._eval_array(scope)
         result = []
         for constraint in self._constraints.values():
             result.extend(constraint.evaluate(scope))
@@ -1014,16 +1065,22 @@ class HasConstraints(object):
         return self._eq.total_eq_constraints() + \
                self._ineq.total_ineq_constraints()
 
-    def eval_eq_constraints(self, scope=None):
-        """Returns a list of constraint values."""
-        return self._eq.eval_eq_constraints(scope)
-
-    def eval_ineq_constraints(self, scope=None):
-        """Returns a list of constraint values."""
-        return self._ineq.eval_ineq_constraints(scope)
-
-    def eval_constraints(self, scope=None):
-        """Returns a list of constraint values."""
+    def eval_eq_constraints(self, scope=None, as_array=False):
+        """Returns a list of constraint values, or a flat array of them
+        if `as_array` is True."""
+        return self._eq.eval_eq_constraints(scope, as_array)
+
+    def eval_ineq_constraints(self, scope=None, as_array=False):
+        """Returns a list of constraint values, or a flat array of them
+        if `as_array` is True."""
+        return self._ineq.eval_ineq_constraints(scope, as_array)
+
+    def eval_constraints(self, scope=None, as_array=False):
+        """Returns a list of constraint values, or a flat array of them
+        if `as_array` is True."""
+        if as_array:
+            return concatenate((self._eq.eval_eq_constraints(scope, True),
+                                self._ineq.eval_ineq_constraints(scope, True)))
         return self._eq.eval_eq_constraints(scope) + \
                self._ineq.eval_ineq_constraints(scope)
 
@@ -12,7 +12,8 @@ from openmdao.main.depgraph import base_var
 from openmdao.util.typegroups import real_types, int_types
 from openmdao.util.graph import fix_single_tuple
 
-from numpy import array, ndarray, ndindex, ones
+from numpy import arange, array, asarray, concatenate, ndarray, ndindex, \
+                  ones, zeros
 from openmdao.main.mpiwrap import MPI
 
 __missing = object()
@@ -779,16 +780,19 @@ class HasParameters(object):
         if obj_has_interface(parent, ISolver):
             self._allowed_types.append('unbounded')
         self._parent = None if parent is None else weakref.ref(parent)
+        self._vec_map = None
 
     def __getstate__(self):
         state = self.__dict__.copy()
         state['_parent'] = self.parent
+        state['_vec_map'] = None
         return state
 
     def __setstate__(self, state):
         self.__dict__.update(state)
         parent = state['_parent']
         self._parent = None if parent is None else weakref.ref(parent)
+        self._vec_map = None
 
     @property
     def parent(self):
@@ -861,6 +865,7 @@ class HasParameters(object):
         referenced.
         """
 
+        self._vec_map = None
         if isinstance(target, (ParameterBase, ParameterGroup)):
             self._parameters[target.name] = target
             target.override(low, high, scaler, adder, start, fd_step, name)
@@ -950,6 +955,7 @@ class HasParameters(object):
         param = self._parameters.get(name)
         if param:
             del self._parameters[name]
+            self._vec_map = None
         else:
             self.parent.raise_exception("Trying to remove parameter '%s' "
                                          "that is not in this driver."
@@ -965,6 +971,7 @@ class HasParameters(object):
 
     def config_parameters(self):
         """Reconfigure parameters from potentially changed targets."""
+        self._vec_map = None
         for param in self._parameters.values():
             param.configure()
 
@@ -1089,6 +1096,16 @@ class HasParameters(object):
             targets and added as inputs to the Case instead of being set
             directly into the model.
         """
+        if case is None:
+            vec_map = self._get_vec_map()
+            if vec_map is not None and len(values) == vec_map[0]:
+                size, src, dest, adder, scaler = vec_map
+                values = asarray(values)[src]
+                if adder is not None:
+                    values = (values + adder) * scaler
+                self.parent._system.vec['u'].array[dest] = values
+                return
+
         if len(values) != self.total_parameters():
             raise ValueError("number of input values (%s) != expected number of"
                              " values (%s)" %
@@ -1119,6 +1136,69 @@ class HasParameters(object):
                     start = end
             return case
 
+    def _get_vec_map(self):
+        """Returns the cached map used by :meth:`set_parameters` to set all
+        parameter values directly into the parent driver system's 'u' vector,
+        or None if the system isn't set up or some target isn't in the vector.
+        The map is (size, src, dest, adder, scaler): the number of values,
+        the indices of the values for each target element, the corresponding
+        indices into the vector, and the adder and scaler arrays (None if
+        no parameter is scaled).
+        """
+        try:
+            uvec = self.parent._system.vec['u']
+        except (AttributeError, KeyError, TypeError):
+            return None
+
+        # The map is also reset whenever parameters are added or removed.
+        cache = self._vec_map
+        if cache is None or cache[0]() is not uvec:
+            cache = (weakref.ref(uvec), self._build_vec_map(uvec))
+            self._vec_map = cache
+        return cache[1]
+
+    def _build_vec_map(self, uvec):
+        """Returns the map for :meth:`_get_vec_map` for the given vector."""
+        srcs = []
+        dests = []
+        adders = []
+        scalers = []
+        scaled = False
+        start = 0
+        for param in self._parameters.values():
+            size = param.size
+            if isinstance(param, ParameterGroup):
+                params = param._params
+            else:
+                params = [param]
+            for p in params:
+                if not isinstance(p, (Parameter, ArrayParameter)):
+                    return None
+                # ArrayParameter.set() converts sequences to its dtype.
+                if isinstance(p, ArrayParameter) and p.dtype.kind != 'f':
+                    return None
+                dest = uvec.gather_indices([p._expreval.text])
+                if dest is None or dest.size != size:
+                    return None
+                srcs.append(arange(start, start+size))
+                dests.append(dest)
+                shape = p.shape if isinstance(p, ArrayParameter) else (size,)
+                if p._scaling_required:
+                    scaled = True
+                    adders.append((zeros(shape) + p.adder).ravel())
+                    scalers.append((ones(shape) * p.scaler).ravel())
+                else:
+                    adders.append(zeros(size))
+                    scalers.append(ones(size))
+            start += size
+
+        if not dests:
+            return None
+        if scaled:
+            return (start, concatenate(srcs), concatenate(dests),
+                    concatenate(adders), concatenate(scalers))
+        return (start, concatenate(srcs), concatenate(dests), None, None)
+
     def eval_parameters(self, scope=None, dtype='d'):
         """Return evaluated parameter values.
 
@@ -1220,6 +1300,8 @@ class HasParameters(object):
         except Exception:
             self._parameters = old
             raise
+        finally:
+            self._vec_map = None
 
 
 class HasVarTreeParameters(HasParameters):
@@ -673,11 +673,12 @@ class IHasEqConstraints(Interface):
     def total_eq_constraints(self):
         """Returns the total number of equality constraint values."""
 
-    def eval_eq_constraints(scope=None):
+    def eval_eq_constraints(scope=None, as_array=False):
         """Evaluates the constraint expressions and returns a list of values.
         The form of the constraint is transformed if necessary such that the
         right-hand-side is 0.0.  The values returned are the evaluation of the
-        left-hand-side.
+        left-hand-side.  If `as_array` is True, the values are returned
+        as a flat array.
         """
 
 
@@ -701,10 +702,11 @@ class IHasIneqConstraints(Interface):
     def total_ineq_constraints(self):
         """Returns the total number of inequality constraint values."""
 
-    def eval_ineq_constraints(scope=None):
+    def eval_ineq_constraints(scope=None, as_array=False):
         """Evaluates the constraint expressions and returns a list of values. Constraints
         are coerced into a form where the right-hand-side is 0., and the value returned
-        is the evaluation of the left-hand-side.
+        is the evaluation of the left-hand-side.  If `as_array` is True, the
+        values are returned as a flat array.
         """
 
 
@@ -722,8 +724,9 @@ class IHasConstraints(IHasEqConstraints, IHasIneqConstraints):
     def total_constraints(self):
         """Returns the total number of constraint values."""
 
-    def eval_constraints(scope=None):
-        """Evaluates the constraint expressions and returns a list of values."""
+    def eval_constraints(scope=None, as_array=False):
+        """Evaluates the constraint expressions and returns a list of values,
+        or a flat array of them if `as_array` is True."""
 
 
 class IHas2SidedConstraints(Interface):
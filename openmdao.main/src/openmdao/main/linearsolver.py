@@ -4,10 +4,13 @@
 
 # pylint: disable=E0611, F0401
 import numpy as np
-from scipy.sparse.linalg import gmres, LinearOperator
+from scipy.sparse import coo_matrix, csc_matrix
+from scipy.sparse.linalg import gmres, splu, LinearOperator
 
+from openmdao.main.depgraph import find_reachable
+from openmdao.main.derivatives import provideJ_bounds
 from openmdao.main.mpiwrap import MPI, PETSc
-from openmdao.util.graph import fix_single_tuple
+from openmdao.util.graph import base_var, fix_single_tuple
 from openmdao.util.log import logger
 
 class LinearSolver(object):
@@ -18,6 +21,11 @@ class LinearSolver(object):
         self._system = system
         self.options = system.options
 
+    def linearize(self):
+        """ Called whenever the system has been linearized. Solvers that
+        keep anything derived from the Jacobian must discard it here."""
+        pass
+
     def _norm(self):
         """ Computes the norm of the linear residual """
         system = self._system
@@ -32,6 +40,65 @@ class LinearSolver(object):
         else:
             return np.linalg.norm(system.rhs_vec.array)
 
+    def _unconnected(self, params, items):
+        """ Returns the set of (param, item) pairs that have no path between
+        them in the dependency graph, so their block of the Jacobian is
+        known to be zero. In adjoint mode, params are the outputs, so the
+        path is followed backwards."""
+
+        system = self._system
+        dgraph = system.scope._depgraph
+
+        unconnected = set()
+        for param in params:
+            if isinstance(param, tuple):
+                param = param[0]
+
+            pnode = base_var(dgraph, param)
+            if pnode not in dgraph:
+                continue
+
+            reachable = find_reachable(dgraph, [pnode],
+                                       reverse=system.mode == 'adjoint')
+
+            for item in items:
+                if isinstance(item, tuple):
+                    item = item[0]
+
+                inode = base_var(dgraph, item)
+                if inode in dgraph and inode not in reachable:
+                    unconnected.add((param, item))
+
+        return unconnected
+
+    def _add_sparse_block(self, sparse, dx, i, j):
+        """ Stores the nonzero entries of the solution dx for column
+        (forward) or row (adjoint) j, starting at offset i, in the sparse
+        lists of rows, columns and values."""
+
+        rows, cols, vals = sparse
+        nonzero = dx.nonzero()[0]
+
+        if self._system.mode == 'forward':
+            rows.append(nonzero + i)
+            cols.append(np.repeat(j, len(nonzero)))
+        else:
+            rows.append(np.repeat(j, len(nonzero)))
+            cols.append(nonzero + i)
+        vals.append(dx[nonzero])
+
+    def _sparse_jacobian(self, sparse, shape):
+        """ Returns a CSR matrix built from the sparse lists of rows,
+        columns and values."""
+
+        rows, cols, vals = sparse
+        if vals:
+            rows = np.concatenate(rows)
+            cols = np.concatenate(cols)
+            vals = np.concatenate(vals)
+
+        return coo_matrix((vals, (rows, cols)), shape=shape).tocsr()
+
 
 class ScipyGMRES(LinearSolver):
     """ Scipy's GMRES Solver. This is a serial solver, so
@@ -57,7 +124,6 @@ class ScipyGMRES(LinearSolver):
 
         system = self._system
         RHS = system.rhs_buf
-        A = self.A
 
         if return_format == 'dict':
             J = {}
@@ -67,6 +133,10 @@ class ScipyGMRES(LinearSolver):
                     if isinstance(ikey, tuple):
                         ikey = ikey[0]
                     J[okey][ikey] = None
+        elif return_format == 'sparse':
+            # Only the nonzero entries are kept, as (rows, cols, vals).
+            J = ([], [], [])
+            shape = (system.get_size(outputs), system.get_size(inputs))
         else:
             num_input = system.get_size(inputs)
             num_output = system.get_size(outputs)
@@ -75,44 +145,75 @@ class ScipyGMRES(LinearSolver):
         if system.mode == 'adjoint':
             outputs, inputs = inputs, outputs
 
+        if return_format == 'sparse':
+            unconnected = self._unconnected(inputs, outputs)
+
+        # The output indices are the same for every right-hand side, so look
+        # them up once.
+        out_items = []
+        for item in outputs:
+
+            if isinstance(item, tuple):
+                item = item[0]
+
+            out_items.append((item, system.vec['u'].indices(system.scope, item)))
+
         # If Forward mode, solve linear system for each parameter
         # If Adjoint mode, solve linear system for each requested output
-        j = 0
+        columns = []
         for param in inputs:
 
             if isinstance(param, tuple):
                 param = param[0]
 
             in_indices = system.vec['u'].indices(system.scope, param)
-            jbase = j
+            for jlocal, irhs in enumerate(in_indices):
+                columns.append((param, len(in_indices), jlocal, irhs))
 
-            for irhs in in_indices:
+        block_size = max(1, min(self._block_size(), RHS.size))
+
+        for jstart in xrange(0, len(columns), block_size):
+            block = columns[jstart:jstart+block_size]
 
+            if len(block) == 1:
+                irhs = block[0][3]
                 RHS[irhs] = 1.0
 
                 # Call GMRES to solve the linear system
-                dx = self.solve(RHS)
+                dxs = self.solve(RHS).reshape((RHS.size, 1))
 
                 RHS[irhs] = 0.0
+            else:
+                # Solve all right-hand sides of this block together.
+                B = np.zeros((RHS.size, len(block)))
+                for k, col in enumerate(block):
+                    B[col[3], k] = 1.0
 
-                i = 0
-                for item in outputs:
+                dxs = self.solve_block(B)
 
-                    if isinstance(item, tuple):
-                        item = item[0]
+            for k, (param, in_len, jlocal, irhs) in enumerate(block):
+                j = jstart + k
+                dx = dxs[:, k]
+
+                i = 0
+                for item, out_indices in out_items:
 
-                    out_indices = system.vec['u'].indices(system.scope, item)
                     nk = len(out_indices)
 
                     if return_format == 'dict':
                         if system.mode == 'forward':
                             if J[item][param] is None:
-                                J[item][param] = np.zeros((nk, len(in_indices)))
-                            J[item][param][:, j-jbase] = dx[out_indices]
+                                J[item][param] = np.zeros((nk, in_len))
+                            J[item][param][:, jlocal] = dx[out_indices]
                         else:
                             if J[param][item] is None:
-                                J[param][item] = np.zeros((len(in_indices), nk))
-                            J[param][item][j-jbase, :] = dx[out_indices]
+                                J[param][item] = np.zeros((in_len, nk))
+                            J[param][item][jlocal, :] = dx[out_indices]
+
+                    elif return_format == 'sparse':
+                        if (param, item) not in unconnected:
+                            self._add_sparse_block(J, dx[out_indices], i, j)
+                        i += nk
 
                     else:
                         if system.mode == 'forward':
@@ -121,11 +222,16 @@ class ScipyGMRES(LinearSolver):
                             J[j, i:i+nk] = dx[out_indices]
                         i += nk
 
-                j += 1
+        if return_format == 'sparse':
+            J = self._sparse_jacobian(J, shape)
 
         #print inputs, '\n', outputs, '\n', J
         return J
 
+    def _block_size(self):
+        """ Returns the number of right-hand sides to solve together."""
+        return self.options.gmres_block_size
+
     def solve(self, arg):
         """ Solve the coupled equations for a new state vector that nulls the
         residual. Used by the Newton solvers."""
@@ -151,6 +257,85 @@ class ScipyGMRES(LinearSolver):
         #print system.name, 'Linear solution vec', -dx
         return dx
 
+    def solve_block(self, arg):
+        """ Solve the linear system for several right-hand sides at once
+        using block GMRES. Each column of the 2D array arg is a right-hand
+        side, and all of them share one Krylov subspace, so directions found
+        for one column are reused by the others. Returns a 2D array of
+        solutions with the same shape as arg."""
+
+        system = self._system
+        options = self.options
+
+        n_edge, n_rhs = arg.shape
+
+        # Block iterations per restart, limited so that the Krylov basis
+        # never exceeds the size of the system.
+        restart = max(1, min(20, n_edge // n_rhs))
+
+        bnorm = np.sqrt(np.sum(arg*arg, axis=0))
+        bnorm[bnorm == 0.0] = 1.0
+        tol = options.atol * bnorm
+
+        X = np.zeros((n_edge, n_rhs))
+        R = arg.copy()
+
+        for cycle in xrange(options.maxiter):
+
+            V0, S = np.linalg.qr(R)
+            basis = [V0]
+
+            nrow = (restart+1)*n_rhs
+            H = np.zeros((nrow, restart*n_rhs))
+            E = np.zeros((nrow, n_rhs))
+            E[:n_rhs, :] = S
+
+            for j in xrange(restart):
+                W = self.mult_block(basis[j])
+
+                # Block Arnoldi with modified Gram-Schmidt
+                jcol = slice(j*n_rhs, (j+1)*n_rhs)
+                for i, Vi in enumerate(basis):
+                    Hij = np.dot(Vi.T, W)
+                    H[i*n_rhs:(i+1)*n_rhs, jcol] = Hij
+                    W -= np.dot(Vi, Hij)
+
+                Vnew, Hnew = np.linalg.qr(W)
+                H[(j+1)*n_rhs:(j+2)*n_rhs, jcol] = Hnew
+                basis.append(Vnew)
+
+                ncol = (j+1)*n_rhs
+                Hj = H[:ncol+n_rhs, :ncol]
+                Ej = E[:ncol+n_rhs, :]
+                Y = np.linalg.lstsq(Hj, Ej)[0]
+
+                res = Ej - np.dot(Hj, Y)
+                rnorm = np.sqrt(np.sum(res*res, axis=0))
+                if np.all(rnorm <= tol):
+                    break
+
+            X += np.dot(np.hstack(basis[:j+1]), Y)
+
+            if np.all(rnorm <= tol):
+                return X
+
+            R = arg - self.mult_block(X)
+
+        msg = "ERROR in calc_gradient in '%s': block gmres failed to " \
+              "converge after %d iterations"
+        logger.error(msg, system.name, options.maxiter)
+
+        return X
+
+    def mult_block(self, arg):
+        """ Applies the Jacobian to each column of the 2D array arg and
+        returns the results as the columns of a new array."""
+
+        result = np.empty(arg.shape)
+        for k in xrange(arg.shape[1]):
+            result[:, k] = self.mult(arg[:, k])
+
+        return result
 
     def mult(self, arg):
         """ GMRES Callback: applies Jacobian matrix. Mode is determined by the
@@ -228,6 +413,10 @@ class PETSc_KSP(LinearSolver):
                     if isinstance(ikey, tuple):
                         ikey = ikey[0]
                     J[okey][ikey] = None
+        elif return_format == 'sparse':
+            # Only the nonzero entries are kept, as (rows, cols, vals).
+            J = ([], [], [])
+            shape = (system.get_size(outputs), system.get_size(inputs))
         else:
             num_input = system.get_size(inputs)
             num_output = system.get_size(outputs)
@@ -272,6 +461,11 @@ class PETSc_KSP(LinearSolver):
                             else:
                                 del J[param][out]
 
+                    elif return_format == 'sparse':
+                        nk = len(solvec[out])
+                        self._add_sparse_block(J, solvec[out], i, j)
+                        i += nk
+
                     else:
                         nk = len(solvec[out])
                         if system.mode == 'forward':
@@ -281,6 +475,9 @@ class PETSc_KSP(LinearSolver):
                         i += nk
                 j += 1
 
+        if return_format == 'sparse':
+            J = self._sparse_jacobian(J, shape)
+
         return J
 
     def solve(self, arg):
@@ -336,6 +533,339 @@ class PETSc_KSP(LinearSolver):
         #rhs_vec.array[:] = system.sol_vec.array[:]
 
 
+class DirectSparseSolver(ScipyGMRES):
+    """ Direct solver that assembles the linearized system into a scipy
+    sparse matrix and factors it with SuperLU. The factorization is
+    computed once after each linearization and is then reused for every
+    right-hand side, so calc_gradient costs one back substitution per
+    column instead of one iterative solve. This is a serial solver, so it
+    should never be used in an MPI setting.
+    """
+
+    def __init__(self, system):
+        """ Set up DirectSparseSolver object """
+        super(DirectSparseSolver, self).__init__(system)
+
+        self._lu = None
+
+    def linearize(self):
+        """ Discard the factorization of the previous linearization. """
+        self._lu = None
+
+    def _block_size(self):
+        """ Back substitution handles many right-hand sides at once, so
+        solve as many as fit in _DIRECT_BLOCK_ENTRIES."""
+        return max(1, _DIRECT_BLOCK_ENTRIES //
+                      max(1, self._system.rhs_buf.size))
+
+    def _factor(self):
+        """ Assemble the forward Jacobian of the linearized system and
+        factor it. Blocks that come from provideJ, including sub-assemblies,
+        are copied straight from each system's J into the rows of its
+        outputs and the columns of the unknowns that are scattered to its
+        inputs. The other blocks come from apply_deriv, finite difference or
+        nested drivers, so they are probed by applying the linearized system
+        to colored sums of unit vectors."""
+
+        system = self._system
+        n_edge = system.rhs_buf.size
+        top = system.vec['du']
+
+        if system._parent_system:
+            vnames = system._parent_system._relevant_vars
+        else:
+            vnames = system.flat_vars.keys()
+        vnames = set(vnames)
+
+        blocks = []
+        for sub in _leaf_systems(system):
+            sub_rows = _view_indices(sub.vec['du'].array, top.array)
+            if sub_rows is None:
+                # We can't tell which rows are whose, so probe everything.
+                blocks = []
+                break
+            blocks.append((sub, sub_rows))
+
+        rows, cols, vals = [_EMPTY_IDX], [_EMPTY_IDX], [np.zeros(0)]
+        owned = np.zeros(n_edge, dtype=bool)
+        probed = []
+        for sub, sub_rows in blocks:
+            owned[sub_rows] = True
+            entries = _direct_entries(sub, sub_rows, top, vnames)
+            if entries is None:
+                probed.append((sub_rows,
+                               _probe_columns(sub, sub_rows, top, n_edge)))
+            else:
+                rows.extend(entries[0])
+                cols.extend(entries[1])
+                vals.extend(entries[2])
+
+        if not owned.all():
+            everything = np.arange(n_edge)
+            probed.append((everything[~owned], everything))
+
+        if probed:
+            if system.mode == 'adjoint':
+                self._probe_rows(probed, n_edge, rows, cols, vals)
+            else:
+                self._probe_cols(probed, n_edge, rows, cols, vals)
+
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+        vals = np.concatenate(vals)
+
+        # Unknowns that nothing depends on, like variables that aren't
+        # relevant here, are decoupled from the rest of the system.
+        empty = np.setdiff1d(np.arange(n_edge), rows)
+        A = csc_matrix((np.concatenate((vals, np.ones(len(empty)))),
+                        (np.concatenate((rows, empty)),
+                         np.concatenate((cols, empty)))),
+                       shape=(n_edge, n_edge))
+
+        try:
+            self._lu = splu(A)
+        except RuntimeError as err:
+            msg = "ERROR in calc_gradient in '%s': sparse LU factorization " \
+                  "failed: %s" % (system.name, err)
+            raise RuntimeError(msg)
+
+    def _probe_cols(self, probed, n_edge, rows, cols, vals):
+        """ Find the columns of the probed blocks in forward mode. Columns
+        share a color unless some probed block depends on both of them, so
+        each product yields at most one column of every block."""
+
+        color = _color_columns(n_edge, [bcols for _, bcols in probed])
+
+        arg = np.zeros(n_edge)
+        for icolor in xrange(color.max()+1):
+            arg[:] = color == icolor
+            column = self.mult(arg)
+
+            for brows, bcols in probed:
+                icol = bcols[color[bcols] == icolor]
+                if len(icol):
+                    values = column[brows]
+                    nonzero = values.nonzero()[0]
+                    rows.append(brows[nonzero])
+                    cols.append(np.repeat(icol[0], len(nonzero)))
+                    vals.append(values[nonzero])
+
+    def _probe_rows(self, probed, n_edge, rows, cols, vals):
+        """ Find the rows of the probed blocks in adjoint mode, where the
+        linearized system applies the transpose. Rows share a color unless
+        their blocks depend on a common column, so each product yields at
+        most one row of every block."""
+
+        color = _color_rows(n_edge, [brows for brows, _ in probed],
+                            [bcols for _, bcols in probed])
+
+        arg = np.zeros(n_edge)
+        for icolor in xrange(color.max()+1):
+            arg[:] = color == icolor
+            row = self.mult(arg)
+
+            for brows, bcols in probed:
+                irow = brows[color[brows] == icolor]
+                if len(irow):
+                    values = row[bcols]
+                    nonzero = values.nonzero()[0]
+                    rows.append(np.repeat(irow[0], len(nonzero)))
+                    cols.append(bcols[nonzero])
+                    vals.append(values[nonzero])
+
+    def solve(self, arg):
+        """ Solve the coupled equations for a new state vector that nulls the
+        residual. Used by the Newton solvers."""
+
+        if self._lu is None:
+            self._factor()
+
+        # The adjoint system is the transpose of the factored one.
+        if self._system.mode == 'adjoint':
+            return self._lu.solve(arg, 'T')
+        return self._lu.solve(arg)
+
+    def solve_block(self, arg):
+        """ Solve the linear system for each column of the 2D array arg
+        using the stored factorization."""
+
+        return self.solve(arg)
+
+
+# Largest number of entries in a block of right-hand sides that
+# DirectSparseSolver back substitutes together.
+_DIRECT_BLOCK_ENTRIES = 1000000
+
+_EMPTY_IDX = np.zeros(0, dtype=int)
+
+def _leaf_systems(system):
+    """ Yields the systems below system that are not CompoundSystems, which
+    are the blocks that DirectSparseSolver assembles."""
+
+    # systems imports this module.
+    from openmdao.main.systems import CompoundSystem
+
+    if isinstance(system, CompoundSystem):
+        for sub in system.local_subsystems():
+            for leaf in _leaf_systems(sub):
+                yield leaf
+    else:
+        yield system
+
+def _view_indices(array, base):
+    """ Returns the indices in base of the contiguous array, or None if
+    array is not part of base."""
+
+    if array.size == 0:
+        return _EMPTY_IDX
+    if not np.may_share_memory(array, base):
+        return None
+    start = (array.__array_interface__['data'][0] -
+             base.__array_interface__['data'][0]) // base.itemsize
+    return np.arange(start, start+array.size)
+
+def _direct_entries(system, sub_rows, top, variables):
+    """ Returns lists of the rows, cols and values of the forward Jacobian
+    that belong to system, read from its provideJ Jacobian, or None if the
+    block has to be probed. top is the du vector that the rows and columns
+    index."""
+
+    # systems imports this module.
+    from openmdao.main.systems import SimpleSystem, AssemblySystem, \
+                                      ParamSystem, InVarSystem
+
+    if type(system) in (ParamSystem, InVarSystem):
+        # Identity on our own variable. It is empty if a subdriver owns it.
+        return [sub_rows], [sub_rows], [np.ones(len(sub_rows))]
+
+    J = system.J
+    if type(system) not in (SimpleSystem, AssemblySystem) or \
+       not isinstance(J, np.ndarray) or system.list_states() or \
+       system.list_residuals():
+        return None
+
+    ibounds, obounds = provideJ_bounds(system, J)
+    name2collapsed = system.scope.name2collapsed
+
+    # df = du - J*dp for each output, where dp holds the unknowns that are
+    # scattered to our inputs.
+    rows, cols, vals = [], [], []
+    outputs = []
+    for item in system.list_outputs():
+        idxs = top.gather_indices([item])
+        if idxs is None or not np.in1d(idxs, sub_rows).all():
+            return None
+        rows.append(idxs)
+        cols.append(idxs)
+        vals.append(np.ones(len(idxs)))
+
+        if name2collapsed.get(item) in variables:
+            key = item.partition('.')[-1]
+            if key not in obounds:
+                return None
+            outputs.append((idxs, obounds[key]))
+
+    inputs = []
+    used = set()
+    for item in system.list_inputs():
+        if name2collapsed.get(item) not in variables:
+            continue
+        key = item.partition('.')[-1]
+        idxs = top.gather_indices([item])
+        if idxs is None or key not in ibounds:
+            return None
+        i1, i2, _ = ibounds[key]
+        if (i1, i2) not in used:
+            used.add((i1, i2))
+            inputs.append((idxs, i1, i2))
+
+    for oidxs, (o1, o2, _) in outputs:
+        for iidxs, i1, i2 in inputs:
+            Jsub = J[o1:o2, i1:i2]
+            if Jsub.shape != (len(oidxs), len(iidxs)):
+                return None
+            irow, icol = Jsub.nonzero()
+            rows.append(oidxs[irow])
+            cols.append(iidxs[icol])
+            vals.append(-Jsub[irow, icol])
+
+    return rows, cols, vals
+
+def _probe_columns(system, sub_rows, top, n_edge):
+    """ Returns the columns that the rows of a probed system can depend on,
+    which are its own unknowns and those that feed its inputs and states."""
+
+    idxs = [sub_rows]
+    for item in system.list_inputs() + system.list_states():
+        found = top.gather_indices([item])
+        if found is None:
+            return np.arange(n_edge)
+        idxs.append(found)
+
+    return np.unique(np.concatenate(idxs))
+
+def _blocks_by_index(n_edge, depends):
+    """ Returns a list of the blocks that depend on each index."""
+
+    blocks = [[] for i in xrange(n_edge)]
+    for k, idxs in enumerate(depends):
+        for i in idxs:
+            blocks[i].append(k)
+    return blocks
+
+def _color_columns(n_edge, depends):
+    """ Greedy coloring of the columns of the blocks that depend on the
+    columns in depends[k]. Two columns get different colors if some block
+    depends on both. Columns that no block depends on get -1."""
+
+    blocks = _blocks_by_index(n_edge, depends)
+
+    color = -np.ones(n_edge, dtype=int)
+    taken = [set() for k in depends]
+    for i in xrange(n_edge):
+        if not blocks[i]:
+            continue
+        used = set()
+        for k in blocks[i]:
+            used.update(taken[k])
+
+        icolor = 0
+        while icolor in used:
+            icolor += 1
+        color[i] = icolor
+        for k in blocks[i]:
+            taken[k].add(icolor)
+
+    return color
+
+def _color_rows(n_edge, probes, depends):
+    """ Greedy coloring of the rows in probes[k] of the blocks that depend on
+    the columns in depends[k]. Two rows get different colors if their blocks
+    depend on a common column. Rows that are not probed get -1."""
+
+    blocks = _blocks_by_index(n_edge, depends)
+
+    color = -np.ones(n_edge, dtype=int)
+    taken = [set() for k in depends]
+    for k, idxs in enumerate(probes):
+        near = set()
+        for i in depends[k]:
+            near.update(blocks[i])
+        used = set()
+        for j in near:
+            used.update(taken[j])
+
+        icolor = 0
+        for i in idxs:
+            while icolor in used:
+                icolor += 1
+            color[i] = icolor
+            taken[k].add(icolor)
+            icolor += 1
+
+    return color
+
+
 class LinearGS(LinearSolver):
     """ Linear block Gauss Seidel. MPI is not supported yet.
     Serial block solve of D x = b - (L+U) x """
@@ -370,6 +900,9 @@ class LinearGS(LinearSolver):
                     if isinstance(ikey, tuple):
                         ikey = ikey[0]
                     J[okey][ikey] = None
+        elif return_format == 'sparse':
+            # Only the nonzero entries are kept, as (rows, cols, vals).
+            J = ([], [], [])
         else:
             J = np.zeros((num_output, num_input))
 
@@ -377,6 +910,9 @@ class LinearGS(LinearSolver):
         if system.mode == 'adjoint':
             outputs, inputs = inputs, outputs
 
+        if return_format == 'sparse':
+            unconnected = self._unconnected(inputs, outputs)
+
         # If Forward mode, solve linear system for each parameter
         # If Reverse mode, solve linear system for each requested output
         j = 0
@@ -419,6 +955,11 @@ class LinearGS(LinearSolver):
                                 J[param][item] = np.zeros((len(in_indices), nk))
                             J[param][item][j-jbase, :] = dx[out_indices]
 
+                    elif return_format == 'sparse':
+                        if (param, item) not in unconnected:
+                            self._add_sparse_block(J, dx[out_indices], i, j)
+                        i += nk
+
                     else:
                         if system.mode == 'forward':
                             J[i:i+nk, j] = dx[out_indices]
@@ -428,6 +969,9 @@ class LinearGS(LinearSolver):
 
                 j += 1
 
+        if return_format == 'sparse':
+            J = self._sparse_jacobian(J, (num_output, num_input))
+
         #print inputs, '\n', outputs, '\n', J
         return J
 
@@ -47,6 +47,8 @@ import threading
 import time
 import traceback
 
+from collections import deque
+
 from Crypto import Random
 
 from multiprocessing import Process, current_process, connection, util
@@ -61,8 +63,9 @@ if sys.platform == 'win32':  #pragma no cover
 from traits.trait_handlers import TraitDictObject
 
 from openmdao.main.interfaces import implements, obj_has_interface, IContainerProxy
-from openmdao.main.mp_util import decrypt, encrypt, is_legal_connection, \
+from openmdao.main.mp_util import is_legal_connection, \
                                   keytype, make_typeid, public_methods, \
+                                  receive_message, send_message, \
                                   tunnel_address, SPECIALS
 from openmdao.main.rbac import AccessController, RoleError, check_role, \
                                need_proxy, Credentials, \
@@ -387,8 +390,6 @@ class OpenMDAO_Server(Server):
         """
         self._logger.log(LOG_DEBUG2, 'starting server thread to service %r, %s',
                          threading.current_thread().name, keytype(self._authkey))
-        recv = conn.recv
-        send = conn.send
         id_to_obj = self.id_to_obj
         id_to_controller = self._id_to_controller
 
@@ -403,9 +404,11 @@ class OpenMDAO_Server(Server):
             try:
                 ident = methodname = args = kwds = credentials = None
                 obj = exposed = gettypeid = None
-                data = recv()
+                oob = False
                 try:
-                    request = decrypt(data, session_key)
+                    request, oob = receive_message(conn, session_key)
+                except EOFError:
+                    raise
                 except Exception as exc:
                     trace = traceback.format_exc()
                     msg = "Can't decrypt/unpack request. This could be the" \
@@ -524,9 +527,10 @@ class OpenMDAO_Server(Server):
 
             try:
                 try:
-                    send(encrypt(msg, session_key))
+                    send_message(conn, msg, session_key, oob)
                 except Exception:
-                    send(encrypt(('#UNSERIALIZABLE', repr(msg)), session_key))
+                    send_message(conn, ('#UNSERIALIZABLE', repr(msg)),
+                                 session_key, oob)
             # Just being defensive, this should never happen.
             except Exception as exc: #pragma no cover
                 self._logger.error('exception in thread serving %r',
@@ -1240,11 +1244,15 @@ class OpenMDAO_Proxy(BaseProxy):
         dispatch(conn, None, 'accept_connection', (name,))
         self._tls.connection = conn
 
-    def _callmethod(self, methodname, args=None, kwds=None):
+    def _callmethod(self, methodname, args=None, kwds=None, wait=True):
         """
         Try to call a method of the referrent and return a copy of the result.
         This version optionally encrypts the channel and sends the current
         thread's credentials with method arguments.
+
+        If `wait` is False, then the call is sent without waiting for the
+        reply and a :class:`PendingReply` is returned. This allows many calls
+        to be 'pipelined' with only a single round-trip delay.
         """
         args = args or ()
         kwds = kwds or {}
@@ -1283,16 +1291,30 @@ class OpenMDAO_Proxy(BaseProxy):
                 new_args.append(arg)
 
         try:
-            conn.send(encrypt((self._id, methodname, new_args, kwds,
-                               get_credentials().encode()), session_key))
+            pending = self._tls.pending
+        except AttributeError:
+            pending = self._tls.pending = deque()
+        if len(pending) >= PendingReply.max_pending:
+            # Avoid possible deadlock due to both directions being full.
+            pending[0]._receive()
+
+        try:
+            send_message(conn, (self._id, methodname, new_args, kwds,
+                                get_credentials().encode()), session_key)
         except IOError as exc:
             msg = "Can't send to server at %r for %r: %r" \
                   % (self._token.address, methodname, exc)
             logging.error(msg)
             raise RuntimeError(msg)
 
-        kind, result = decrypt(conn.recv(), session_key)
+        reply = PendingReply(self, conn, session_key)
+        pending.append(reply)
+        if wait:
+            return reply.result()
+        return reply
 
+    def _handle_reply(self, kind, result):
+        """ Return result for reply message, creating a proxy if necessary. """
         if kind == '#RETURN':
             return result
 
@@ -1466,6 +1488,56 @@ class OpenMDAO_Proxy(BaseProxy):
                 (_auto_proxy, self._token, self._serializer, kwds))
 
 
+class PendingReply(object):
+    """
+    The reply to a call made via :meth:`OpenMDAO_Proxy._callmethod` with
+    `wait` False. Replies are received in the order the calls were made on
+    the connection to the server, which is specific to the calling thread.
+    At most `max_pending` replies are left unreceived per connection.
+
+    proxy: :class:`OpenMDAO_Proxy`
+        The proxy the call was made on.
+
+    conn: :class:`multiprocessing.Connection`
+        Connection to receive on.
+
+    session_key: string
+        Key used for decryption.
+    """
+
+    max_pending = 64
+
+    def __init__(self, proxy, conn, session_key):
+        self._proxy = proxy
+        self._conn = conn
+        self._session_key = session_key
+        self._value = None
+        self._exc_info = None
+        self.done = False
+
+    def result(self):
+        """
+        Wait for the reply and return the result of the call, or raise
+        the exception raised by the call.
+        """
+        pending = self._proxy._tls.pending
+        while not self.done:
+            pending[0]._receive()
+        if self._exc_info is not None:
+            raise self._exc_info[0], self._exc_info[1], self._exc_info[2]
+        return self._value
+
+    def _receive(self):
+        """ Receive and process the reply, which must be the next one. """
+        self._proxy._tls.pending.popleft()
+        try:
+            kind, result = receive_message(self._conn, self._session_key)[0]
+            self._value = self._proxy._handle_reply(kind, result)
+        except Exception:
+            self._exc_info = sys.exc_info()
+        self.done = True
+
+
 def register(cls, manager, module=None):
     """
     Register class `cls` proxy info with `manager`. The class will be
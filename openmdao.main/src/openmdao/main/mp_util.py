@@ -5,6 +5,7 @@ Multiprocessing support utilities.
 import ConfigParser
 import copy
 import cPickle
+import cStringIO
 import errno
 import getpass
 import inspect
@@ -17,6 +18,8 @@ import time
 
 from Crypto.Cipher import AES
 
+from numpy import ascontiguousarray, empty, ndarray
+
 from multiprocessing import current_process, connection
 from multiprocessing.managers import BaseProxy
 
@@ -422,6 +425,82 @@ def decrypt(msg, session_key):
         return msg
 
 
+# Arrays at least this large are sent out-of-band by send_message().
+_OOB_MIN_BYTES = 1 << 12
+
+
+def send_message(conn, obj, session_key, oob=True):
+    """
+    Send `obj` on `conn`. If `session_key` is specified, `obj` is sent
+    encrypted (see :func:`encrypt`). Otherwise, if `oob` is True, the data of
+    large :class:`numpy.ndarray` objects within `obj` is sent 'out-of-band'
+    as raw bytes following the pickled remainder of `obj`, avoiding copying
+    the data into and out of the pickle. Such a message must be received
+    by :func:`receive_message`.
+
+    conn: :class:`multiprocessing.Connection`
+        Connection to send on.
+
+    obj: object
+        Object to be sent.
+
+    session_key: string
+        Key used for encryption.
+
+    oob: bool
+        If True, allow out-of-band array data.
+    """
+    if session_key or not oob:
+        conn.send(encrypt(obj, session_key))
+        return
+
+    arrays = []
+    def persistent_id(obj):
+        """ Return id for an array to be sent out-of-band. """
+        if type(obj) is ndarray and obj.nbytes >= _OOB_MIN_BYTES and \
+           obj.dtype.fields is None and not obj.dtype.hasobject:
+            arrays.append(ascontiguousarray(obj))
+            return len(arrays)  # Must not be zero.
+        return None
+
+    out = cStringIO.StringIO()
+    pickler = cPickle.Pickler(out, cPickle.HIGHEST_PROTOCOL)
+    pickler.persistent_id = persistent_id
+    pickler.dump(obj)
+    conn.send(('#OOB', out.getvalue(),
+               [(arr.dtype.str, arr.shape) for arr in arrays]))
+    for arr in arrays:
+        conn.send_bytes(arr.reshape(-1))  # Flat view, no copy.
+
+
+def receive_message(conn, session_key):
+    """
+    Receive a message sent by :func:`send_message` on `conn`.
+    Returns ``(obj, oob)``, where `oob` is True if the message was sent
+    with out-of-band array data.
+
+    conn: :class:`multiprocessing.Connection`
+        Connection to receive on.
+
+    session_key: string
+        Key used for decryption.
+    """
+    msg = conn.recv()
+    if session_key or not isinstance(msg, tuple) or len(msg) != 3 or \
+       msg[0] != '#OOB':
+        return (decrypt(msg, session_key), False)
+
+    arrays = []
+    for dtype, shape in msg[2]:
+        arr = empty(shape, dtype)
+        conn.recv_bytes_into(arr.reshape(-1))
+        arrays.append(arr)
+
+    unpickler = cPickle.Unpickler(cStringIO.StringIO(msg[1]))
+    unpickler.persistent_load = lambda pid: arrays[int(pid)-1]
+    return (unpickler.load(), True)
+
+
 def public_methods(obj):
     """
     Returns a list of names of the methods of `obj` to be exposed.
@@ -10,12 +10,16 @@ import optparse
 import os.path
 import pkg_resources
 import platform
+import re
 import shutil
 import signal
 import socket
 import sys
+import tempfile
 import time
 
+from hashlib import md5
+
 from multiprocessing import current_process
 
 from openmdao.main.component import SimulationRoot
@@ -39,6 +43,10 @@ from openmdao.util.publickey import make_private, read_authorized_keys, \
 from openmdao.util.shellproc import ShellProc, STDOUT, DEV_NULL
 from openmdao.util.fileutil import onerror
 
+# Where input files are cached by ObjServer.fetch_cached/store_cached.
+_FILE_CACHE = os.path.join('~', '.openmdao', 'filecache')
+_DIGEST_RE = re.compile('^[0-9a-f]{32}$')
+
 _PROXIES = {}
 
 
@@ -547,7 +555,7 @@ class ObjServer(object):
         return self.tlo
 
     @rbac('owner')
-    def pack_zipfile(self, patterns, filename):
+    def pack_zipfile(self, patterns, filename, digests=None):
         """
         Create ZipFile of files matching `patterns` if `filename` is legal.
 
@@ -556,10 +564,14 @@ class ObjServer(object):
 
         filename: string
             Name of ZipFile to create.
+
+        digests: dict
+            MD5 digests of the requestor's copies of files, keyed by path.
+            Files with matching digests are not packed.
         """
         self._logger.debug('pack_zipfile %r', filename)
         self._check_path(filename, 'pack_zipfile')
-        return pack_zipfile(patterns, filename, self._logger)
+        return pack_zipfile(patterns, filename, self._logger, digests)
 
     @rbac('owner')
     def unpack_zipfile(self, filename, textfiles=None):
@@ -579,6 +591,104 @@ class ObjServer(object):
         self._check_path(filename, 'unpack_zipfile')
         return unpack_zipfile(filename, self._logger, textfiles)
 
+    @rbac('owner')
+    def fetch_cached(self, key, digests):
+        """
+        Copy files from the file cache for `key` if legal.
+        Returns a list of the paths which aren't cached and must be sent.
+        The cache is kept outside the server's directory so that files are
+        only transferred once per host, even though a server is typically
+        used for a single execution.
+
+        key: string
+            Identifies the cache to use, typically a component's pathname.
+
+        digests: dict
+            MD5 digests of the requestor's copies of files, keyed by path.
+        """
+        self._logger.debug('fetch_cached %r', key)
+        cache_dir = self._cache_dir(key)
+        missing = []
+        for path, digest in sorted(digests.items()):
+            self._check_path(path, 'fetch_cached')
+            self._check_digest(digest)
+            cached = os.path.join(cache_dir, digest)
+            if not os.path.exists(cached):
+                missing.append(path)
+                continue
+            directory = os.path.dirname(path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            try:
+                shutil.copy2(cached, path)
+            except (IOError, OSError) as exc:  # Evicted by another server.
+                self._logger.warning('fetch_cached %r failed %s', path, exc)
+                missing.append(path)
+        self._logger.debug('    %d of %d cached', len(digests)-len(missing),
+                           len(digests))
+        return missing
+
+    @rbac('owner')
+    def store_cached(self, key, digests):
+        """
+        Copy files to the file cache for `key` if legal, replacing any
+        previously cached files not in `digests`.
+
+        key: string
+            Identifies the cache to use, typically a component's pathname.
+
+        digests: dict
+            MD5 digests of the requestor's copies of files, keyed by path.
+        """
+        self._logger.debug('store_cached %r', key)
+        cache_dir = self._cache_dir(key)
+        for path, digest in sorted(digests.items()):
+            self._check_path(path, 'store_cached')
+            self._check_digest(digest)
+            cached = os.path.join(cache_dir, digest)
+            if os.path.exists(cached):
+                continue
+            # Copy to temporary and rename so readers never see a partial file.
+            fd, tmpname = tempfile.mkstemp(prefix='.', dir=cache_dir)
+            os.close(fd)
+            try:
+                shutil.copy2(path, tmpname)
+                os.rename(tmpname, cached)
+            except OSError:  # Windows won't rename over an existing file.
+                if not os.path.exists(cached):
+                    raise
+            finally:
+                if os.path.exists(tmpname):
+                    os.remove(tmpname)
+
+        keep = set(digests.values())
+        for name in os.listdir(cache_dir):
+            if not name.startswith('.') and name not in keep:
+                try:
+                    os.remove(os.path.join(cache_dir, name))
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _cache_dir(key):
+        """ Return file cache directory for `key` and current user. """
+        user = get_credentials().user
+        name = md5('%s:%s' % (user, key)).hexdigest()
+        path = os.path.join(os.path.expanduser(_FILE_CACHE), name)
+        if not os.path.exists(path):
+            try:
+                os.makedirs(path)
+            except OSError:  # Possibly created by another server.
+                if not os.path.isdir(path):
+                    raise
+        return path
+
+    @staticmethod
+    def _check_digest(digest):
+        """ Check that `digest` is a valid MD5 digest (and filename). """
+        if not _DIGEST_RE.match(digest):
+            raise ValueError('Invalid digest %r' % digest)
+
     @rbac('owner')
     def chmod(self, path, mode):
         """
@@ -1,6 +1,7 @@
 import sys
 from StringIO import StringIO
 from collections import OrderedDict
+from functools import partial
 from itertools import chain
 
 import numpy
@@ -10,8 +11,10 @@ from zope.interface import implements
 # pylint: disable-msg=E0611,F0401
 from openmdao.main.mpiwrap import MPI, MPI_info, PETSc
 from openmdao.main.exceptions import RunStopped
+from openmdao.main.concurrency import run_concurrently
 from openmdao.main.finite_difference import FiniteDifference, DirectionalFD
-from openmdao.main.linearsolver import ScipyGMRES, PETSc_KSP, LinearGS
+from openmdao.main.linearsolver import ScipyGMRES, PETSc_KSP, LinearGS, \
+                                       DirectSparseSolver
 from openmdao.main.mp_support import has_interface
 from openmdao.main.interfaces import IDriver, IAssembly, IImplicitComponent, \
                                      ISolver, IPseudoComp, IComponent, ISystem
@@ -697,12 +700,12 @@ class System(object):
 
             solver_choice = self.options.lin_solver
 
-            # scipy_gmres not supported in MPI, so swap with
-            # petsc KSP.
-            if MPI and solver_choice=='scipy_gmres':
-                solver_choice = 'petsc_ksp'
-                msg = "scipy_gmres optimizer not supported in MPI. " + \
+            # scipy_gmres and direct_sparse not supported in MPI, so swap
+            # with petsc KSP.
+            if MPI and solver_choice in ('scipy_gmres', 'direct_sparse'):
+                msg = "%s optimizer not supported in MPI. " % solver_choice + \
                       "Using petsc_ksp instead."
+                solver_choice = 'petsc_ksp'
                 self.options.parent._logger.warning(msg)
 
             if solver_choice == 'scipy_gmres':
@@ -711,6 +714,8 @@ class System(object):
                 self.ln_solver = PETSc_KSP(self)
             elif solver_choice == 'linear_gs':
                 self.ln_solver = LinearGS(self)
+            elif solver_choice == 'direct_sparse':
+                self.ln_solver = DirectSparseSolver(self)
 
     def linearize(self):
         """ Linearize local subsystems. """
@@ -718,6 +723,9 @@ class System(object):
         for subsystem in self.local_subsystems():
             subsystem.linearize()
 
+        if self.ln_solver is not None:
+            self.ln_solver.linearize()
+
     def set_complex_step(self, complex_step=False):
         """ Toggles complex_step plumbing for this system and all
         local subsystems.
@@ -773,7 +781,8 @@ class System(object):
     def solve_fd(self, inputs, outputs, iterbase='', return_format='array'):
         """Finite difference solve."""
 
-        if self.fd_solver is None:
+        if self.fd_solver is None or \
+           self.fd_solver.return_format != return_format:
             self.fd_solver = FiniteDifference(self, inputs, outputs,
                                               return_format)
         return self.fd_solver.solve(iterbase=iterbase)
@@ -1513,13 +1522,62 @@ class SerialSystem(CompoundSystem):
         if self.is_active():
             self._stop = False
 
-            for sub in self.local_subsystems():
-                self.scatter('u', 'p', sub)
+            for group in self._run_groups():
+                if len(group) > 1:
+                    self._run_concurrently(group, iterbase, case_label,
+                                           case_uuid)
+                else:
+                    sub = group[0]
+                    self.scatter('u', 'p', sub)
 
-                sub.run(iterbase, case_label=case_label, case_uuid=case_uuid)
+                    sub.run(iterbase, case_label=case_label,
+                            case_uuid=case_uuid)
                 if self._stop:
                     raise RunStopped('Stop requested')
 
+    def _run_groups(self):
+        """Return list of lists of subsystems to run. Consecutive
+        subsystems whose components have `async_execute` set and which
+        don't depend on each other are grouped to be run concurrently.
+        """
+        subs = self.local_subsystems()
+        if MPI:
+            return [[sub] for sub in subs]
+
+        groups = []
+        group = []
+        for sub in subs:
+            comp = sub._comp if isinstance(sub, SimpleSystem) else None
+            if getattr(comp, 'async_execute', False) is True:
+                for other in group:
+                    if self.graph.has_edge(other.node, sub.node):
+                        break
+                else:
+                    group.append(sub)
+                    continue
+                groups.append(group)
+                group = [sub]
+            else:
+                if group:
+                    groups.append(group)
+                    group = []
+                groups.append([sub])
+        if group:
+            groups.append(group)
+        return groups
+
+    def _run_concurrently(self, subs, iterbase, case_label, case_uuid):
+        """Run `subs` concurrently. Data for all of them is scattered
+        before any are run."""
+        for sub in subs:
+            self.scatter('u', 'p', sub)
+
+        calls = []
+        for sub in subs:
+            calls.append(partial(sub.run, iterbase, case_label=case_label,
+                                 case_uuid=case_uuid))
+        run_concurrently(calls)
+
     def evaluate(self, iterbase, case_label='', case_uuid=None):
         """ Evalutes a component's residuals without invoking its
         internal solve (for implicit comps.)
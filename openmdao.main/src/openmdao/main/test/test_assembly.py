@@ -848,6 +848,25 @@ subassy.comp3: ReRun.2-driverB.2-subassy.2-comp3"""
 
         set_as_top(TestA())
 
+    def test_run_cases(self):
+        top = set_as_top(Assembly())
+        top.add('comp', Simple())
+        top.driver.workflow.add('comp')
+
+        results, errors = top.run_cases(['comp.a', 'comp.b'],
+                                        [[1., 2., 3.], [10., 20., 30.]],
+                                        ['comp.c', 'comp.d*2'],
+                                        ['1', '2', '3'])
+        self.assertEqual(errors, [None, None, None])
+        self.assertEqual(list(results[0]), [11., 22., 33.])
+        self.assertEqual(list(results[1]), [-18., -36., -54.])
+
+        results, errors = top.run_cases(['comp.a'], [[1., 'bad']],
+                                        ['comp.c'], ['1', '2'])
+        self.assertEqual(errors[0], None)
+        self.assertTrue('ValueError' in errors[1])
+        self.assertEqual(results, [[31., None]])
+
     def test_tracing(self):
         # Check tracing of iteration coordinates.
         top = Assembly()
@@ -804,6 +804,52 @@ class Testcase_derivatives(unittest.TestCase):
         assert_rel_error(self, J[0, 0], 5.0, 0.0001)
         assert_rel_error(self, J[0, 1], 21.0, 0.0001)
 
+    def test_setup_cache(self):
+
+        top = set_as_top(Assembly())
+        top.add('comp', Paraboloid())
+        top.add('driver', SimpleDriver())
+        top.driver.workflow.add(['comp'])
+        top.driver.add_parameter('comp.x', low=-1000, high=1000)
+        top.driver.add_parameter('comp.y', low=-1000, high=1000)
+        top.driver.add_objective('comp.f_xy')
+
+        top.comp.x = 3
+        top.comp.y = 5
+        top.run()
+
+        J = top.driver.workflow.calc_gradient(inputs=['comp.x'],
+                                              outputs=['comp.f_xy'])
+        assert_rel_error(self, J[0, 0], 5.0, 0.0001)
+        system_x = top._system
+
+        J = top.driver.workflow.calc_gradient(inputs=['comp.y'],
+                                              outputs=['comp.f_xy'])
+        assert_rel_error(self, J[0, 0], 21.0, 0.0001)
+        system_y = top._system
+        self.assertTrue(system_y is not system_x)
+
+        # Switching back reuses the previous setup with current values.
+        top.comp.x = 4
+        top.run()
+        J = top.driver.workflow.calc_gradient(inputs=['comp.x'],
+                                              outputs=['comp.f_xy'])
+        assert_rel_error(self, J[0, 0], 7.0, 0.0001)
+        self.assertTrue(top._system is system_x)
+
+        J = top.driver.workflow.calc_gradient(inputs=['comp.y'],
+                                              outputs=['comp.f_xy'])
+        assert_rel_error(self, J[0, 0], 22.0, 0.0001)
+        self.assertTrue(top._system is system_y)
+
+        # A configuration change discards the cached setups.
+        top.driver.remove_parameter('comp.y')
+        top.run()
+        J = top.driver.workflow.calc_gradient(inputs=['comp.x'],
+                                              outputs=['comp.f_xy'])
+        assert_rel_error(self, J[0, 0], 7.0, 0.0001)
+        self.assertTrue(top._system is not system_x)
+
     def test_multi_non_relevant_path(self):
 
         self.top = set_as_top(Assembly())
@@ -1895,6 +1941,41 @@ Max RelError: [^ ]+ for comp.f_xy / comp.x
         diff = J - Jsub
         assert_rel_error(self, diff.max(), 0.0, .000001)
 
+    def test_sparse_return_format(self):
+
+        top = set_as_top(Assembly())
+        top.add('comp1', ArrayComp2D())
+        top.add('comp2', ArrayComp2D())
+        top.driver.workflow.add(['comp1', 'comp2'])
+
+        top.run()
+
+        Jbase = zeros((8, 8))
+        Jbase[:4, :4] = top.comp1.J
+        Jbase[4:, 4:] = top.comp2.J
+
+        for mode in ['forward', 'adjoint', 'fd']:
+            J = top.driver.calc_gradient(inputs=['comp1.x', 'comp2.x'],
+                                         outputs=['comp1.y', 'comp2.y'],
+                                         mode=mode,
+                                         return_format='sparse')
+
+            # The two components are unconnected, so the off-diagonal
+            # blocks aren't stored.
+            self.assertEqual(J.nnz, 32)
+            diff = abs(J.toarray() - Jbase)
+            assert_rel_error(self, diff.max(), 0.0, .000001)
+
+        top.driver.gradient_options.lin_solver = 'linear_gs'
+        top.driver.gradient_options.maxiter = 1
+        J = top.driver.calc_gradient(inputs=['comp1.x', 'comp2.x'],
+                                     outputs=['comp1.y', 'comp2.y'],
+                                     mode='forward',
+                                     return_format='sparse')
+        self.assertEqual(J.nnz, 32)
+        diff = abs(J.toarray() - Jbase)
+        assert_rel_error(self, diff.max(), 0.0, .000001)
+
     def test_array2D_with_apply_deriv(self):
 
         top = set_as_top(Assembly())
@@ -2,6 +2,7 @@
 Specific unit testing for finite difference.
 """
 
+import sys
 import unittest
 
 import numpy as np
@@ -78,6 +79,16 @@ class ArrayParaboloid(Component):
         x = self.x
         self.f_x = (x[0][0]-3.0)**2 + x[0][0]*x[0][1] + (x[0][1]+4.0)**2 - 3.0
 
+class DiagonalComp(Component):
+
+    x = Array(np.ones(5), iotype='in')
+    y = Array(np.zeros(5), iotype='out')
+
+    def execute(self):
+        ''' Each output depends on only one input. '''
+
+        self.y = 2.0*self.x*self.x
+
 class TestFiniteDifference(unittest.TestCase):
 
     def test_fd_step(self):
@@ -238,6 +249,58 @@ class TestFiniteDifference(unittest.TestCase):
         self.assertEqual(model.comp.exec_count - old_count, 2)
         self.assertEqual(model.comp.derivative_exec_count, 1)
 
+    def test_fd_processes(self):
+
+        model = set_as_top(Assembly())
+        model.add('comp', MyComp())
+        model.driver.workflow.add(['comp'])
+        model.driver.gradient_options.fd_form = 'central'
+
+        model.run()
+
+        inputs = ['comp.x1', 'comp.x2', 'comp.x3', 'comp.x4']
+        J1 = model.driver.calc_gradient(inputs=inputs, outputs=['comp.y'],
+                                        mode='fd')
+
+        model.driver.gradient_options.fd_processes = 3
+        old_count = model.comp.exec_count
+        J2 = model.driver.calc_gradient(inputs=inputs, outputs=['comp.y'],
+                                        mode='fd')
+
+        diff = abs(J2 - J1)
+        assert_rel_error(self, diff.max(), 0.0, .000001)
+
+        # The columns were run in the worker processes.
+        if sys.platform != 'win32':
+            self.assertEqual(model.comp.exec_count, old_count)
+
+        # Model is left in its original state.
+        self.assertEqual(model.comp.x1, 1.0)
+        self.assertEqual(model.comp.x2, 1.0)
+
+    def test_fd_coloring(self):
+
+        model = set_as_top(Assembly())
+        model.add('comp', DiagonalComp())
+        model.driver.workflow.add(['comp'])
+        model.driver.gradient_options.fd_coloring = True
+        model.comp.x = np.array([1.0, 2.0, 3.0, 0.0, -1.0])
+
+        model.run()
+
+        J = model.driver.calc_gradient(inputs=['comp.x'], outputs=['comp.y'],
+                                       mode='fd')
+        diff = abs(J - np.diag(4.0*model.comp.x))
+        assert_rel_error(self, diff.max(), 0.0, .0001)
+
+        # Once the pattern is known, all 5 columns share one run.
+        old_count = model.comp.exec_count
+        J = model.driver.calc_gradient(inputs=['comp.x'], outputs=['comp.y'],
+                                       mode='fd')
+        self.assertEqual(model.comp.exec_count - old_count, 1)
+        diff = abs(J - np.diag(4.0*model.comp.x))
+        assert_rel_error(self, diff.max(), 0.0, .0001)
+
     def test_smarter_nondifferentiable_blocks(self):
 
         top = set_as_top(Assembly())
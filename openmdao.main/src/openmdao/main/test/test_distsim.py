@@ -417,6 +417,20 @@ class TestCase(unittest.TestCase):
         self.assertEqual(obj.volume, 8.0)
         self.assertEqual(obj.surface_area, 24.0)
 
+        # Pipelined requests, replies collected later.
+        replies = [obj._callmethod('set', (name, 3.), wait=False)
+                   for name in ('width', 'height', 'depth')]
+        replies.append(obj._callmethod('set', ('no-such-var', 3.), wait=False))
+        replies.append(obj._callmethod('get', ('width',), wait=False))
+        self.assertEqual(replies[-1].result(), 3.)
+        self.assertTrue(all(reply.done for reply in replies))
+        self.assertEqual([reply.result() for reply in replies[:3]],
+                         [None, None, None])
+        assert_raises(self, 'replies[3].result()', globals(), locals(),
+                      RemoteError, '')
+        obj.run()
+        self.assertEqual(obj.volume, 27.0)
+
         try:
             obj.no_rbac()
         except RemoteError as exc:
@@ -62,6 +62,9 @@ class DriverTestCase(unittest.TestCase):
         assert(options.get_metadata("atol")["framework_var"])
         assert(options.get_metadata("rtol")["framework_var"])
         assert(options.get_metadata("maxiter")["framework_var"])
+        assert(options.get_metadata("gmres_block_size")["framework_var"])
+        assert(options.get_metadata("fd_processes")["framework_var"])
+        assert(options.get_metadata("fd_coloring")["framework_var"])
 
         assert(Driver().get_metadata("gradient_options")["framework_var"])
 
@@ -346,6 +346,33 @@ class HasConstraintsTestCase(unittest.TestCase):
     def test_eval_ineq_constraint(self):
         self._check_ineq_eval_constraints(MyInEqDriver())
 
+    def test_eval_constraints_array(self):
+        drv = self.asm.add('driver', MyDriver())
+        drv.add_constraint('comp1.c = comp1.d')
+        drv.add_constraint('comp1.a > comp1.b')
+        drv.add_constraint('comp2.c < comp2.d')
+
+        self.asm.comp1.a = 4
+        self.asm.comp1.b = 5
+        self.asm.comp2.a = 1
+        self.asm.comp2.b = 3
+        self.asm.run()
+
+        vals = drv.eval_constraints(as_array=True)
+        self.assertTrue(isinstance(vals, np.ndarray))
+        self.assertEqual(list(vals), [10., 1., 6.])
+        self.assertEqual(list(vals), drv.eval_constraints())
+
+        # Values were gathered from the workflow's 'u' vector.
+        self.assertTrue(drv._hasconstraints._ineq._gather_cache[1] is not None)
+
+        self.asm.comp1.a = 6
+        self.asm.run()
+        self.assertEqual(list(drv.eval_ineq_constraints(as_array=True)),
+                         [-1., 6.])
+        self.assertEqual(list(drv.eval_constraints(as_array=True)),
+                         drv.eval_constraints())
+
     def test_pseudocomps(self):
         self.asm.add('driver', MyDriver())
         self.asm.driver.workflow.add(['comp1','comp2'])
@@ -126,6 +126,30 @@ class HasParametersTestCase(unittest.TestCase):
         #except ValueError as err:
             #self.assertEqual(str(err), "parameter value (-1.0) is outside of allowed range [0.0 to 1e+99]")
 
+    def test_set_params_vec_map(self):
+        driver = self.top.driver
+        driver.add_parameter('comp.x', low=-100., high=100., scaler=2., adder=1.)
+        driver.add_parameter('comp.y', low=-100., high=100.)
+        self.top.run()
+
+        driver.set_parameters(array([3., 4.]))
+        uvec = self.top._system.vec['u']
+        self.assertEqual(uvec['comp.x'][0], 8.)
+        self.assertEqual(uvec['comp.y'][0], 4.)
+        self.assertTrue(driver._hasparameters._vec_map[1] is not None)
+
+        # Removing a parameter discards the map.
+        driver.remove_parameter('comp.y')
+        self.assertEqual(driver._hasparameters._vec_map, None)
+        driver.set_parameters([5.])
+        self.assertEqual(uvec['comp.x'][0], 12.)
+        self.assertEqual(uvec['comp.y'][0], 4.)
+
+        assert_raises(self, "driver.set_parameters([1., 2.])",
+                      globals(), locals(), ValueError,
+                      "number of input values (2) != expected number of"
+                      " values (1)")
+
     def test_add_connected_param(self):
         self.top.create_passthrough('comp.x')
         self.top.driver.add_parameter('comp.x', 0., 1.e99)
@@ -50,6 +50,49 @@ class Paraboloid(Component):
         return input_keys, output_keys
 
 
+class CountedParaboloid(Paraboloid):
+    """ Paraboloid that counts the Jacobian-vector products it does. """
+
+    def __init__(self):
+        super(CountedParaboloid, self).__init__()
+        self.applyJ_count = 0
+
+    def applyJ(self, system, variables):
+        self.applyJ_count += 1
+        super(CountedParaboloid, self).applyJ(system, variables)
+
+    def applyJT(self, system, variables):
+        self.applyJ_count += 1
+        super(CountedParaboloid, self).applyJT(system, variables)
+
+
+class ParaboloidApplyDeriv(Paraboloid):
+    """ Paraboloid that multiplies by its Jacobian instead of providing
+    it. """
+
+    def provideJ(self):
+        """Save the derivatives for apply_deriv."""
+
+        self.df_dx = 2.0*self.x - 6.0 + self.y
+        self.df_dy = 2.0*self.y + 8.0 + self.x
+
+    def apply_deriv(self, arg, result):
+
+        if 'f_xy' in result:
+            if 'x' in arg:
+                result['f_xy'] += self.df_dx*arg['x']
+            if 'y' in arg:
+                result['f_xy'] += self.df_dy*arg['y']
+
+    def apply_derivT(self, arg, result):
+
+        if 'f_xy' in arg:
+            if 'x' in result:
+                result['x'] += self.df_dx*arg['f_xy']
+            if 'y' in result:
+                result['y'] += self.df_dy*arg['f_xy']
+
+
 class Sellar_MDA_subbed(Assembly):
 
     def configure(self):
@@ -165,6 +208,128 @@ class Testcase_Scipy_Gmres(unittest.TestCase):
         assert_rel_error(self, J[0, 0], 5.0, 0.0001)
         assert_rel_error(self, J[0, 1], 21.0, 0.0001)
 
+    def test_scipy_gmres_block(self):
+
+        top = set_as_top(Assembly())
+        top.add('comp1', ArrayComp2D())
+        top.add('comp2', ArrayComp2D())
+
+        top.add('driver', SimpleDriver())
+        top.driver.workflow.add(['comp1', 'comp2'])
+        top.connect('comp1.y', 'comp2.x')
+        top.driver.add_parameter('comp1.x', low=-10, high=10)
+        top.driver.add_objective('comp1.y[0][0]')
+        top.driver.add_constraint('comp2.y < 0')
+
+        top.run()
+
+        J1 = top.driver.calc_gradient(mode='forward')
+        J2 = top.driver.calc_gradient(mode='adjoint')
+
+        top.driver.gradient_options.gmres_block_size = 3
+
+        J = top.driver.calc_gradient(mode='forward')
+        diff = abs(J - J1)
+        assert_rel_error(self, diff.max(), 0.0, .00001)
+
+        J = top.driver.calc_gradient(mode='adjoint')
+        diff = abs(J - J2)
+        assert_rel_error(self, diff.max(), 0.0, .00001)
+
+        J = top.driver.workflow.calc_gradient(inputs=['comp1.x'],
+                                              outputs=['comp1.y'],
+                                              mode='forward',
+                                              return_format='dict')
+        diff = J['comp1.y']['comp1.x'] - top.comp1.J
+        assert_rel_error(self, diff.max(), 0.0, .00001)
+
+
+class Testcase_Direct_Sparse(unittest.TestCase):
+    """ Test direct sparse LU linear solver. """
+
+    def test_direct_sparse_single_comp(self):
+
+        top = set_as_top(Assembly())
+        top.add('comp', CountedParaboloid())
+        top.add('driver', SimpleDriver())
+        top.driver.workflow.add(['comp'])
+        top.driver.add_parameter('comp.x', low=-1000, high=1000)
+        top.driver.add_parameter('comp.y', low=-1000, high=1000)
+        top.driver.add_objective('comp.f_xy')
+
+        top.driver.gradient_options.lin_solver = 'direct_sparse'
+
+        top.comp.x = 3
+        top.comp.y = 5
+        top.run()
+
+        J = top.driver.workflow.calc_gradient(inputs=['comp.x', 'comp.y'],
+                                              outputs=['comp.f_xy'],
+                                              mode='forward')
+
+        assert_rel_error(self, J[0, 0], 5.0, 0.0001)
+        assert_rel_error(self, J[0, 1], 21.0, 0.0001)
+
+        J = top.driver.workflow.calc_gradient(inputs=['comp.x', 'comp.y'],
+                                              mode='adjoint')
+
+        assert_rel_error(self, J[0, 0], 5.0, 0.0001)
+        assert_rel_error(self, J[0, 1], 21.0, 0.0001)
+
+        # The provideJ block is read directly, never probed.
+        self.assertEqual(top.comp.applyJ_count, 0)
+
+        # New linearization point
+        top.comp.x = 4
+        top.run()
+        J = top.driver.workflow.calc_gradient(inputs=['comp.x', 'comp.y'],
+                                              mode='forward')
+        assert_rel_error(self, J[0, 0], 7.0, 0.0001)
+        assert_rel_error(self, J[0, 1], 22.0, 0.0001)
+
+    def test_direct_sparse_apply_deriv(self):
+
+        top = set_as_top(Assembly())
+        top.add('P1', CountedParaboloid())
+        top.add('P2', ParaboloidApplyDeriv())
+        top.connect('P1.f_xy', 'P2.x')
+        top.add('driver', SimpleDriver())
+        top.driver.workflow.add(['P1', 'P2'])
+        top.driver.add_parameter('P1.x', low=-1000, high=1000)
+        top.driver.add_parameter('P1.y', low=-1000, high=1000)
+        top.driver.add_parameter('P2.y', low=-1000, high=1000)
+        top.driver.add_objective('P2.f_xy')
+
+        top.driver.gradient_options.lin_solver = 'direct_sparse'
+
+        top.P1.x = 3
+        top.P1.y = 5
+        top.P2.y = 2
+        top.run()
+
+        for mode in ('forward', 'adjoint'):
+            top.P1.applyJ_count = 0
+            J = top.driver.workflow.calc_gradient(mode=mode)
+
+            assert_rel_error(self, J[0, 0], 910.0, 0.0001)
+            assert_rel_error(self, J[0, 1], 3822.0, 0.0001)
+            assert_rel_error(self, J[0, 2], 105.0, 0.0001)
+
+            # Only the apply_deriv block is probed. It depends on P2.f_xy,
+            # P1.f_xy and P2.y, so three products find all of it.
+            self.assertTrue(top.P1.applyJ_count <= 3)
+
+    def test_direct_sparse_Sellar_subbed_connected(self):
+
+        top = set_as_top(Sellar_MDA_subbed_connected())
+        top.driver.gradient_options.lin_solver = 'direct_sparse'
+        top.run()
+        J = top.driver.workflow.calc_gradient(mode='forward')
+        assert_rel_error(self, J[0, 0], -628.543, 0.01)
+
+        J = top.driver.workflow.calc_gradient(mode='adjoint')
+        assert_rel_error(self, J[0, 0], -628.543, 0.01)
+
 
 class Testcase_Linear_GS(unittest.TestCase):
     """ Test Linear Gauss Siedel linear solver. """
@@ -9,8 +9,13 @@ import sys
 import unittest
 import nose
 
+from multiprocessing import Pipe
+
+from numpy import arange, array_equal, ones
+
 from openmdao.main.mp_util import read_server_config, read_allowed_hosts, \
-                                  is_legal_connection
+                                  is_legal_connection, receive_message, \
+                                  send_message
 
 from openmdao.util.publickey import make_private, HAVE_PYWIN32
 from openmdao.util.testutil import assert_raises
@@ -28,6 +33,31 @@ class TestCase(unittest.TestCase):
                       globals(), locals(), IOError,
                       "No such file 'no-such-file'")
 
+    def test_messages(self):
+        logging.debug('')
+        logging.debug('test_messages')
+
+        conn1, conn2 = Pipe()
+        try:
+            big = arange(10000.).reshape((100, 100))[:, ::2]
+            obj = ('ident', 'set', [big, arange(3), {'k': ones(2000, int)}])
+
+            # Large arrays sent out-of-band.
+            send_message(conn1, obj, '')
+            received, oob = receive_message(conn2, '')
+            self.assertTrue(oob)
+            self.assertTrue(array_equal(received[2][0], big))
+            self.assertTrue(array_equal(received[2][1], arange(3)))
+            self.assertTrue(array_equal(received[2][2]['k'], ones(2000, int)))
+
+            # Normal pickled send.
+            send_message(conn1, ('#RETURN', None), '', False)
+            self.assertEqual(receive_message(conn2, ''),
+                             (('#RETURN', None), False))
+        finally:
+            conn1.close()
+            conn2.close()
+
     def test_allowed_hosts(self):
         logging.debug('')
         logging.debug('test_allowed_hosts')
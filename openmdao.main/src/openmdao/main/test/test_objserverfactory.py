@@ -19,7 +19,7 @@ from openmdao.main.objserverfactory import ObjServerFactory, ObjServer, \
                                            connect_to_server, _PROXIES
 from openmdao.main.resource import ResourceAllocationManager as RAM
 from openmdao.util.testutil import assert_raises
-from openmdao.util.fileutil import onerror
+from openmdao.util.fileutil import file_md5, onerror
 
 
 class TestCase(unittest.TestCase):
@@ -205,6 +205,33 @@ class TestCase(unittest.TestCase):
             finally:
                 inp.close()
 
+            # File cache.
+            digests = {'xyzzy': file_md5('xyzzy')}
+            server.store_cached('test_server', digests)
+            try:
+                server.remove('xyzzy')
+                self.assertEqual(server.fetch_cached('test_server', digests),
+                                 [])
+                with server.open('xyzzy', 'r') as inp:
+                    self.assertEqual(inp.read(), 'Hello world!\n')
+
+                fred_digests = {'fred': file_md5('fred')}
+                self.assertEqual(server.fetch_cached('test_server',
+                                                     fred_digests), ['fred'])
+
+                # Replacing the cached set evicts xyzzy.
+                server.store_cached('test_server', fred_digests)
+                self.assertEqual(server.fetch_cached('test_server', digests),
+                                 ['xyzzy'])
+
+                assert_raises(self, "server.fetch_cached('test_server',"
+                                    " {'xyzzy': '../xyzzy'})",
+                              globals(), locals(), ValueError,
+                              "Invalid digest '../xyzzy'")
+            finally:
+                shutil.rmtree(ObjServer._cache_dir('test_server'),
+                              onerror=onerror)
+
             # Try to create a process.
             args = 'dir' if sys.platform == 'win32' else 'ls'
             try:
@@ -1,7 +1,11 @@
 
 import unittest
+
+import numpy
+
 from openmdao.main.api import set_as_top, Assembly, Component
 from openmdao.main.datatypes.api import Float
+from openmdao.main.vecwrapper import SerialScatter, contiguous_runs
 
 class Simple(Component):
 
@@ -85,5 +89,46 @@ class VecWrapperTestCase(unittest.TestCase):
         self.assertEqual(top.sub._system.vec['u'].array.size, 15)
  
 
+class SerialScatterTestCase(unittest.TestCase):
+
+    def test_contiguous_runs(self):
+        runs = contiguous_runs([0, 1, 2, 7, 8, 4], [10, 11, 12, 13, 14, 20])
+        self.assertEqual(runs, [(slice(0, 3), slice(10, 13)),
+                                (slice(7, 9), slice(13, 15)),
+                                (slice(4, 5), slice(20, 21))])
+        self.assertEqual(contiguous_runs([], []), [])
+
+    def test_scatter_runs(self):
+        src_idxs = numpy.concatenate((numpy.arange(20, 40),
+                                      numpy.arange(0, 10)))
+        dest_idxs = numpy.arange(30)
+        src = numpy.arange(40, dtype=float)
+
+        scatter = SerialScatter(None, src_idxs, None, dest_idxs)
+        self.assertEqual(len(scatter.runs), 2)
+
+        dest = numpy.zeros(30)
+        scatter.scatter(src, dest, addv=False, mode=False)
+        self.assertTrue((dest == src[src_idxs]).all())
+
+        # reverse (adjoint) scatter adds back into the source positions
+        result = numpy.ones(40)
+        scatter.scatter(dest, result, addv=True, mode=True)
+        expected = numpy.ones(40)
+        expected[src_idxs] += dest
+        self.assertTrue((result == expected).all())
+
+    def test_scatter_no_runs(self):
+        src_idxs = numpy.array([5, 3, 9, 1])
+        dest_idxs = numpy.array([0, 1, 2, 3])
+        scatter = SerialScatter(None, src_idxs, None, dest_idxs)
+        self.assertEqual(scatter.runs, None)
+
+        src = numpy.arange(10, dtype=float)
+        dest = numpy.zeros(4)
+        scatter.scatter(src, dest, addv=False, mode=False)
+        self.assertTrue((dest == src[src_idxs]).all())
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -13,6 +13,13 @@ from openmdao.util.graph import base_var
 
 ViewInfo = namedtuple('ViewInfo', 'view, start, idxs, size, hide')
 
+# minimum average run length for which SerialScatter copies slices
+# instead of using fancy indexing
+_MIN_RUN_LENGTH = 8
+
+# values of these types can be shared between variables without copying
+_immutable_types = (basestring, bool, int, long, float, complex, type(None))
+
 class VecWrapperBase(object):
     """A wrapper object for a local vector, a distributed PETSc vector,
     and info about what var maps to what range within the distributed
@@ -127,6 +134,26 @@ class VecWrapperBase(object):
         _, start, _, size, _ = self._info[name]
         return petsc_linspace(start, start+size)
 
+    def gather_indices(self, names):
+        """Return an index array into our array that selects the flattened
+        values of the given names, in order, or None if any of the names
+        isn't found in our array.
+        """
+        array_start = self.array.__array_interface__['data'][0]
+        itemsize = self.array.itemsize
+        idxs = []
+        for name in names:
+            info = self._info.get(name)
+            if info is None or \
+               not numpy.may_share_memory(info.view, self.array):
+                return None
+            offset = (info.view.__array_interface__['data'][0] -
+                      array_start) // itemsize
+            idxs.append(offset + numpy.arange(info.view.size)[info.idxs].ravel())
+        if idxs:
+            return numpy.concatenate(idxs)
+        return numpy.zeros(0, dtype=int)
+
     def set_to_array(self, arr, vnames=None):
         """Pull values for the given set of names out of our array
         and set them into the given array.
@@ -435,6 +462,7 @@ class DataTransfer(object):
         self.scatter = None
         self.scatter_conns = scatter_conns
         self.noflat_vars = list(noflat_vars)
+        self.size = 0
 
         if not (MPI or scatter_conns or noflat_vars):
             return  # no data to xfer
@@ -453,6 +481,8 @@ class DataTransfer(object):
                                 (len(var_idxs), len(input_idxs),
                                   var_idxs, input_idxs, system.name))
 
+        self.size = len(var_idxs)
+
         if MPI:
             var_idx_set = PETSc.IS().createGeneral(var_idxs,
                                                    comm=system.mpi.comm)
@@ -506,15 +536,26 @@ class DataTransfer(object):
                 raise NotImplementedError("passing of non-flat vars %s has not been implemented yet" %
                                           self.noflat_vars) # FIXME
             else:
+                scope = system.scope
                 for src, dests in self.noflat_vars:
+                    # Immutable values are fetched once and shared by all
+                    # dests. Anything else gets its own copy per dest (if
+                    # the variable asks for one).
+                    val = scope.get(src)
+                    shared = isinstance(val, _immutable_types)
                     for dest in dests:
                         if src != dest:
                             try:
-                                system.scope.set(dest,
-                                                 system.scope.get_attr_w_copy(src))
+                                scope.set(dest, val if shared else
+                                                scope.get_attr_w_copy(src))
                             except Exception:
-                                system.scope.reraise_exception("cannot set '%s' from '%s'" %
-                                                               (dest, src))
+                                scope.reraise_exception("cannot set '%s' from '%s'" %
+                                                        (dest, src))
+
+    def nbytes(self, srcvec):
+        """Return the number of bytes of array data moved by one call to
+        this transfer, given the vector being scattered from."""
+        return self.size * srcvec.array.itemsize
 
     def dump(self, system, srcvec, destvec, nest=0, stream=sys.stdout):
         stream.write(" "*nest)
@@ -529,6 +570,8 @@ class DataTransfer(object):
         var_idxs = to_indices(self.var_idxs, srcvec.array)
         input_idxs = self.input_idxs
         stream.write("%s --> %s\n" % (var_idxs, input_idxs))
+        stream.write(" "*nest)
+        stream.write("bytes per scatter: %d\n" % self.nbytes(srcvec))
 
         if MPI and system.app_ordering:
             var_idx_set = system.app_ordering.app2petsc(var_idxs)
@@ -545,13 +588,52 @@ class SerialScatter(object):
         self.dest_idxs = to_slice(dest_idxs)
         self.svec = srcvec
         self.dvec = destvec
+        self.size = len(src_idxs)
+
+        # If the indices break down into a few long runs that are
+        # contiguous in both vectors, copying slices is cheaper than
+        # fancy indexing. Duplicate indices need fancy indexing to keep
+        # the same semantics.
+        self.runs = None
+        if not (isinstance(self.src_idxs, slice) and
+                isinstance(self.dest_idxs, slice)):
+            runs = contiguous_runs(src_idxs, dest_idxs)
+            if len(runs)*_MIN_RUN_LENGTH <= self.size and \
+               numpy.unique(src_idxs).size == self.size and \
+               numpy.unique(dest_idxs).size == self.size:
+                self.runs = runs
 
     def scatter(self, srcvec, destvec, addv, mode):
-        if addv is True:
+        if self.runs is not None:
+            if addv is True:
+                for src, dest in self.runs:
+                    destvec[src] += srcvec[dest]
+            else:
+                for src, dest in self.runs:
+                    destvec[dest] = srcvec[src]
+        elif addv is True:
             destvec[self.src_idxs] += srcvec[self.dest_idxs]
         else:
             destvec[self.dest_idxs] = srcvec[self.src_idxs]
 
+def contiguous_runs(src_idxs, dest_idxs):
+    """Return a list of (src_slice, dest_slice) tuples that together cover
+    the given source and destination index arrays, where each tuple is a
+    run of indices that are consecutive in both arrays.
+    """
+    src = numpy.asarray(src_idxs)
+    dest = numpy.asarray(dest_idxs)
+    if len(src) == 0:
+        return []
+
+    breaks = numpy.nonzero((numpy.diff(src) != 1) |
+                           (numpy.diff(dest) != 1))[0] + 1
+    starts = numpy.concatenate(([0], breaks))
+    ends = numpy.concatenate((breaks, [len(src)]))
+
+    return [(slice(src[i], src[j-1]+1), slice(dest[i], dest[j-1]+1))
+            for i, j in zip(starts, ends)]
+
 def merge_idxs(src_idxs, dest_idxs):
     """Return source and destination index arrays, built up from
     smaller index arrays and combined in order of ascending source
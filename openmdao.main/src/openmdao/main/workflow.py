@@ -7,7 +7,8 @@ import sys
 import weakref
 from StringIO import StringIO
 
-from numpy import ndarray
+from numpy import ndarray, ones
+from scipy.sparse import diags
 from networkx.algorithms.dag import is_directed_acyclic_graph
 from networkx.algorithms.components import strongly_connected_components
 
@@ -219,9 +220,10 @@ class Workflow(object):
             forward or adjoint based on problem dimensions. Set to 'fd' to
             finite difference the entire workflow.
 
-        return_format: string in ['array', 'dict']
+        return_format: string in ['array', 'dict', 'sparse']
             Format for return value. Default is array, but some optimizers may
-            want a dictionary instead.
+            want a dictionary instead. 'sparse' returns a scipy.sparse CSR
+            matrix that only stores the nonzero entries.
 
         force_regen: boolean
             Set to True to force a regeneration of the system hierarchy.
@@ -285,6 +287,9 @@ class Workflow(object):
         if len(params) == 0:
             return J
 
+        if return_format == 'sparse':
+            scalers = ones(J.shape[1])
+
         i = 0
         for group in inputs:
 
@@ -302,6 +307,14 @@ class Workflow(object):
                         for okey in J.keys():
                             J[okey][name] = J[okey][name]*scaler
 
+            elif return_format == 'sparse':
+                width = len(self._system.vec['u'][name])
+
+                if pname in params:
+                    scalers[i:i+width] = params[pname].scaler
+
+                i += width
+
             else:
                 width = len(self._system.vec['u'][name])
 
@@ -312,6 +325,10 @@ class Workflow(object):
 
                 i += width
 
+        # Scale the columns of a sparse Jacobian in one product.
+        if return_format == 'sparse' and (scalers != 1.0).any():
+            J = J * diags([scalers], [0])
+
         #print J
         return J
 
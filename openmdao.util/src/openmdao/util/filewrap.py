@@ -5,6 +5,7 @@ Note: This is a work in progress.
 """
 
 import re
+from bisect import bisect_right
 
 from pyparsing import CaselessLiteral, Combine, OneOrMore, Optional, \
                       TokenConverter, Word, nums, oneOf, printables, \
@@ -382,9 +383,16 @@ class InputFileGenerator(object):
 
 
 class FileParser(object):
-    """Utility to locate and read data from a file."""
+    """Utility to locate and read data from a file.
 
-    def __init__(self, end_of_line_comment_char=None, full_line_comment_char=None):
+    By default lines are split into fields by a precompiled regular
+    expression equivalent to the pyparsing grammar (see :meth:`_parse_line`),
+    which is much faster for large files. Set `fast` False to use pyparsing.
+    Each line is only parsed once, and anchors are located via an index of
+    line offsets."""
+
+    def __init__(self, end_of_line_comment_char=None, full_line_comment_char=None,
+                 fast=True):
 
         self.filename = []
         self.data = []
@@ -392,9 +400,14 @@ class FileParser(object):
         self.delimiter = " \t"
         self.end_of_line_comment_char = end_of_line_comment_char
         self.full_line_comment_char = full_line_comment_char
+        self.fast = fast
 
         self.current_row = 0
         self.anchored = False
+
+        self._rows = {}     # Parsed lines, keyed by row.
+        self._rows_data = None
+        self._index = None  # (data, text, line offsets) for anchor search.
         self.set_delimiters(self.delimiter)
 
     def set_file(self, filename):
@@ -415,6 +428,7 @@ class FileParser(object):
                     continue
                 self.data.append( line.split( self.end_of_line_comment_char )[0] )
         inputfile.close()
+        self._rows = {}
 
     def set_delimiters(self, delimiter):
         """Lets you change the delimiter that is used to identify field
@@ -431,6 +445,7 @@ class FileParser(object):
         if delimiter != "columns":
             ParserElement.setDefaultWhitespaceChars(str(delimiter))
         self._reset_tokens()
+        self._rows = {}
 
     def mark_anchor(self, anchor, occurrence=1):
         """Marks the location of a landmark, which lets you describe data by
@@ -448,6 +463,73 @@ class FileParser(object):
 
         if not isinstance(occurrence, int):
             raise ValueError("The value for occurrence must be an integer")
+        if occurrence == 0:
+            raise ValueError("0 is not valid for an anchor occurrence.")
+
+        if anchor and '\n' not in anchor:
+            row = self._find_anchor(anchor, occurrence)
+        else:
+            row = self._scan_anchor(anchor, occurrence)
+
+        if row is not None:
+            self.current_row = row
+            self.anchored = True
+            return
+
+        raise RuntimeError("Could not find pattern %s in output file %s" % \
+                           (anchor, self.filename))
+
+    def _find_anchor(self, anchor, occurrence):
+        """Returns row of `occurrence` of `anchor` (see :meth:`mark_anchor`)
+        or None. Lines are searched as a single string with the line
+        containing a match located via the line offset index."""
+
+        text, offsets = self._line_index()
+        nlines = len(offsets)
+        size = len(anchor)
+        instance = 0
+
+        if occurrence > 0:
+            # When anchored, only text after the last occurrence on the
+            # current line is searched (see _scan_anchor), so skip it.
+            start = self.current_row + 1 if self.anchored else self.current_row
+            if start >= nlines:
+                return None
+            pos = offsets[start]
+            while True:
+                found = text.find(anchor, pos)
+                if found < 0:
+                    return None
+                row = bisect_right(offsets, found) - 1
+                end = offsets[row+1] if row+1 < nlines else len(text)
+                if found + size > end:  # Spans lines.
+                    pos = found + 1
+                    continue
+                instance += 1
+                if instance == occurrence:
+                    return row
+                pos = end
+        else:
+            if nlines == 0:
+                return None
+            end = offsets[-1] if self.anchored else len(text)
+            while True:
+                found = text.rfind(anchor, 0, end)
+                if found < 0:
+                    return None
+                row = bisect_right(offsets, found) - 1
+                line_end = offsets[row+1] if row+1 < nlines else len(text)
+                if found + size > line_end:  # Spans lines.
+                    end = found + size - 1
+                    continue
+                instance -= 1
+                if instance == occurrence:
+                    return row
+                end = offsets[row]
+
+    def _scan_anchor(self, anchor, occurrence):
+        """Returns row of `occurrence` of `anchor` (see :meth:`mark_anchor`)
+        or None by scanning each line."""
 
         instance = 0
         if occurrence > 0:
@@ -466,9 +548,7 @@ class FileParser(object):
 
                     instance += 1
                     if instance == occurrence:
-                        self.current_row += count
-                        self.anchored = True
-                        return
+                        return self.current_row + count
 
                 count += 1
 
@@ -487,16 +567,24 @@ class FileParser(object):
                 if anchor in line:
                     instance += -1
                     if instance == occurrence:
-                        self.current_row = count
-                        self.anchored = True
-                        return
+                        return count
 
                 count -= 1
-        else:
-            raise ValueError("0 is not valid for an anchor occurrence.")
 
-        raise RuntimeError("Could not find pattern %s in output file %s" % \
-                           (anchor, self.filename))
+        return None
+
+    def _line_index(self):
+        """Returns ``(text, offsets)``, where `text` is the file data as a
+        single string and `offsets` is the position of each line in `text`."""
+
+        if self._index is None or self._index[0] is not self.data:
+            offsets = []
+            pos = 0
+            for line in self.data:
+                offsets.append(pos)
+                pos += len(line)
+            self._index = (self.data, ''.join(self.data), offsets)
+        return self._index[1], self._index[2]
 
     def reset_anchor(self):
         """Resets anchor to the beginning of the file."""
@@ -550,9 +638,9 @@ class FileParser(object):
             else:
                 line = line[(field-1):(fieldend)]
 
-            # Let pyparsing figure out if this is a number, and return it
+            # Let the parser figure out if this is a number, and return it
             # as a float or int as appropriate
-            data = self._parse_line().parseString(line)
+            data = self._parse(line)
 
             # data might have been split if it contains whitespace. If so,
             # just return the whole string
@@ -561,9 +649,30 @@ class FileParser(object):
             else:
                 return data[0]
         else:
-            data = self._parse_line().parseString(line)
+            data = self._parse_row(j)
             return data[field-1]
 
+    def transfer_many(self, fields):
+        """Grabs several variables relative to the current anchor. Each line
+        is only parsed once, regardless of how many fields are taken from it,
+        so this is much faster than separate :meth:`transfer_var` calls on
+        rows of a large file which haven't been parsed yet.
+
+        fields: list or dict
+            ``(row, field)`` or ``(row, field, fieldend)`` tuples, with the
+            same meaning as the arguments to :meth:`transfer_var`, or a
+            dictionary of such tuples.
+
+        Returns a list of values in the order of `fields`, or a dictionary
+        of values with the same keys as `fields`."""
+
+        if isinstance(fields, dict):
+            names = list(fields.keys())
+            values = self.transfer_many([fields[name] for name in names])
+            return dict(zip(names, values))
+
+        return [self.transfer_var(*spec) for spec in fields]
+
     def transfer_keyvar(self, key, field, occurrence=1, rowoffset=0):
         """Searches for a key relative to the current anchor and then grabs
         a field from that line.
@@ -611,7 +720,7 @@ class FileParser(object):
         j = self.current_row + row + rowoffset
         line = self.data[j]
 
-        fields = self._parse_line().parseString(line.replace(key,"KeyField"))
+        fields = self._parse(line.replace(key,"KeyField"))
 
         return fields[field]
 
@@ -657,9 +766,9 @@ class FileParser(object):
                 # Stripping whitespace may be controversial.
                 line = line.strip()
 
-                # Let pyparsing figure out if this is a number, and return it
+                # Let the parser figure out if this is a number, and return it
                 # as a float or int as appropriate
-                parsed = self._parse_line().parseString(line)
+                parsed = self._parse(line)
 
                 newdata = array(parsed[:])
                 # data might have been split if it contains whitespace. If the
@@ -670,7 +779,7 @@ class FileParser(object):
                 data = append(data, newdata)
 
             else:
-                parsed = self._parse_line().parseString(line)
+                parsed = self._parse_row(j1+i)
                 if i == j2-j1-1:
                     data = append(data, array(parsed[(fieldstart-1):fieldend]))
                 else:
@@ -720,7 +829,7 @@ class FileParser(object):
             else:
                 line = lines[0][(fieldstart-1):]
 
-            parsed = self._parse_line().parseString(line)
+            parsed = self._parse(line)
             row = array(parsed[:])
             data = zeros(shape=(abs(j2-j1), len(row)))
             data[0, :] = row
@@ -731,11 +840,11 @@ class FileParser(object):
                 else:
                     line = line[(fieldstart-1):]
 
-                parsed = self._parse_line().parseString(line)
+                parsed = self._parse(line)
                 data[i+1, :] = array(parsed[:])
 
         else:
-            parsed = self._parse_line().parseString(lines[0])
+            parsed = self._parse_row(j1)
             if fieldend:
                 row = array(parsed[(fieldstart-1):fieldend])
             else:
@@ -744,16 +853,16 @@ class FileParser(object):
             data = zeros(shape=(abs(j2-j1), len(row)))
             data[0, :] = row
 
-            for i, line in enumerate(list(lines[1:])):
-                parsed = self._parse_line().parseString(line)
+            for i in range(1, len(lines)):
+                parsed = self._parse_row(j1+i)
 
                 if fieldend:
                     try:
-                        data[i+1, :] = array(parsed[(fieldstart-1):fieldend])
+                        data[i, :] = array(parsed[(fieldstart-1):fieldend])
                     except:
                         print data
                 else:
-                    data[i+1, :] = array(parsed[(fieldstart-1):])
+                    data[i, :] = array(parsed[(fieldstart-1):])
 
         return data
 
@@ -764,6 +873,56 @@ class FileParser(object):
 
         return self.line_parse_token
 
+    def _parse(self, line):
+        """Returns the fields of `line` as parsed by :meth:`_parse_line`."""
+
+        if self.fast:
+            return self._tokenize(line)
+        return self.line_parse_token.parseString(line)
+
+    def _parse_row(self, j):
+        """Returns the fields of line `j`, parsing it only once."""
+
+        if self._rows_data is not self.data:
+            self._rows = {}
+            self._rows_data = self.data
+
+        fields = self._rows.get(j)
+        if fields is None:
+            fields = self._rows[j] = self._parse(self.data[j])
+        return fields
+
+    def _tokenize(self, line):
+        """Returns the fields of `line` using the regular expression
+        equivalent of the pyparsing grammar, converted the same way."""
+
+        line = line.expandtabs()  # As done by pyparsing.
+        match = self._token_re.match
+        fields = []
+        pos = 0
+        while True:
+            token = match(line, pos)
+            if token is None:
+                break
+            kind = token.lastgroup
+            if kind == 'text':
+                fields.append(token.group(kind))
+            elif kind == 'int':
+                fields.append(int(token.group(kind)))
+            elif kind == 'float':
+                text = token.group(kind).replace('D', 'E').replace('d', 'e')
+                fields.append(float(text))
+            elif kind == 'nan':
+                fields.append(float('nan'))
+            else:
+                fields.append(float('inf'))
+            pos = token.end()
+
+        if not fields:
+            # Raise the same exception as pyparsing.
+            return self.line_parse_token.parseString(line)
+        return fields
+
     def _reset_tokens(self):
         ''' Sets up the tokens for pyparsing '''
 
@@ -807,7 +966,22 @@ class FileParser(object):
 
         string_text = Word(textchars)
 
-        self.line_parse_token = ( OneOrMore( (nan | num_float | mixed_exp | num_int |
-                                              string_text) ) )
+        words = nan | num_float | mixed_exp | num_int | string_text
+        self.line_parse_token = ( OneOrMore( words ) )
+
+        # Equivalent regular expression for the fast parser. Alternatives are
+        # tried in the same order, after skipping the same whitespace.
+        white = ''.join(sorted(words.whiteChars))
+        skip = '[%s]*' % re.escape(white) if white else ''
+        text = '[%s]+' % re.escape(textchars)
+        self._token_re = re.compile(
+            skip + '(?:'
+            r'(?P<inf>-Inf|Inf)|'
+            r'(?P<nan>NaN%|NaNQ|NaNS|NaN|nan|qNaN|sNaN|'
+            r'1\.\#SNAN|1\.\#QNAN|-1\.\#IND)|'
+            r'(?P<float>[+-]?(?:[0-9]+\.[0-9]*|\.[0-9]+)(?:[EeDd][+-]?[0-9]+)?'
+            r'|[0-9]+[EeDd][+-]?[0-9]+)|'
+            r'(?P<int>[+-]?[0-9]+)|'
+            '(?P<text>' + text + '))')
 
 
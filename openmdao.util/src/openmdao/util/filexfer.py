@@ -4,6 +4,7 @@ import os
 import sys
 import zipfile
 
+from openmdao.util.fileutil import file_md5
 from openmdao.util.log import NullLogger
 
 
@@ -75,7 +76,7 @@ def filexfer(src_server, src_path, dst_server, dst_path, mode='',
             dst_server.chmod(dst_path, mode)
 
 
-def pack_zipfile(patterns, filename, logger=None):
+def pack_zipfile(patterns, filename, logger=None, digests=None):
     """
     Create 'zip' file `filename` of files in `patterns`.
     Returns ``(nfiles, nbytes)``.
@@ -89,6 +90,10 @@ def pack_zipfile(patterns, filename, logger=None):
     logger: Logger
         Used for recording progress.
 
+    digests: dict
+        MD5 digests (as returned by :func:`file_md5`) keyed by path.
+        Files whose digest matches are unchanged and are not packed.
+
     .. note::
         The code uses :meth:`glob.glob` to process `patterns`.
         It does not check for the existence of any matches.
@@ -109,6 +114,10 @@ def pack_zipfile(patterns, filename, logger=None):
     with zipfile.ZipFile(filename, 'w', compression, zip64) as zipped:
         for pattern in patterns:
             for path in glob.glob(pattern):
+                if digests and path in digests and \
+                   file_md5(path) == digests[path]:
+                    logger.debug("skipping unchanged '%s'", path)
+                    continue
                 size = os.path.getsize(path)
                 logger.debug("packing '%s' (%d)...", path, size)
                 zipped.write(path)
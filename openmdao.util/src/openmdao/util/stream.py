@@ -398,6 +398,8 @@ class Stream(object):
                     arr = numpy.array(data, dtype=numpy.float32)
             elif data.itemsize != _SZ_DOUBLE:
                 arr = numpy.array(data, dtype=numpy.float64)
+            if not arr.dtype.isnative:
+                arr = arr.astype(arr.dtype.newbyteorder('='))
 
             if self.need_byteswap:
                 arr.byteswap(True)
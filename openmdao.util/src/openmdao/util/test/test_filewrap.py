@@ -594,6 +594,40 @@ class TestCase(unittest.TestCase):
         val = op.transfer_var(4, 4)
         self.assertEqual(val, '#$%')
 
+    def test_transfer_many(self):
+
+        data = "Junk\n" + \
+                   "Anchor\n" + \
+                   " A 1, 2 34, Test 1e65\n" + \
+                   " B 4 Stuff 3.5D-2\n" + \
+                   "Anchor\n" + \
+                   " C 77 False\tNaN 333.444\n"
+
+        outfile = open(self.filename, 'w')
+        outfile.write(data)
+        outfile.close()
+
+        for fast in (True, False):
+            gen = FileParser(fast=fast)
+            gen.set_file(self.filename)
+            gen.set_delimiters(' \t')
+
+            gen.mark_anchor('Anchor')
+            vals = gen.transfer_many([(1, 1), (1, 8), (2, 2), (2, 4), (4, 3)])
+            self.assertEqual(vals, ['A', 1e65, 4, 0.035, 'False'])
+            self.assertEqual(type(vals[2]), int)
+
+            gen.mark_anchor('Anchor')
+            vals = gen.transfer_many({'c': (1, 2), 'nan': (1, 4)})
+            self.assertEqual(vals['c'], 77)
+            self.assertEqual(isnan(vals['nan']), True)
+
+            gen.set_delimiters(' ,')
+            gen.mark_anchor('Anchor', -2)
+            self.assertEqual(gen.current_row, 1)
+            vals = gen.transfer_many([(1, 2), (1, 3), (1, 4)])
+            self.assertEqual(vals, [1, 2, 34])
+
 
 
 if __name__ == '__main__':